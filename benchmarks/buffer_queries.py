@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark the buffer queries used when picking new experiments.
+
+`count_within_buffer` and `value_within_buffer` supply the buffer bonus
+for future experiments in `batch_pick_new_experiments`.  They used to
+loop over the candidate points, computing a dense row of distances to
+every fixed point, and now use radius queries on a KD-tree.  This script
+times both ways on random designs of realistic size, with weights that
+put a handful of fixed points in each buffer, and checks that the KD-tree
+results match a dense computation of the weighted euclidean buffer.
+
+Run it with emat installed (e.g. with `pip install -e .`):
+
+    python benchmarks/buffer_queries.py
+    python benchmarks/buffer_queries.py --large
+
+The old loop tested each dimension separately rather than the distance
+over all dimensions, so its results differ from the current ones, but
+it does the same amount of work as a correct dense loop.
+"""
+
+import argparse
+import math
+import time
+
+import numpy as np
+
+from emat.experiment.experimental_design import count_within_buffer, value_within_buffer
+
+# (fixed points, candidate points, dimensions)
+SIZES = [
+    (100, 10_000, 6),
+    (500, 100_000, 10),
+]
+LARGE_SIZES = [
+    (500, 1_000_000, 10),
+]
+
+
+def old_count_within_buffer(fixed_points, other_points, weights, buffer_dist=1):
+    """The dense loop formerly used by `count_within_buffer`."""
+    array1 = np.asarray(fixed_points, dtype=float)
+    array2 = np.asarray(other_points, dtype=float)
+    w = np.asarray(weights, dtype=float).reshape(1, -1)
+    result = np.zeros(array2.shape[0], dtype=int)
+
+    for i in range(array2.shape[0]):
+        row = array2[i, :].reshape(1, -1)
+        distances = np.sqrt(((array1 - row) ** 2) * w)
+        result[i] = (distances <= buffer_dist).sum()
+    return result
+
+
+def dense_within_buffer(fixed_points, fixed_values, other_points, weights, buffer_dist=1):
+    """Counts and value totals of the weighted euclidean buffer, computed densely."""
+    w = np.asarray(weights, dtype=float).reshape(1, 1, -1)
+    d2 = (((other_points[:, None, :] - fixed_points[None, :, :]) ** 2) * w).sum(axis=2)
+    inside = d2 <= buffer_dist ** 2
+    return inside.sum(axis=1), inside @ fixed_values
+
+
+def buffer_weights(n_fixed, dims, per_buffer=5.0):
+    """
+    Equal weights on the unit cube giving about `per_buffer` fixed points in each buffer.
+
+    With weight s² on every axis the cube is stretched to side s, and a
+    buffer of radius 1 is expected to hold n_fixed * V / s**dims points,
+    where V is the volume of the unit ball.
+    """
+    ball = math.pi ** (dims / 2) / math.gamma(dims / 2 + 1)
+    side = (n_fixed * ball / per_buffer) ** (1 / dims)
+    return np.full(dims, side ** 2)
+
+
+def timed(func, *args, repeat=1):
+    """The result of a function, and its best run time in seconds."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def run(sizes, repeat=1, skip_old=False, n_check=2000, seed=0):
+    rng = np.random.RandomState(seed)
+    print(f"{'fixed':>7} {'candidates':>11} {'dims':>5} {'old loop':>10} {'KD-tree':>10} {'speedup':>8}")
+    for n_fixed, n_other, dims in sizes:
+        fixed = rng.uniform(size=(n_fixed, dims))
+        values = rng.uniform(size=n_fixed)
+        other = rng.uniform(size=(n_other, dims))
+        weights = buffer_weights(n_fixed, dims)
+
+        counts, new_seconds = timed(count_within_buffer, fixed, other, weights, repeat=repeat)
+        totals = value_within_buffer(fixed, values, other, weights)
+        check_counts, check_totals = dense_within_buffer(fixed, values, other[:n_check], weights)
+        if not (np.array_equal(counts[:n_check], check_counts) and np.allclose(totals[:n_check], check_totals)):
+            raise AssertionError(f"KD-tree results differ from the dense reference for {n_fixed, n_other, dims}")
+
+        if skip_old:
+            old = speedup = '-'
+        else:
+            _, old_seconds = timed(old_count_within_buffer, fixed, other, weights, repeat=repeat)
+            old = f"{old_seconds:.3f} s"
+            speedup = f"{old_seconds / new_seconds:.1f}x"
+        print(f"{n_fixed:>7,} {n_other:>11,} {dims:>5} {old:>10} {new_seconds:>8.3f} s {speedup:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--large', action='store_true', help='also run a million candidates')
+    parser.add_argument('--skip-old', action='store_true', help='do not time the old loop')
+    parser.add_argument('--repeat', type=int, default=1, help='report the best of this many runs')
+    parser.add_argument('--seed', type=int, default=0, help='random seed for the designs')
+    args = parser.parse_args()
+    sizes = SIZES + (LARGE_SIZES if args.large else [])
+    run(sizes, repeat=args.repeat, skip_old=args.skip_old, seed=args.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -135,7 +135,8 @@ class Database(abc.ABC):
                 'uni' - generated by univariate sensitivity test design
                 'lhs' - generated by latin hypercube sample design
             xl_df (pandas Dataframe): columns are experiment variables, 
-                each row is a full experiment
+                each row is a full experiment.  A lazy design, such as a
+                `FactorialDesign`, is written one chunk at a time.
 
         Returns:
             list: the experiment id's of the newly recorded experiments
@@ -197,6 +198,32 @@ class Database(abc.ABC):
             ValueError: if `scope_name` is not stored in this database
         """    
 
+    def iter_experiment_parameters(self, scope_name, design=None, chunk_size=10000):
+        """Read experiment definitions in chunks
+
+        This allows very large designs to be processed in a limited
+        amount of memory.  Experiments are read in order of their
+        experiment ids.
+
+        Args:
+            scope_name (str): scope name, used to identify experiments,
+                performance measures, and results associated with this run
+            design (str, optional): If given, only experiments associated
+                with the named design are returned, otherwise all
+                experiments are returned.
+            chunk_size (int, default 10000): The number of experiments
+                in each chunk.
+
+        Yields:
+            pandas.DataFrame: experiment definitions
+
+        Raises:
+            ValueError: if `scope_name` is not stored in this database
+        """
+        xl_df = self.read_experiment_parameters(scope_name, design).sort_index()
+        for start in range(0, len(xl_df), chunk_size):
+            yield xl_df.iloc[start:start + chunk_size]
+
     @abc.abstractmethod
     def write_experiment_measures(self, scope_name, source, m_df):
         """Write experiment results  
@@ -296,6 +323,28 @@ class Database(abc.ABC):
                 results from multiple sources.
         """
 
+    def read_experiment_measures_in_range(self, scope_name, design, first_id, last_id, source=None):
+        """Read experiment results for a range of experiment ids
+
+        This allows the results for a very large design to be read
+        one chunk at a time.
+
+        Args:
+            scope_name (str): scope name, used to identify experiments,
+                performance measures, and results associated with this run
+            design (str, optional): If given, only experiments associated
+                with the named design are returned.
+            first_id, last_id (int): The range of experiment ids to
+                read, including both ends.
+            source (int, optional): The source identifier of the
+                experimental outcomes to load.
+
+        Returns:
+            results (pandas.DataFrame): performance measures
+        """
+        ex_m = self.read_experiment_measures(scope_name, design, source=source)
+        return ex_m.loc[(ex_m.index >= first_id) & (ex_m.index <= last_id)]
+
     @abc.abstractmethod
     def delete_experiments(self, scope_name, design):
         """Delete experiment definitions and results
@@ -333,6 +382,63 @@ class Database(abc.ABC):
                 experiment
         """     
 
+    def write_experiment_run_status(
+            self,
+            scope_name,
+            run_id,
+            experiment_ids,
+            status,
+            source=0,
+            error=None,
+            duration=None,
+    ):
+        """Write the run status of experiments to the run manifest
+
+        The run manifest records which experiments were dispatched
+        in each call to `run_experiments`, and how far each got,
+        so that an interrupted run can be inspected and resumed.
+
+        Args:
+            scope_name (str): scope name, used to identify experiments,
+                performance measures, and results associated with this run
+            run_id (str): a unique identifier for this run
+            experiment_ids (Collection[int]): experiment ids
+            status (str): the status to record, one of 'queued',
+                'complete', 'interrupted', 'failed', or 'quarantined'.
+                Experiments whose most recent status is 'quarantined'
+                are not dispatched again by `run_experiments`; to release
+                them, write any other status.
+            source (int): indicator of the model being run
+                (0 = core model or non-zero = meta-model id)
+            error (str or Mapping, optional): a description of the
+                failure, or a mapping of experiment id to description.
+            duration (float or Mapping, optional): the wall-clock run time
+                in seconds, or a mapping of experiment id to run time.
+        """
+        raise NotImplementedError
+
+    def read_experiment_run_status(self, scope_name, design_name=None, run_id=None, source=None):
+        """Read the run status of experiments from the run manifest
+
+        Args:
+            scope_name (str): scope name, used to identify experiments,
+                performance measures, and results associated with this run
+            design_name (str, optional): If given, only experiments associated
+                with the named design are returned.
+            run_id (str, optional): If given, only the status recorded for
+                this run is returned.  Otherwise the most recently recorded
+                status for each experiment is returned.
+            source (int, optional): If given, only runs of this
+                model (0 = core model or non-zero = meta-model id)
+                are returned.
+
+        Returns:
+            pandas.DataFrame: indexed by experiment id, with columns
+                'run_id', 'run_source', 'run_status', 'run_timestamp',
+                'run_duration' and 'run_error'
+        """
+        raise NotImplementedError
+
 
     @abc.abstractmethod
     def read_scope_names(self, design_name=None) -> list:
@@ -1,4 +1,5 @@
 -- Tables to hold designed experiments and the results
+DROP TABLE IF EXISTS ema_experiment_run;
 DROP TABLE IF EXISTS ema_experiment;
 DROP TABLE IF EXISTS ema_experiment_parameter;
 DROP TABLE IF EXISTS ema_experiment_measure;
@@ -47,4 +48,17 @@ CREATE TABLE ema_experiment_measure (
     FOREIGN KEY (experiment_id) REFERENCES ema_experiment(rowid) ON DELETE CASCADE,
     FOREIGN KEY (measure_id) REFERENCES ema_measure(rowid),
     PRIMARY KEY (experiment_id, measure_id, measure_source)
-);
\ No newline at end of file
+);
+
+CREATE TABLE ema_experiment_run (
+    run_id            TEXT NOT NULL,
+    experiment_id     INT NOT NULL,
+    run_source        INT, --0 if run by core model, non-zero metamodel_id if by meta-model
+    run_status        TEXT, --'queued', 'complete', 'interrupted', 'failed' or 'quarantined'
+    run_timestamp     REAL,
+    run_duration      REAL, --wall-clock seconds to run the experiment
+    run_error         TEXT,
+
+    FOREIGN KEY (experiment_id) REFERENCES ema_experiment(rowid) ON DELETE CASCADE,
+    PRIMARY KEY (run_id, experiment_id)
+);
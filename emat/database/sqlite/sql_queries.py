@@ -115,6 +115,39 @@ INSERT_EX_XL = (
     '''
     )
 
+GET_SCOPE_XL_IDS = (
+    '''SELECT ema_parameter.rowid, ema_parameter.name
+        FROM ema_parameter JOIN ema_scope_parameter sv ON (ema_parameter.rowid = sv.parameter_id)
+        JOIN ema_scope s ON (sv.scope_id = s.rowid)
+        WHERE s.name = ?
+    '''
+    )
+
+INSERT_EX_XL_BY_ID = (
+    '''INSERT INTO ema_experiment_parameter( experiment_id, parameter_id, parameter_value )
+        VALUES (?, ?, ?)
+    '''
+    )
+
+GET_EXPERIMENT_IDS_PAGE = (
+    '''SELECT ema_experiment.rowid
+            FROM ema_experiment JOIN ema_scope s ON ema_experiment.scope_id = s.rowid
+            WHERE s.name = ?1 AND (?2 IS NULL OR ema_experiment.design = ?2) AND ema_experiment.rowid > ?3
+            ORDER BY ema_experiment.rowid
+            LIMIT ?4
+    '''
+    )
+
+GET_EX_XL_IN_RANGE = (
+    '''SELECT experiment_id, ema_parameter.name, parameter_value
+            FROM ema_experiment_parameter JOIN ema_parameter on ema_experiment_parameter.parameter_id = ema_parameter.rowid
+            JOIN ema_experiment ON ema_experiment_parameter.experiment_id = ema_experiment.rowid
+            JOIN ema_scope s on ema_experiment.scope_id = s.rowid
+            WHERE s.name =?1 AND (?2 IS NULL OR ema_experiment.design = ?2)
+            AND experiment_id BETWEEN ?3 AND ?4;
+    '''
+    )
+
 GET_EX_XL = (
     '''SELECT experiment_id, ema_parameter.name, parameter_value
             FROM ema_experiment_parameter JOIN ema_parameter on ema_experiment_parameter.parameter_id = ema_parameter.rowid
@@ -235,6 +268,17 @@ GET_EX_M_BY_ID = (
     '''
     )
 
+GET_EX_M_IN_RANGE = (
+    '''
+    SELECT experiment_id, ema_measure.name, measure_value
+            FROM ema_experiment_measure JOIN ema_measure on ema_experiment_measure.measure_id = ema_measure.rowid
+            JOIN ema_experiment ON ema_experiment_measure.experiment_id = ema_experiment.rowid
+            JOIN ema_scope s on ema_experiment.scope_id = s.rowid
+            WHERE s.name =?1 AND (?2 IS NULL OR ema_experiment.design = ?2)
+            AND experiment_id BETWEEN ?3 AND ?4
+    '''
+    )
+
 
 GET_EX_XLM_ALL = (
     '''
@@ -612,4 +656,54 @@ SET_BOX_THRESHOLD_M = (
         AND ema_scope_box.box_name = ?2
         AND ema_measure.name = ?3
     '''
-)
\ No newline at end of file
+)
+
+CREATE_EX_RUN = (
+    '''
+    CREATE TABLE IF NOT EXISTS ema_experiment_run (
+        run_id            TEXT NOT NULL,
+        experiment_id     INT NOT NULL,
+        run_source        INT,
+        run_status        TEXT,
+        run_timestamp     REAL,
+        run_duration      REAL,
+        run_error         TEXT,
+
+        FOREIGN KEY (experiment_id) REFERENCES ema_experiment(rowid) ON DELETE CASCADE,
+        PRIMARY KEY (run_id, experiment_id)
+    );
+    '''
+)
+
+INSERT_EX_RUN = (
+    '''
+    INSERT OR REPLACE INTO ema_experiment_run (
+        run_id,
+        experiment_id,
+        run_source,
+        run_status,
+        run_timestamp,
+        run_duration,
+        run_error
+    )
+    VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?7)
+    '''
+)
+
+GET_EX_RUN = (
+    '''
+    SELECT
+        ema_experiment_run.experiment_id,
+        ema_experiment_run.run_id,
+        ema_experiment_run.run_source,
+        ema_experiment_run.run_status,
+        ema_experiment_run.run_timestamp,
+        ema_experiment_run.run_duration,
+        ema_experiment_run.run_error
+    FROM
+        ema_experiment_run
+        JOIN ema_experiment ON ema_experiment_run.experiment_id = ema_experiment.rowid
+        JOIN ema_scope s ON ema_experiment.scope_id = s.rowid
+    WHERE s.name = ?1
+    '''
+)
@@ -294,6 +294,13 @@ class SQLiteDB(Database):
     @copydoc(Database.write_experiment_parameters)
     def write_experiment_parameters(self, scope_name, design_name: str, xl_df: pd.DataFrame):
         scope_name = self._validate_scope(scope_name, 'design_name')
+        if not isinstance(xl_df, pd.DataFrame) and hasattr(xl_df, 'iter_chunks'):
+            # lazy designs are made and written one chunk at a time
+            ex_ids = []
+            for chunk in xl_df.iter_chunks():
+                ex_ids.extend(self.write_experiment_parameters(scope_name, design_name, chunk))
+            return ex_ids
+
         # local cursor because we'll depend on lastrowid
         fcur = self.conn.cursor()
         
@@ -303,22 +310,25 @@ class SQLiteDB(Database):
             raise UserWarning('named scope {0} not found - experiments will \
                                   not be recorded'.format(scope_name))
 
+        # create the new experiments, taking each id from lastrowid, as
+        # other connections may insert experiments at the same time
         ex_ids = []
-
-        for index, row in xl_df.iterrows():
-            # create new experiment and get id
+        for _ in range(len(xl_df)):
             fcur.execute(sq.INSERT_EX, [design_name, scope_name])
-            ex_id = fcur.lastrowid
-            ex_ids.append(ex_id)
-                
-            # set each from experiment defitinion 
-            for xl in scp_xl:
-                try:
-                    value = row[xl[0]]
-                    fcur.execute(sq.INSERT_EX_XL, [ex_id, value, xl[0]])
-                except TypeError:
-                    _logger.error(f'Experiment definition missing {xl[0]} variable')
-                    raise
+            ex_ids.append(fcur.lastrowid)
+
+        # set each from experiment definition, one column at a time
+        for parameter_id, parameter_name in fcur.execute(sq.GET_SCOPE_XL_IDS, [scope_name]).fetchall():
+            try:
+                values = xl_df[parameter_name].tolist()
+            except KeyError:
+                _logger.error(f'Experiment definition missing {parameter_name} variable')
+                self.conn.rollback()
+                raise
+            fcur.executemany(
+                sq.INSERT_EX_XL_BY_ID,
+                zip(ex_ids, [parameter_id] * len(ex_ids), values),
+            )
 
         self.conn.commit()
         fcur.close()
@@ -480,6 +490,10 @@ class SQLiteDB(Database):
             else:
                 xl_df = pd.DataFrame(self.cur.execute(
                         sq.GET_EX_XL, [scope_name, design]).fetchall())
+        return self._pivot_experiment_parameters(scope_name, xl_df)
+
+    def _pivot_experiment_parameters(self, scope_name, xl_df):
+        """Convert (experiment, parameter, value) rows to a wide DataFrame."""
         if xl_df.empty is False:
             xl_df = xl_df.pivot(index=0, columns=1, values=2)
         xl_df.index.name = 'experiment'
@@ -493,6 +507,22 @@ class SQLiteDB(Database):
 
         return xl_df[[i for i in column_order if i in xl_df.columns]]
 
+    @copydoc(Database.iter_experiment_parameters)
+    def iter_experiment_parameters(self, scope_name: str, design: str=None, chunk_size: int=10000):
+        scope_name = self._validate_scope(scope_name, 'design')
+        last_id = 0
+        while True:
+            ex_ids = [i[0] for i in self.cur.execute(
+                sq.GET_EXPERIMENT_IDS_PAGE, [scope_name, design, last_id, chunk_size],
+            ).fetchall()]
+            if not ex_ids:
+                return
+            xl_df = pd.DataFrame(self.cur.execute(
+                sq.GET_EX_XL_IN_RANGE, [scope_name, design, ex_ids[0], ex_ids[-1]],
+            ).fetchall())
+            yield self._pivot_experiment_parameters(scope_name, xl_df)
+            last_id = ex_ids[-1]
+
     @copydoc(Database.write_experiment_measures)
     def write_experiment_measures(self,
                    scope_name,
@@ -667,6 +697,10 @@ class SQLiteDB(Database):
                     sql += ' AND ema_experiment_measure.measure_source =?4'
                     arg.append(source)
         ex_m = pd.DataFrame(self.cur.execute(sql, arg).fetchall())
+        return self._pivot_experiment_measures(scope_name, ex_m)
+
+    def _pivot_experiment_measures(self, scope_name, ex_m):
+        """Convert (experiment, measure, value) rows to a wide DataFrame."""
         if ex_m.empty is False:
             ex_m = ex_m.pivot(index=0, columns=1, values=2)
         ex_m.index.name = 'experiment'
@@ -678,12 +712,83 @@ class SQLiteDB(Database):
 
         return ex_m[[i for i in column_order if i in ex_m.columns]]
 
+    @copydoc(Database.read_experiment_measures_in_range)
+    def read_experiment_measures_in_range(self, scope_name, design, first_id, last_id, source=None):
+        scope_name = self._validate_scope(scope_name, 'design')
+        sql = sq.GET_EX_M_IN_RANGE
+        arg = [scope_name, design, int(first_id), int(last_id)]
+        if source is not None:
+            sql += ' AND ema_experiment_measure.measure_source =?5'
+            arg.append(source)
+        ex_m = pd.DataFrame(self.cur.execute(sql, arg).fetchall())
+        return self._pivot_experiment_measures(scope_name, ex_m)
+
     @copydoc(Database.delete_experiments)
     def delete_experiments(self, scope_name: str, design: str):
         scope_name = self._validate_scope(scope_name, 'design')
         self.cur.execute(sq.DELETE_EX, [scope_name, design])
         self.conn.commit()
-        
+
+    def _ensure_run_manifest(self):
+        """Create the run manifest table, if it is not already in this database."""
+        # database files created by older versions of emat have no run
+        # manifest table, so it is created on demand instead of on init.
+        self.cur.execute(sq.CREATE_EX_RUN)
+
+    @copydoc(Database.write_experiment_run_status)
+    def write_experiment_run_status(
+            self,
+            scope_name,
+            run_id,
+            experiment_ids,
+            status,
+            source=0,
+            error=None,
+            duration=None,
+    ):
+        import time
+        from collections.abc import Mapping
+        scope_name = self._validate_scope(scope_name, None)
+        self._ensure_run_manifest()
+        timestamp = time.time()
+        if not isinstance(error, Mapping):
+            error = {ex_id: error for ex_id in experiment_ids}
+        if not isinstance(duration, Mapping):
+            duration = {ex_id: duration for ex_id in experiment_ids}
+        self.cur.executemany(
+            sq.INSERT_EX_RUN,
+            [
+                (run_id, int(ex_id), source, status, timestamp, duration.get(ex_id), error.get(ex_id))
+                for ex_id in experiment_ids
+            ],
+        )
+        self.conn.commit()
+
+    @copydoc(Database.read_experiment_run_status)
+    def read_experiment_run_status(self, scope_name, design_name=None, run_id=None, source=None):
+        scope_name = self._validate_scope(scope_name, 'design_name')
+        self._ensure_run_manifest()
+        sql = sq.GET_EX_RUN
+        arg = [scope_name]
+        if design_name is not None:
+            arg.append(design_name)
+            sql += f' AND ema_experiment.design = ?{len(arg)}'
+        if run_id is not None:
+            arg.append(run_id)
+            sql += f' AND ema_experiment_run.run_id = ?{len(arg)}'
+        if source is not None:
+            arg.append(source)
+            sql += f' AND ema_experiment_run.run_source = ?{len(arg)}'
+        sql += ' ORDER BY ema_experiment_run.run_timestamp, ema_experiment_run.rowid'
+        columns = [
+            'experiment', 'run_id', 'run_source', 'run_status',
+            'run_timestamp', 'run_duration', 'run_error',
+        ]
+        runs = pd.DataFrame(self.cur.execute(sql, arg).fetchall(), columns=columns)
+        # keep only the most recent status for each experiment
+        runs = runs.drop_duplicates('experiment', keep='last').set_index('experiment')
+        return runs.sort_index()
+
     @copydoc(Database.write_experiment_all)
     def write_experiment_all(self,
                      scope_name, 
@@ -25,3 +25,20 @@ class DistributionTypeError(TypeError):
 
 class DistributionFreezeError(Exception):
 	"""An error is thrown when creating an rv_frozen object."""
+
+
+class ExperimentTimeoutError(TimeoutError):
+	"""
+	A single experiment run has exceeded its wall-clock time limit.
+
+	The `abandoned` attribute is True if the run could not be stopped,
+	and may still be running in the background.
+	"""
+
+	def __init__(self, *args, abandoned=False):
+		super().__init__(*args)
+		self.abandoned = abandoned
+
+
+class ExperimentsCancelledError(RuntimeError):
+	"""A run of experiments was cancelled before all of the experiments were complete."""
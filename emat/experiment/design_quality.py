@@ -0,0 +1,281 @@
+import time
+import itertools
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from ..util.loggers import get_module_logger
+_logger = get_module_logger(__name__)
+
+
+def unit_hypercube(design, scope=None):
+    """
+    Map a design of experiments onto the unit hypercube.
+
+    Args:
+        design (pandas.DataFrame or array-like): The design, with a row
+            for each experiment.  An array is assumed to already be
+            in the unit hypercube.  Without a `scope`, every column
+            must be numeric.
+        scope (Scope, optional): If given, each uncertainty and lever is
+            mapped through its cumulative distribution function, so that
+            a design that follows the distributions of the scope is
+            uniform, and columns that are not uncertainties or levers
+            are dropped.  Categorical and boolean values are mapped to the
+            middle of their probability step.  Otherwise, each column is
+            scaled linearly from its minimum to its maximum.
+
+    Returns:
+        ndarray, shape (n_experiments, n_factors)
+    """
+    if not isinstance(design, pd.DataFrame):
+        return np.asarray(design, dtype=np.float64)
+    if scope is None:
+        x = design.astype(np.float64).values
+        lo, hi = x.min(axis=0), x.max(axis=0)
+        span = np.where(hi > lo, hi - lo, 1.0)
+        return (x - lo) / span
+
+    from ..util.distributions import is_discrete_dist
+    columns = []
+    for p in scope.get_uncertainties() + scope.get_levers():
+        if p.name not in design.columns:
+            continue
+        if p.dtype == 'cat':
+            x = pd.Categorical(design[p.name], categories=p.values).codes.astype(np.float64)
+        else:
+            x = design[p.name].values.astype(np.float64)
+        if is_discrete_dist(p.dist):
+            columns.append(p.dist.cdf(x) - p.dist.pmf(x) / 2)
+        else:
+            columns.append(p.dist.cdf(x))
+    return np.column_stack(columns)
+
+
+def nearest_neighbor_distances(x):
+    """
+    The distance from each point to its nearest neighbor.
+
+    Uses a KD-tree, so this takes O(n log n) time for n points.
+
+    Args:
+        x (array-like, shape (n_points, n_factors)): Points.
+
+    Returns:
+        ndarray, shape (n_points,)
+    """
+    x = np.asarray(x, dtype=np.float64)
+    if len(x) < 2:
+        return np.full(len(x), np.inf)
+    distances, _ = cKDTree(x).query(x, k=2)
+    return distances[:, 1]
+
+
+def maximin_distance(x):
+    """
+    The smallest distance between any two points.
+
+    Space-filling designs make this large.
+
+    Args:
+        x (array-like, shape (n_points, n_factors)): Points, usually
+            in the unit hypercube.
+
+    Returns:
+        float
+    """
+    return float(nearest_neighbor_distances(x).min())
+
+
+def centered_l2_discrepancy(x, chunk_size=256):
+    """
+    The centered L2 discrepancy of points in the unit hypercube.
+
+    The discrepancy measures how far the empirical distribution of the
+    points is from uniform, over boxes anchored at corners of the unit
+    hypercube, and is smaller for more uniform designs.  It is computed
+    exactly, which takes O(n² d) time for n points in d dimensions, but
+    only O(n · chunk_size) memory.
+
+    Args:
+        x (array-like, shape (n_points, n_factors)): Points in the unit
+            hypercube.
+        chunk_size (int, default 256): The number of points compared
+            to all the others at one time.
+
+    Returns:
+        float
+    """
+    x = np.asarray(x, dtype=np.float64)
+    n, d = x.shape
+    z = np.abs(x - 0.5)
+    single = np.prod(1 + 0.5 * z - 0.5 * z ** 2, axis=1).sum()
+    half_z = 0.5 * z
+    product = np.empty((min(chunk_size, n), n))
+    term = np.empty_like(product)
+    pairs = 0.0
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        p, t = product[:stop - start], term[:stop - start]
+        p.fill(1.0)
+        # each factor of the product over dimensions is made in place,
+        # 1 + z_i/2 + z_j/2 - |x_i - x_j|/2
+        for k in range(d):
+            np.subtract.outer(x[start:stop, k], x[:, k], out=t)
+            np.abs(t, out=t)
+            t *= -0.5
+            t += half_z[None, :, k]
+            t += (1 + half_z[start:stop, k])[:, None]
+            p *= t
+        pairs += p.sum()
+    return float(np.sqrt(max((13 / 12) ** d - 2 / n * single + pairs / n ** 2, 0.0)))
+
+
+def max_abs_correlation(x):
+    """
+    The largest absolute correlation between any two columns.
+
+    Args:
+        x (array-like, shape (n_points, n_factors)): Points.
+
+    Returns:
+        float
+    """
+    x = np.asarray(x, dtype=np.float64)
+    if x.shape[1] < 2:
+        return 0.0
+    correlation = np.corrcoef(x, rowvar=False)
+    return float(np.nanmax(np.abs(correlation[~np.eye(len(correlation), dtype=bool)])))
+
+
+def projection_coverage(x, n_bins=None):
+    """
+    The coverage of each two-dimensional projection of the points.
+
+    Each pair of dimensions of the unit hypercube is divided into a grid of
+    `n_bins` by `n_bins` cells, and the coverage is the fraction of those
+    cells that hold at least one point.  Points are assigned to cells
+    by hashing their grid coordinates, which takes O(n) time for each pair.
+
+    Args:
+        x (array-like, shape (n_points, n_factors)): Points in the unit
+            hypercube.
+        n_bins (int, optional): The number of cells along each dimension.
+            Defaults to the square root of the number of points, so there
+            are about as many cells as points.  Then a random design
+            covers about 63% of the cells, and a design with evenly
+            spread two-dimensional projections nearly all of them.
+
+    Returns:
+        pandas.Series: The coverage, indexed by pairs of dimensions.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    n, d = x.shape
+    if n_bins is None:
+        n_bins = max(int(np.sqrt(n)), 1)
+    cells = np.clip((x * n_bins).astype(np.int64), 0, n_bins - 1)
+    pairs = list(itertools.combinations(range(d), 2))
+    coverage = np.empty(len(pairs))
+    for k, (i, j) in enumerate(pairs):
+        occupied = np.bincount(cells[:, i] * n_bins + cells[:, j], minlength=n_bins * n_bins)
+        coverage[k] = np.count_nonzero(occupied) / (n_bins * n_bins)
+    return pd.Series(coverage, index=pd.MultiIndex.from_tuples(pairs), dtype=np.float64)
+
+
+def design_quality(design, scope=None, discrepancy=True):
+    """
+    Space-filling and projection metrics for a design of experiments.
+
+    Args:
+        design (pandas.DataFrame or array-like): The design, with a row
+            for each experiment.  See `unit_hypercube` for how it is
+            scaled.
+        scope (Scope, optional): The scope of the design, used to scale it.
+        discrepancy (bool, default True): Whether to compute the centered
+            L2 discrepancy, which takes time proportional to the square
+            of the number of experiments.
+
+    Returns:
+        pandas.Series:
+            The number of experiments and of factors; the maximin and mean
+            nearest neighbor distances; the centered L2 discrepancy; the
+            largest absolute correlation between factors; and the
+            smallest and mean coverage of the two-dimensional projections.
+    """
+    x = unit_hypercube(design, scope)
+    nearest = nearest_neighbor_distances(x)
+    coverage = projection_coverage(x)
+    return pd.Series({
+        'n_experiments': len(x),
+        'n_factors': x.shape[1],
+        'maximin_distance': float(nearest.min()),
+        'mean_nearest_distance': float(nearest.mean()),
+        'centered_l2_discrepancy': centered_l2_discrepancy(x) if discrepancy else np.nan,
+        'max_abs_correlation': max_abs_correlation(x),
+        'min_2d_coverage': coverage.min() if len(coverage) else np.nan,
+        'mean_2d_coverage': coverage.mean() if len(coverage) else np.nan,
+    })
+
+
+def _uniform_scope(n_factors):
+    """A scope with `n_factors` independent standard uniform uncertainties."""
+    import yaml
+    from ..scope.scope import Scope
+    scope_def = {
+        'scope': {'name': f'uniform_{n_factors}'},
+        'inputs': {
+            f'x{i:03d}': {'ptype': 'uncertainty', 'dtype': 'float', 'min': 0.0, 'max': 1.0, 'dist': 'uniform'}
+            for i in range(n_factors)
+        },
+        'outputs': {},
+    }
+    return Scope(None, scope_def=yaml.dump(scope_def))
+
+
+def benchmark_samplers(
+        n_factors=(5, 10, 20),
+        n_samples=(100, 1000, 10000),
+        samplers=None,
+        random_seed=0,
+        max_discrepancy_samples=10000,
+):
+    """
+    Time each sampler and score the designs it creates.
+
+    Designs are made with `design_experiments` on scopes of independent
+    standard uniform uncertainties, for every combination of the numbers of
+    factors and of samples.
+
+    Args:
+        n_factors (Collection[int]): The numbers of uncertainties.
+        n_samples (Collection[int]): The numbers of experiments.
+        samplers (Collection[str], optional): Names of samplers to compare.
+            Defaults to all of the named samplers available to
+            `design_experiments`, except univariate sensitivity tests.
+        random_seed (int, default 0): The random seed for every design.
+        max_discrepancy_samples (int, default 10000): Skip the centered L2
+            discrepancy for larger designs, as its time grows with the
+            square of the number of experiments.
+
+    Returns:
+        pandas.DataFrame:
+            The metrics from `design_quality` and the time to create
+            the design in seconds, with a row for each sampler, number of
+            factors and number of samples.
+    """
+    from .experimental_design import design_experiments, samplers as named_samplers
+    if samplers is None:
+        samplers = list(named_samplers)
+    rows = []
+    for d in n_factors:
+        scope = _uniform_scope(d)
+        for n in n_samples:
+            for sampler in samplers:
+                start = time.perf_counter()
+                design = design_experiments(scope, n_samples=n, random_seed=random_seed, sampler=sampler)
+                seconds = time.perf_counter() - start
+                quality = design_quality(design, scope, discrepancy=n <= max_discrepancy_samples)
+                _logger.info(f"{sampler} with {d} factors and {n} samples in {seconds:.3f} seconds")
+                quality = quality.drop(['n_experiments', 'n_factors'])
+                rows.append(dict(n_factors=d, n_samples=n, sampler=sampler, seconds=seconds, **quality))
+    return pd.DataFrame(rows).set_index(['n_factors', 'n_samples', 'sampler'])
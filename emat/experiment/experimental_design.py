@@ -2,6 +2,7 @@
 
 import os
 import time
+import itertools
 import numpy as np
 import pandas as pd
 
@@ -16,15 +17,21 @@ from .samplers import (
     AbstractSampler,
     UniformLHSSampler,
     MonteCarloSampler,
+    CorrelatedSampler,
     CorrelatedLHSSampler,
     CorrelatedMonteCarloSampler,
     TrimmedUniformLHSSampler,
+    SobolSampler,
+    HaltonSampler,
 )
 
 samplers = {
     'lhs': CorrelatedLHSSampler,
+    'olhs': lambda: CorrelatedLHSSampler(optimize=True),
     'ulhs': UniformLHSSampler,
     'mc': CorrelatedMonteCarloSampler,
+    'sobol': SobolSampler,
+    'halton': HaltonSampler,
     'ulhs99': lambda: TrimmedUniformLHSSampler(0.01),
     'ulhs98': lambda: TrimmedUniformLHSSampler(0.02),
     'ulhs95': lambda: TrimmedUniformLHSSampler(0.05),
@@ -40,6 +47,8 @@ def design_experiments(
         sampler = 'lhs',
         sample_from = 'all',
         jointly = True,
+        chunk_size: int = None,
+        lazy: bool = False,
 ):
     """
     Create a design of experiments based on a Scope.
@@ -63,10 +72,17 @@ def design_experiments(
         sampler (str or AbstractSampler, default 'lhs'): The sampler to use for this
             design.  Available pre-defined samplers include:
                 - 'lhs': Latin Hypercube sampling
+                - 'olhs': Latin Hypercube sampling, optimized for low correlation
+                    between parameters and for spread between experiments (see
+                    `CorrelatedLHSSampler` to set the optimization time)
                 - 'ulhs': Uniform Latin Hypercube sampling, which ignores defined
                     distribution shapes from the scope and samples everything
                     as if it was from a uniform distribution
                 - 'mc': Monte carlo sampling
+                - 'sobol': Scrambled Sobol low-discrepancy sampling, which
+                    covers the space more evenly than random sampling, and is
+                    most even when the number of samples is a power of 2
+                - 'halton': Scrambled Halton low-discrepancy sampling
                 - 'uni': Univariate sensitivity testing, whereby experiments are
                     generated setting each parameter individually to minimum and
                     maximum values (for numeric dtypes) or all possible values
@@ -81,9 +97,27 @@ def design_experiments(
             for levers and uncertainties, and then combine the two in a full-factorial
             manner.  This argument has no effect unless `sample_from` is 'all'.
             Note that jointly may produce a very large design;
+        chunk_size (int, optional): Stream the design into the database
+            `db` instead of returning it, generating and writing this many
+            experiments at a time, so that very large designs can be made
+            in a fixed amount of memory.  Each chunk is sampled separately,
+            with its own random seed derived from `random_seed`, so that
+            the design is reproducible.  Latin hypercube samplers then give
+            a Latin hypercube in each chunk, not over the whole design.
+            If `jointly` is False, the uncertainties and levers are each
+            sampled once, and their full-factorial combination is written
+            to the database in chunks of this size.
+        lazy (bool, default False): If `jointly` is False, return the
+            full-factorial design as a `FactorialDesign`, which holds
+            only the separate samples of uncertainties and levers and
+            makes the combined experiments as they are needed, instead of
+            as a DataFrame with every combination.  If a `db` is given,
+            the experiments are written to it in chunks.
 
     Returns:
-        pandas.DataFrame: The resulting design.
+        pandas.DataFrame, FactorialDesign or StreamedDesign:
+            The resulting design, or if `chunk_size` is given, a handle
+            to read the design from the database.
     """
     if db is False:
         db = None
@@ -134,6 +168,30 @@ def design_experiments(
     else:
         sample_generator = sampler
 
+    if chunk_size is not None:
+        if db is None:
+            raise ValueError('a database is required to stream a design')
+        if sample_from != 'all':
+            raise ValueError("streaming a design requires sample_from='all'")
+
+    if chunk_size is not None and jointly:
+        parms = [i for i in scope.get_uncertainties()] + [i for i in scope.get_levers()]
+        if n_samples is None:
+            n_samples = n_samples_per_factor * len(parms)
+        n_chunks = -(-n_samples // chunk_size)
+        chunk_seeds = np.random.SeedSequence(random_seed).spawn(n_chunks)
+        for chunk_number, chunk_seed in enumerate(chunk_seeds):
+            np.random.seed(chunk_seed.generate_state(1)[0])
+            design = _sample_design(
+                scope,
+                sample_generator,
+                parms,
+                min(chunk_size, n_samples - chunk_number * chunk_size),
+            )
+            db.write_experiment_parameters(scope.name, design_name, design)
+            _logger.info(f"wrote chunk {chunk_number + 1} of {n_chunks} for design {design_name}")
+        return StreamedDesign(db, scope.name, design_name, n_samples)
+
     np.random.seed(random_seed)
 
     if sample_from == 'all' and not jointly:
@@ -146,18 +204,30 @@ def design_experiments(
         else:
             n_samples_u = n_samples_l = n_samples
 
-        samples_u = sample_generator.generate_designs(scope.get_uncertainties(), n_samples_u)
-        samples_u.kind = dict
-        design_u = pd.DataFrame.from_records([_ for _ in samples_u])
+        design_u = _sample_frame(sample_generator, scope.get_uncertainties(), n_samples_u)
+        design_l = _sample_frame(sample_generator, scope.get_levers(), n_samples_l)
 
-        samples_l = sample_generator.generate_designs(scope.get_levers(), n_samples_l)
-        samples_l.kind = dict
-        design_l = pd.DataFrame.from_records([_ for _ in samples_l])
+        design = FactorialDesign(
+            design_u,
+            design_l,
+            {i.name: i.default for i in scope.get_constants()},
+        )
 
-        design_u["____"] = 0
-        design_l["____"] = 0
-        design = pd.merge(design_u, design_l, on='____')
-        design.drop('____', 1, inplace=True)
+        if lazy or chunk_size is not None:
+            if db is not None:
+                experiment_ids = []
+                for chunk in design.iter_chunks(chunk_size or 10000):
+                    experiment_ids.append(np.asarray(
+                        db.write_experiment_parameters(scope.name, design_name, chunk),
+                        dtype=np.int64,
+                    ))
+                design.index = pd.Index(np.concatenate(experiment_ids), name='experiment')
+                _logger.info(f"wrote {len(design)} experiments for design {design_name}")
+                if chunk_size is not None and not lazy:
+                    return StreamedDesign(db, scope.name, design_name, len(design))
+            return design
+
+        design = design.to_frame()
 
     else:
         parms = []
@@ -168,13 +238,13 @@ def design_experiments(
 
         if n_samples is None:
             n_samples = n_samples_per_factor * len(parms)
-        samples = sample_generator.generate_designs(parms, n_samples)
-        samples.kind = dict
-        design = pd.DataFrame.from_records([_ for _ in samples])
-
-    if sample_from in ('all', 'constants'):
-        for i in scope.get_constants():
-            design[i.name] = i.default
+        design = _sample_design(
+            scope,
+            sample_generator,
+            parms,
+            n_samples,
+            with_constants=sample_from in ('all', 'constants'),
+        )
 
     if db is not None and sample_from is 'all':
         experiment_ids = db.write_experiment_parameters(scope.name, design_name, design)
@@ -184,6 +254,231 @@ def design_experiments(
     return design
 
 
+def _sample_frame(sample_generator, parms, n_samples):
+    """Sample a design for some parameters as a DataFrame."""
+    if isinstance(sample_generator, CorrelatedSampler):
+        # correlated samplers build whole columns at once
+        return sample_generator.generate_design_frame(parms, n_samples)
+    samples = sample_generator.generate_designs(parms, n_samples)
+    samples.kind = dict
+    return pd.DataFrame.from_records([_ for _ in samples])
+
+
+def _sample_design(scope, sample_generator, parms, n_samples, with_constants=True):
+    """Sample a design for some parameters, with constants at their defaults."""
+    design = _sample_frame(sample_generator, parms, n_samples)
+    if with_constants:
+        for i in scope.get_constants():
+            design[i.name] = i.default
+    return design
+
+
+class FactorialDesign:
+    """
+    A full-factorial design of experiments, made lazily.
+
+    Every sample of uncertainties is combined with every sample of levers,
+    but only the two sets of samples are stored, and the combined
+    experiments are made when they are accessed, so the design needs
+    memory proportional to the sum of the numbers of samples instead of
+    their product.  Experiment `i` combines uncertainty sample
+    `i // n_levers` with lever sample `i % n_levers`, in the same order as
+    the DataFrame that `design_experiments` otherwise creates.
+
+    This is returned by `design_experiments` when `jointly` is False
+    and `lazy` is True.
+
+    Args:
+        uncertainty_design (pandas.DataFrame): Samples of uncertainties.
+        lever_design (pandas.DataFrame): Samples of levers.
+        constants (Mapping, optional): Values of constants, which are
+            the same in every experiment.
+        index (pandas.Index, optional): Labels for the experiments, such
+            as their experiment ids in a database.  Defaults to
+            positions.
+    """
+
+    def __init__(self, uncertainty_design, lever_design, constants=None, index=None):
+        self.uncertainty_design = uncertainty_design.reset_index(drop=True)
+        self.lever_design = lever_design.reset_index(drop=True)
+        self.constants = dict(constants or {})
+        self.index = index
+
+    @property
+    def index(self):
+        """pandas.Index: Labels for the experiments."""
+        return self._index
+
+    @index.setter
+    def index(self, index):
+        if index is None:
+            index = pd.RangeIndex(len(self))
+        elif len(index) != len(self):
+            raise ValueError(f"index has {len(index)} labels for {len(self)} experiments")
+        index = pd.Index(index)
+        if (
+                len(index) > 1
+                and index.is_integer()
+                and not isinstance(index, pd.RangeIndex)
+                and np.all(np.diff(index.values) == 1)
+        ):
+            # experiment ids written in one go are consecutive
+            index = pd.RangeIndex(index[0], index[-1] + 1, name=index.name)
+        self._index = index
+
+    def __len__(self):
+        return len(self.uncertainty_design) * len(self.lever_design)
+
+    def __repr__(self):
+        return (
+            f"<FactorialDesign {len(self.uncertainty_design)} uncertainty samples "
+            f"x {len(self.lever_design)} lever samples, {len(self)} experiments>"
+        )
+
+    @property
+    def columns(self):
+        """pandas.Index: The names of the experiment parameters."""
+        return pd.Index(
+            list(self.uncertainty_design.columns)
+            + list(self.lever_design.columns)
+            + list(self.constants)
+        )
+
+    @property
+    def shape(self):
+        return len(self), len(self.columns)
+
+    @property
+    def empty(self):
+        return len(self) == 0
+
+    def take(self, positions):
+        """
+        Make the experiments at some positions in the design.
+
+        Args:
+            positions (array-like of int): Positions of the experiments,
+                negative values counting from the end.
+
+        Returns:
+            pandas.DataFrame
+        """
+        n = len(self)
+        positions = np.asarray(positions, dtype=np.int64).reshape(-1)
+        positions = np.where(positions < 0, positions + n, positions)
+        if positions.size and (positions.min() < 0 or positions.max() >= n):
+            raise IndexError(f"positions out of range for a design of {n} experiments")
+        n_levers = len(self.lever_design)
+        design = pd.concat(
+            [
+                self.uncertainty_design.take(positions // n_levers).reset_index(drop=True),
+                self.lever_design.take(positions % n_levers).reset_index(drop=True),
+            ],
+            axis=1,
+        )
+        for name, value in self.constants.items():
+            design[name] = value
+        design.index = self.index[positions]
+        return design
+
+    @property
+    def iloc(self):
+        """
+        Positional access to experiments, like `pandas.DataFrame.iloc`.
+
+        An integer gives a single experiment as a Series, and a slice
+        or an array of integers gives a DataFrame of experiments.
+        """
+        return _FactorialDesignIndexer(self)
+
+    def iter_chunks(self, chunk_size=10000):
+        """
+        Make the experiments in the design in chunks.
+
+        Args:
+            chunk_size (int, default 10000): The number of experiments
+                in each chunk.
+
+        Yields:
+            pandas.DataFrame: Consecutive experiments.
+        """
+        for start in range(0, len(self), chunk_size):
+            yield self.take(np.arange(start, min(start + chunk_size, len(self))))
+
+    def to_frame(self):
+        """
+        Make every experiment in the design.
+
+        Returns:
+            pandas.DataFrame
+        """
+        return self.take(np.arange(len(self)))
+
+
+class _FactorialDesignIndexer:
+
+    def __init__(self, design):
+        self.design = design
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self.design.take(np.arange(*key.indices(len(self.design))))
+        if np.ndim(key) == 0:
+            return self.design.take([key]).iloc[0]
+        return self.design.take(key)
+
+
+class StreamedDesign:
+    """
+    A handle on a design of experiments stored in a database.
+
+    This is returned by `design_experiments` when a design is streamed
+    into a database, instead of the design itself, which may be too large
+    to hold in memory.
+
+    Args:
+        db (Database): The database holding the design.
+        scope_name (str): The name of the scope.
+        design_name (str): The name of the design.
+        n_experiments (int): The number of experiments in the design.
+    """
+
+    def __init__(self, db, scope_name, design_name, n_experiments):
+        self.db = db
+        self.scope_name = scope_name
+        self.design_name = design_name
+        self.n_experiments = n_experiments
+
+    def __len__(self):
+        return self.n_experiments
+
+    def __repr__(self):
+        return (
+            f"<StreamedDesign '{self.design_name}' for scope "
+            f"'{self.scope_name}', {self.n_experiments} experiments>"
+        )
+
+    def iter_chunks(self, chunk_size=10000):
+        """
+        Read the design from the database in chunks.
+
+        Args:
+            chunk_size (int, default 10000): The number of experiments
+                in each chunk.
+
+        Yields:
+            pandas.DataFrame: Experiments, indexed by experiment id.
+        """
+        return self.db.iter_experiment_parameters(self.scope_name, self.design_name, chunk_size)
+
+    def read(self):
+        """
+        Read the whole design from the database.
+
+        Returns:
+            pandas.DataFrame: Experiments, indexed by experiment id.
+        """
+        return self.db.read_experiment_parameters(self.scope_name, self.design_name)
 
 def design_sensitivity_tests(
         s: Scope,
@@ -250,7 +545,11 @@ def design_sensitivity_tests(
     return design
 
 
-def minimum_weighted_distance(fixed_points, other_points, weights):
+def _weighted_sq_norms(points, weights):
+    return np.einsum('ij,ij->i', points * weights, points)
+
+
+def minimum_weighted_distance(fixed_points, other_points, weights, chunk_size=4096):
     """
     Compute minimum weighted distance from one array of points to another.
 
@@ -268,25 +567,210 @@ def minimum_weighted_distance(fixed_points, other_points, weights):
             A set of weights by dimension.
             The values in this vector should correspond to the columns
             in `fixed_points` and `other_points`.
+        chunk_size (int, default 4096):
+            The number of rows of `other_points` to process at once, which
+            bounds the memory used to chunk_size × len(fixed_points) values.
 
     Returns:
         numpy.ndarray:
-            The values correspond to the rows in `other_points`.
+            The values correspond to the rows in `other_points`.  These
+            are weighted squared distances.
     """
     array1 = np.asarray(fixed_points, dtype=float)
     array2 = np.asarray(other_points, dtype=float)
     w = np.asarray(weights, dtype=float).reshape(1, -1)
-    result = np.zeros(array2.shape[0], dtype=float)
+    result = np.full(array2.shape[0], np.inf)
+    if array1.shape[0] == 0:
+        return result
+
+    # |a-b|² = |a|² + |b|² - 2a·b, with the cross terms from a matrix product
+    sq1 = _weighted_sq_norms(array1, w)
+    array1_w = array1 * w
+    for start in range(0, array2.shape[0], chunk_size):
+        chunk = array2[start:start + chunk_size]
+        d = chunk @ array1_w.T
+        d *= -2
+        d += sq1
+        d += _weighted_sq_norms(chunk, w)[:, None]
+        result[start:start + chunk_size] = d.min(axis=1)
+    return np.maximum(result, 0, out=result)
+
+
+class _MaximinSelection:
+    """
+    Incremental maximin selection of points from a pool of candidates.
+
+    The weighted squared distance from every candidate to the nearest
+    selected point (or fixed point) is kept as an array, along with which
+    selected point that is, and the distance to the second nearest.  Adding
+    a point then compares every candidate against that one point only, in
+    O(n_candidates × n_dimensions) time, and removing one restores the
+    second nearest distance for the candidates it was nearest to, so only
+    the candidates for which it was nearest or second nearest need their
+    distances to the selected points recomputed.
+
+    Args:
+        fixed_points (array-like): Points that are always selected,
+            such as existing experiments.
+        candidates (array-like): The pool of candidates.
+        weights (vector): Weights by dimension.
+        n_slots (int): The number of points to select.
+        chunk_size (int): The number of candidates for which distances
+            to all the selected points are computed at once.
+    """
+
+    _FIXED = -1
+    _NONE = -2
+
+    def __init__(self, fixed_points, candidates, weights, n_slots, chunk_size=256):
+        self.candidates = np.asarray(candidates, dtype=float)
+        self.weights = np.asarray(weights, dtype=float).reshape(1, -1)
+        self._candidates_w = self.candidates * self.weights
+        self._sq = _weighted_sq_norms(self.candidates, self.weights)
+        self.fixed_distance = minimum_weighted_distance(fixed_points, self.candidates, self.weights)
+        n = self.candidates.shape[0]
+        self.slots = np.full(n_slots, -1, dtype=np.intp)
+        self.slot_of = np.full(n, -1, dtype=np.intp)
+        self.chunk_size = chunk_size
+        self._pending = np.zeros(0, dtype=np.intp)
+        self._undo = None
+        self.nearest = self.fixed_distance.copy()
+        self.nearest_owner = np.full(n, self._FIXED, dtype=np.intp)
+        self.second = np.full(n, np.inf)
+        self.second_owner = np.full(n, self._NONE, dtype=np.intp)
+
+    def distance_to(self, j):
+        """Weighted squared distances from all candidates to candidate `j`."""
+        d = self.candidates @ self._candidates_w[j]
+        d *= -2
+        d += self._sq
+        d += self._sq[j]
+        d[j] = 0
+        return d
+
+    def add(self, slot, j):
+        """Select candidate `j` into an empty slot."""
+        self._settle()
+        d = self.distance_to(j)
+        # only candidates for which the new point is nearer than the
+        # second nearest so far need any change
+        rows = np.flatnonzero(d < self.second)
+        d = np.maximum(d[rows], 0)
+        nearest = self.nearest[rows]
+        nearest_owner = self.nearest_owner[rows]
+        closer = d < nearest
+        self.second[rows] = np.where(closer, nearest, d)
+        self.second_owner[rows] = np.where(closer, nearest_owner, slot)
+        self.nearest[rows] = np.where(closer, d, nearest)
+        self.nearest_owner[rows] = np.where(closer, slot, nearest_owner)
+        self.slots[slot] = j
+        self.slot_of[j] = slot
+
+    def remove(self, slot):
+        """
+        Empty a slot, and return the candidate it held.
+
+        The nearest distances are updated at once, but the second nearest
+        distances are only recomputed when another point is added, as the
+        removal can instead be reversed with `restore`.
+        """
+        self._settle()
+        j = self.slots[slot]
+        self.slots[slot] = -1
+        self.slot_of[j] = -1
+        rows = np.flatnonzero((self.nearest_owner == slot) | (self.second_owner == slot))
+        nearest = self.nearest[rows]
+        nearest_owner = self.nearest_owner[rows]
+        second = self.second[rows]
+        second_owner = self.second_owner[rows]
+        self._undo = (slot, j, rows, nearest, nearest_owner, second, second_owner)
+        promote = nearest_owner == slot
+        self.nearest[rows] = np.where(promote, second, nearest)
+        self.nearest_owner[rows] = np.where(promote, second_owner, nearest_owner)
+        self._pending = rows
+        return j
+
+    def restore(self):
+        """Reverse the last `remove`."""
+        slot, j, rows, nearest, nearest_owner, second, second_owner = self._undo
+        self.nearest[rows] = nearest
+        self.nearest_owner[rows] = nearest_owner
+        self.second[rows] = second
+        self.second_owner[rows] = second_owner
+        self.slots[slot] = j
+        self.slot_of[j] = slot
+        self._undo = None
+        self._pending = self._pending[:0]
+
+    def _settle(self):
+        """Recompute the second nearest distances left over by `remove`."""
+        rows, self._pending = self._pending, self._pending[:0]
+        owners = np.flatnonzero(self.slots >= 0)
+        for start in range(0, len(rows), self.chunk_size):
+            self._second_nearest(rows[start:start + self.chunk_size], owners)
+
+    def _second_nearest(self, rows, owners):
+        """Find the second nearest fixed or selected point for some candidates."""
+        selected = self.slots[owners]
+        d = self.candidates[rows] @ self._candidates_w[selected].T
+        d *= -2
+        d += self._sq[rows][:, None]
+        d += self._sq[selected]
+        # selected candidates are at zero distance from themselves
+        own = self.slot_of[rows]
+        mine = np.flatnonzero(own >= 0)
+        d[mine, np.searchsorted(owners, own[mine])] = 0
+        # excluding the nearest point, which is already known
+        nearest_owner = self.nearest_owner[rows]
+        mine = np.flatnonzero(nearest_owner >= 0)
+        d[mine, np.searchsorted(owners, nearest_owner[mine])] = np.inf
+        if len(owners):
+            k = np.argmin(d, axis=1)
+            second = np.maximum(d[np.arange(len(rows)), k], 0)
+            second_owner = np.where(np.isinf(second), self._NONE, owners[k])
+        else:
+            second = np.full(len(rows), np.inf)
+            second_owner = np.full(len(rows), self._NONE)
+        fixed = np.where(nearest_owner == self._FIXED, np.inf, self.fixed_distance[rows])
+        use_fixed = fixed < second
+        self.second[rows] = np.where(use_fixed, fixed, second)
+        self.second_owner[rows] = np.where(use_fixed, self._FIXED, second_owner)
+
+
+def _pairs_within_buffer(fixed_points, other_points, weights, buffer_dist):
+    """
+    Find the pairs of fixed and other points within a buffer distance.
+
+    The axes are rescaled by the square root of the weights, so that
+    weighted distances are euclidean distances, and the buffers are found
+    by radius queries on a KD-tree of the other points, one query for each
+    fixed point.
+
+    Returns:
+        Tuple[numpy.ndarray, numpy.ndarray]:
+            Positional indexes of the fixed points and the other points.
+    """
+    from scipy.spatial import cKDTree
+    w = np.sqrt(np.asarray(weights, dtype=float).reshape(1, -1))
+    array1 = np.asarray(fixed_points, dtype=float) * w
+    array2 = np.asarray(other_points, dtype=float) * w
+    if array1.shape[0] == 0 or array2.shape[0] == 0:
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+    # an unbalanced tree is much faster to build, and about as fast to query
+    tree = cKDTree(array2, balanced_tree=False)
+    found = tree.query_ball_point(array1, buffer_dist)
+    lengths = np.fromiter(map(len, found), dtype=np.intp, count=len(found))
+    others = np.fromiter(itertools.chain.from_iterable(found), dtype=np.intp, count=lengths.sum())
+    return np.repeat(np.arange(len(found)), lengths), others
 
-    for i in range(array2.shape[0]):
-        row = array2[i, :].reshape(1, -1)
-        sq_dist_by_axis = (array1 - row) ** 2
-        result[i] = (sq_dist_by_axis * w).sum(1).min()
-    return result
 
 def count_within_buffer(fixed_points, other_points, weights, buffer_dist=1):
     """
-    Count the number of fixed points in a buffer various selected points.
+    Count the number of fixed points in a buffer around various other points.
+
+    Distances are weighted euclidean distances, sqrt(sum(w * (a-b)²)).
+    The buffers are found with radius queries on a KD-tree, instead of by
+    computing the distance between every pair of fixed and other points.
 
     Args:
         fixed_points (array-like):
@@ -307,25 +791,20 @@ def count_within_buffer(fixed_points, other_points, weights, buffer_dist=1):
             A buffer distance.
 
     Returns:
-        pandas.DataFrame:
-            The columns of the returned data correspond to the columns
-            in the `weights` input, and the row correspond to the rows
-            int the `df2` argument.
+        numpy.ndarray:
+            The number of fixed points within `buffer_dist` of each
+            of the rows in `other_points`.
     """
-    array1 = np.asarray(fixed_points, dtype=float)
-    array2 = np.asarray(other_points, dtype=float)
-    w = np.asarray(weights, dtype=float).reshape(1, -1)
-    result = np.zeros(array2.shape[0], dtype=int)
+    n = np.asarray(other_points).shape[0]
+    _, other = _pairs_within_buffer(fixed_points, other_points, weights, buffer_dist)
+    return np.bincount(other, minlength=n)
 
-    for i in range(array2.shape[0]):
-        row = array2[i, :].reshape(1, -1)
-        distances = np.sqrt(((array1 - row) ** 2) * w)
-        result[i] = (distances <= buffer_dist).sum()
-    return result
 
 def value_within_buffer(fixed_points, fixed_values, other_points, weights, buffer_dist=1):
     """
-    Count the number of fixed points in a buffer various selected points.
+    Total the values of the fixed points in a buffer around various other points.
+
+    Distances are weighted euclidean distances, as for `count_within_buffer`.
 
     Args:
         fixed_points (array-like):
@@ -349,21 +828,14 @@ def value_within_buffer(fixed_points, fixed_values, other_points, weights, buffe
             A buffer distance.
 
     Returns:
-        pandas.DataFrame:
-            The columns of the returned data correspond to the columns
-            in the `weights` input, and the row correspond to the rows
-            int the `df2` argument.
+        numpy.ndarray:
+            The total of `fixed_values` for the fixed points within
+            `buffer_dist` of each of the rows in `other_points`.
     """
-    array1 = np.asarray(fixed_points, dtype=float)
-    array2 = np.asarray(other_points, dtype=float)
-    w = np.asarray(weights, dtype=float).reshape(1, -1)
-    result = np.zeros(array2.shape[0], dtype=float)
-
-    for i in range(array2.shape[0]):
-        row = array2[i, :].reshape(1, -1)
-        distances = np.sqrt(((array1 - row) ** 2) * w)
-        result[i] = fixed_values[distances <= buffer_dist].sum()
-    return result
+    n = np.asarray(other_points).shape[0]
+    values = np.asarray(fixed_values, dtype=float).reshape(-1)
+    fixed, other = _pairs_within_buffer(fixed_points, other_points, weights, buffer_dist)
+    return np.bincount(other, weights=values[fixed], minlength=n).astype(float)
 
 
 def minimum_weighted_distances(df1, df2, weights):
@@ -404,86 +876,41 @@ def minimum_weighted_distances(df1, df2, weights):
     return result
 
 
-def _pick_one_new_experiment(
-        existing_experiments,
-        proposed_experiments,
+def _buffer_bonus(
         possible_experiments,
         dimension_weights,
         future_experiments,
         future_experiments_std,
         buffer_weighting=1,
-        debug=None,
 ):
     """
-    Pick a single new experiment from a candidate population.
-
-    Args:
-        existing_experiments (pandas.DataFrame):
-            A set of existing experiments.  These experiments have
-            already been run through the core model and results are
-            available.  The data of this DataFrame should all be
-            of a format that is or can be cast to floating point
-            (i.e., no strings or categorical data).
-        proposed_experiments (pandas.DataFrame):
-            The set of existing experiments, plus any other experiments
-            that are already proposed to be completed.
-        possible_experiments (pandas.DataFrame):
-            A set of possible experiments.  These experiments have
-            not been run through the core model and computed full results
-            are not available.  The format of this DataFrame should be
-            identical to `existing_experiments` in data types and columns.
-        output_weights (Mapping):
-            The keys of this mapping correspond to output measures from
-            the core model and the values are relative importance weights.
-        distance_scales (pandas.DataFrame):
-            The distance scales to use.  The rows of this DataFrame should
-            correspond to the columns in the `experiments` arguments, and
-            the columns to keys in the `output_weights`.  Typically, this
-            argument is the inverse of the result from the
-            `get_length_scales` method of a `emat.MetaModel` that has been
-            fit on the existing experiment results.
+    The bonus for candidates near future experiments with uncertain results.
 
-    Returns:
-        int
-            The row number from possible_experiments that is selected.
+    This does not depend on which experiments are selected, so it is
+    computed once for each batch.
     """
-    mwd = minimum_weighted_distance(
-        proposed_experiments,
+    if future_experiments is None:
+        return 0
+    cwb = value_within_buffer(
+        future_experiments,
+        future_experiments_std,
         possible_experiments,
-        dimension_weights
-    )
+        dimension_weights,
+        buffer_dist=1,
+    ).astype(float)
+    cwb /= cwb.max()
+    return buffer_weighting * cwb
 
-    if future_experiments is not None:
-        cwb = value_within_buffer(
-            future_experiments,
-            future_experiments_std,
-            possible_experiments,
-            dimension_weights,
-            buffer_dist=1,
-        ).astype(float)
-        cwb /= cwb.max()
 
-        if debug:
-            from matplotlib import pyplot as plt
-            plt.clf()
-            scat = plt.scatter(possible_experiments[debug[0]], possible_experiments[debug[1]], c=mwd)
-            plt.colorbar(scat)
-            plt.scatter(proposed_experiments[debug[0]], proposed_experiments[debug[1]], color='red')
-            plt.scatter(existing_experiments[debug[0]], existing_experiments[debug[1]], color='pink', marker='x')
-            plt.title("minimum weighted distance")
-            plt.show()
-            plt.clf()
-            scat = plt.scatter(possible_experiments[debug[0]], possible_experiments[debug[1]], c=cwb)
-            plt.colorbar(scat)
-            plt.scatter(proposed_experiments[debug[0]], proposed_experiments[debug[1]], color='red')
-            plt.scatter(existing_experiments[debug[0]], existing_experiments[debug[1]], color='pink', marker='x')
-            plt.title("count within buffer")
-            plt.show()
-
-        mwd = mwd + (buffer_weighting * cwb)
-
-    new_candidate_experiment = mwd.argmax()
-    return new_candidate_experiment
+def _debug_plot(possible_experiments, values, title, existing_experiments, proposed_experiments, debug):
+    from matplotlib import pyplot as plt
+    plt.clf()
+    scat = plt.scatter(possible_experiments[debug[0]], possible_experiments[debug[1]], c=values)
+    plt.colorbar(scat)
+    plt.scatter(proposed_experiments[debug[0]], proposed_experiments[debug[1]], color='red')
+    plt.scatter(existing_experiments[debug[0]], existing_experiments[debug[1]], color='pink', marker='x')
+    plt.title(title)
+    plt.show()
 
 
 def batch_pick_new_experiments(
@@ -499,6 +926,12 @@ def batch_pick_new_experiments(
     """
     Pick a batch of new experiments from a candidate population.
 
+    The minimum weighted distance from each candidate to the existing and
+    selected experiments is kept up to date incrementally as experiments
+    are selected and exchanged (see `_MaximinSelection`), so each pick
+    takes time proportional to the number of candidates, instead of to
+    the number of candidates times the number of experiments.
+
     Args:
         existing_experiments (pandas.DataFrame):
             A set of existing experiments.  These experiments have
@@ -529,60 +962,56 @@ def batch_pick_new_experiments(
             This contains `batch_size` rows selected from
             `possible_experiments`.
     """
-    proposed_experiments = existing_experiments.copy()
+    selection = _MaximinSelection(
+        existing_experiments,
+        possible_experiments,
+        dimension_weights,
+        batch_size,
+    )
+    bonus = _buffer_bonus(
+        possible_experiments,
+        dimension_weights,
+        future_experiments,
+        future_experiments_std,
+        buffer_weighting=buffer_weighting,
+    )
+
+    def pick():
+        if debug:
+            proposed = pd.concat([existing_experiments, possible_experiments.iloc[selection.slots[selection.slots >= 0]]])
+            _debug_plot(possible_experiments, selection.nearest, "minimum weighted distance",
+                        existing_experiments, proposed, debug)
+            if future_experiments is not None:
+                _debug_plot(possible_experiments, bonus, "count within buffer",
+                            existing_experiments, proposed, debug)
+        if future_experiments is None:
+            return int(np.argmax(selection.nearest))
+        return int(np.argmax(selection.nearest + bonus))
 
     # Initial selection, greedy
     for i in range(batch_size):
-        new_candidate_experiment = _pick_one_new_experiment(
-            existing_experiments,
-            proposed_experiments,
-            possible_experiments,
-            dimension_weights,
-            future_experiments,
-            future_experiments_std,
-            buffer_weighting=buffer_weighting,
-            debug=debug,
-        )
-        proposed_experiments = proposed_experiments.append(possible_experiments.iloc[new_candidate_experiment])
-        _logger.info(f"selecting {proposed_experiments.index[-1]}")
-
-    new_experiments = proposed_experiments.iloc[-batch_size:]
+        new_candidate_experiment = pick()
+        selection.add(i, new_candidate_experiment)
+        _logger.info(f"selecting {possible_experiments.index[new_candidate_experiment]}")
 
     # Fedorov Exchanges
     n_exchanges = 1
     while n_exchanges > 0:
         n_exchanges = 0
         for i in range(batch_size):
-            provisionally_dropping = new_experiments.index[i]
-            proposed_experiments = pd.concat([
-                existing_experiments,
-                new_experiments.drop(new_experiments.index[i])
-            ])
-            # new_candidate_experiment = minimum_weighted_distance(
-            #     proposed_experiments,
-            #     possible_experiments,
-            #     dimension_weights
-            # ).argmax()
-            new_candidate_experiment = _pick_one_new_experiment(
-                existing_experiments,
-                proposed_experiments,
-                possible_experiments,
-                dimension_weights,
-                future_experiments,
-                future_experiments_std,
-                buffer_weighting=buffer_weighting,
-                debug=debug,
-            )
-            provisional_replacement = possible_experiments.index[new_candidate_experiment]
-            if provisional_replacement != provisionally_dropping:
+            provisionally_dropping = selection.remove(i)
+            new_candidate_experiment = pick()
+            if new_candidate_experiment == provisionally_dropping:
+                selection.restore()
+            else:
+                selection.add(i, new_candidate_experiment)
                 n_exchanges += 1
-                new_index = new_experiments.index.tolist()
-                new_index[i] = provisional_replacement
-                new_experiments.index = new_index
-                new_experiments.iloc[i] = possible_experiments.iloc[new_candidate_experiment]
-                _logger.info(f"replacing {provisionally_dropping} with {provisional_replacement}")
+                _logger.info(
+                    f"replacing {possible_experiments.index[provisionally_dropping]} "
+                    f"with {possible_experiments.index[new_candidate_experiment]}"
+                )
         _logger.info(f"{n_exchanges} exchanges completed.")
-    return new_experiments
+    return possible_experiments.iloc[selection.slots]
 
 
 
@@ -623,56 +1052,32 @@ def heuristic_batch_pick_experiment(
         poorness_of_fit=None,
         plot=True,
 ):
-    _logger.info(f"Computing Density")
-    candidate_density = candidate_experiments.apply(lambda x: scope.get_density(x), axis=1)
-
-    if poorness_of_fit is None:
-        _logger.info(f"Computing Poorness of Fit")
-        crossval = metamodel.function.cross_val_scores()
-        poorness_of_fit = dict(1 - crossval)
-
-    proposed_candidate_ids = set()
-    proposed_candidates = None
-
-    for i in range(batch_size):
-        metamodel.function.regression.set_hypothetical_training_points(proposed_candidates)
-        proposed_id = heuristic_pick_experiment(
-            metamodel,
-            candidate_experiments,
-            poorness_of_fit,
-            candidate_density,
-            plot=plot,
-        )
-        proposed_candidate_ids.add(proposed_id)
-        proposed_candidates = candidate_experiments.loc[proposed_candidate_ids]
-
-    proposed_candidate_ids = list(proposed_candidate_ids)
-
-    # Exchanges
-    n_exchanges = 1
-    while n_exchanges > 0:
-        n_exchanges = 0
-        for i in range(batch_size):
-            provisionally_dropping = proposed_candidate_ids[i]
-            metamodel.function.regression.set_hypothetical_training_points(
-                candidate_experiments.loc[set(proposed_candidate_ids) - {provisionally_dropping}]
-            )
-            provisional_replacement = heuristic_pick_experiment(
-                metamodel,
-                candidate_experiments,
-                poorness_of_fit,
-                candidate_density,
-                plot=plot,
-            )
-            if provisional_replacement not in proposed_candidate_ids:
-                n_exchanges += 1
-                proposed_candidate_ids[i] = provisional_replacement
-                _logger.info(f"Replacing {provisionally_dropping} with {provisional_replacement}")
-        _logger.info(f"{n_exchanges} Exchanges completed.")
+    """
+    Select a batch of new experiments where a meta-model is least certain.
 
+    See `MetaModel.heuristic_batch_pick_experiment`.
 
+    Args:
+        batch_size (int): How many experiments to select.
+        metamodel (PythonCoreModel): A core model wrapping a `MetaModel`.
+        candidate_experiments (pandas.DataFrame): A pool of candidate
+            experiments, from which the batch is selected.
+        scope (Scope): The exploratory scope.
+        poorness_of_fit (Mapping, optional): Weights for the standard
+            deviation of each output.
+        plot (bool, default True): Plot the value of the candidates
+            at each pick.
 
-    metamodel.function.regression.clear_hypothetical_training_points()
-    return proposed_candidates
+    Returns:
+        pandas.DataFrame:
+            A subset of rows from `candidate_experiments`
+    """
+    return metamodel.function.heuristic_batch_pick_experiment(
+        batch_size,
+        candidate_experiments,
+        scope,
+        poorness_of_fit=poorness_of_fit,
+        plot=plot,
+    )
 
 
@@ -1,3 +1,4 @@
+import time
 import numpy
 from scipy.optimize import minimize_scalar
 from scipy.stats import norm
@@ -5,6 +6,11 @@ from scipy.stats import norm
 
 def lhs(n_factors, n_samples, genepool=10000, random_in_cell=True):
     """
+    Latin hypercube sample, with columns chosen from a pool of permutations.
+
+    This compares every pair of columns in the pool, which takes memory
+    proportional to `genepool` squared; `optimized_lhs` is better suited to
+    large samples.
 
     Parameters
     ----------
@@ -43,6 +49,186 @@ def lhs(n_factors, n_samples, genepool=10000, random_in_cell=True):
     return lhs
 
 
+
+def _random_generator(random_state):
+    if random_state is None:
+        return numpy.random.mtrand._rand
+    if isinstance(random_state, numpy.random.RandomState):
+        return random_state
+    return numpy.random.RandomState(random_state)
+
+
+def _phi_sum(levels, inverse_power, chunk_size=None):
+    """
+    Sum of inverse rectilinear distances between samples, to the power p.
+
+    Distances between integer levels are integers, so `inverse_power` is
+    a table of d⁻ᵖ by distance d, with zero for d = 0.
+    """
+    n, k = levels.shape
+    if chunk_size is None:
+        chunk_size = max(1, 2 ** 22 // (n * k))
+    total = 0.0
+    for start in range(0, n, chunk_size):
+        chunk = levels[start:start + chunk_size]
+        total += inverse_power[numpy.abs(chunk[:, None, :] - levels[None, :, :]).sum(axis=2)].sum()
+    return total / 2
+
+
+def optimized_lhs(
+        n_factors,
+        n_samples,
+        maximin_weight=0.5,
+        n_iter=None,
+        time_budget=None,
+        random_in_cell=True,
+        random_state=None,
+        p=15,
+        maximin_max_samples=2000,
+):
+    """
+    Latin hypercube sample, optimized for low correlation and spread.
+
+    Starting from a random Latin hypercube, pairs of levels within a column
+    are exchanged by simulated annealing, to minimize a combined criterion
+    as proposed by Joseph and Hung (2008), which weights the mean squared
+    correlation between columns against the maximin criterion of Morris and
+    Mitchell (1995), the sum of inverse rectilinear distances between samples
+    to the power `p`, each relative to its value for the initial random
+    hypercube.  Both criteria are updated incrementally for each exchange,
+    without any `n_samples` by `n_samples` matrix, so memory use is
+    O(n_samples × n_factors).  Each exchange takes O(n_factors) time for the
+    correlation, plus O(n_samples × n_factors) for the maximin criterion.
+
+    Parameters
+    ----------
+    n_factors : int
+        The number of columns to sample
+    n_samples : int
+        The number of Latin hypercube samples (rows)
+    maximin_weight : float, default 0.5
+        The weight of the maximin criterion, between 0 and 1.  The rest
+        of the weight is on the correlation between columns.
+    n_iter : int, optional
+        The number of exchanges to try.  Defaults to 10 times the number
+        of samples times the number of factors, but no more than 20000.
+    time_budget : float, optional
+        A limit on the optimization time, in seconds.  The annealing
+        schedule is compressed to fit, so the result then depends on the
+        speed of the computer and is not exactly reproducible.
+    random_in_cell : bool, default True
+        If true, a uniform random point in each hypercube cell
+                is chosen, otherwise the center point in each cell is chosen.
+    random_state : int, RandomState instance or None, optional
+        If None, the global numpy random state is used.
+    p : int, default 15
+        The power used in the maximin criterion.
+    maximin_max_samples : int, default 2000
+        The maximin criterion is ignored for samples larger than this,
+        as its initial evaluation takes O(n_samples² × n_factors) time.
+
+    Returns
+    -------
+    ndarray
+        Shape (n_factors, n_samples), as for `lhs`.
+
+    References
+    ----------
+    Joseph, V.R., and Hung, Y., 2008. "Orthogonal-maximin Latin hypercube
+        designs." Statistica Sinica 18, 171–186.
+    Morris, M.D., and Mitchell, T.J., 1995. "Exploratory designs for
+        computational experiments." Journal of Statistical Planning and
+        Inference 43, 381–402.
+    """
+    rng = _random_generator(random_state)
+    n, k = n_samples, n_factors
+    levels = numpy.column_stack([rng.permutation(n) for _ in range(k)])
+    if n_iter is None:
+        n_iter = min(10 * n * k, 20000)
+
+    if k > 1 and n > 2 and n_iter > 0:
+        centered = levels - (n - 1) / 2
+        # every column has the same variance, so correlations are cross
+        # products scaled by a constant
+        scale = (n * (n * n - 1) / 12) ** 2 * (k * (k - 1) / 2)
+        cross = centered.T @ centered
+        numpy.fill_diagonal(cross, 0)
+        rho2 = (cross ** 2).sum() / 2 / scale
+
+        use_maximin = maximin_weight > 0 and n <= maximin_max_samples
+        if use_maximin:
+            inverse_power = numpy.arange(k * (n - 1) + 1, dtype=numpy.float64)
+            inverse_power[1:] **= -p
+            inverse_power[0] = 0
+            phi_sum = _phi_sum(levels, inverse_power)
+            # each criterion is measured relative to the initial hypercube
+            rho2_weight = (1 - maximin_weight) / rho2 if rho2 > 0 else 0.0
+            phi_weight = maximin_weight / phi_sum ** (1 / p)
+
+            def objective(rho2, phi_sum):
+                return rho2_weight * rho2 + phi_weight * phi_sum ** (1 / p)
+        else:
+            phi_sum = 0.0
+
+            def objective(rho2, phi_sum):
+                return rho2
+
+        current = objective(rho2, phi_sum)
+        temperature = t_start = 0.05 * current
+        t_end = 1e-5 * t_start
+        start_time = time.time()
+
+        block = 100
+        for iteration in range(n_iter):
+            if iteration % block == 0:
+                progress = iteration / n_iter
+                if time_budget is not None:
+                    elapsed = (time.time() - start_time) / time_budget
+                    if elapsed >= 1:
+                        break
+                    progress = max(progress, elapsed)
+                temperature = t_start * (t_end / t_start) ** progress
+                columns = rng.randint(k, size=block)
+                rows_a = rng.randint(n, size=block)
+                rows_b = rng.randint(n - 1, size=block)
+                rows_b[rows_b >= rows_a] += 1
+                thresholds = rng.rand(block)
+            j, a, b = columns[iteration % block], rows_a[iteration % block], rows_b[iteration % block]
+            row_a, row_b = centered[a], centered[b]
+            cross_change = (row_b[j] - row_a[j]) * (row_a - row_b)
+            cross_change[j] = 0
+            new_cross = cross[j] + cross_change
+            new_rho2 = rho2 + ((new_cross ** 2).sum() - (cross[j] ** 2).sum()) / scale
+            new_phi_sum = phi_sum
+            if use_maximin:
+                # rectilinear distances from a and b to every sample, before
+                # and after the exchange, which changes neither the distance
+                # between a and b nor the zero distances to themselves
+                dist = numpy.abs(levels - levels[[a, b], None, :]).sum(axis=2)
+                shift = numpy.abs(levels[:, j] - levels[b, j]) - numpy.abs(levels[:, j] - levels[a, j])
+                shift[[a, b]] = 0
+                new_phi_sum = phi_sum + (
+                    inverse_power[dist[0] + shift].sum() + inverse_power[dist[1] - shift].sum()
+                    - inverse_power[dist].sum()
+                )
+            proposed = objective(new_rho2, new_phi_sum)
+            change = proposed - current
+            if change <= 0 or thresholds[iteration % block] < numpy.exp(-change / temperature):
+                centered[a, j], centered[b, j] = row_b[j], row_a[j]
+                levels[a, j], levels[b, j] = levels[b, j], levels[a, j]
+                cross[j] = new_cross
+                cross[:, j] = new_cross
+                rho2, phi_sum, current = new_rho2, new_phi_sum, proposed
+
+    lhs = levels.T.astype(numpy.float64)
+    if random_in_cell:
+        lhs += rng.rand(*(lhs.shape))
+    else:
+        lhs += 0.5
+    lhs /= n_samples
+    return lhs
+
+
 def _avg_off_diag(a):
     upper = numpy.triu_indices(a.shape[0], 1)
     lower = numpy.tril_indices(a.shape[0], -1)
@@ -92,9 +278,17 @@ def induce_correlation(h, corr, rows=None, inplace=False):
 
 
 def lhs_corr(n_factors, n_samples, genepool=10, sigma=None,
-             random_in_cell=True):
+             random_in_cell=True, random_state=None):
     """
-    Correlated LHS.  Works only in theory, or for low correllation / small sample sizes
+    Correlated Latin hypercube sample.
+
+    An uncorrelated Latin hypercube sample is made with `lhs`, and
+    the values in each column are then reordered to follow the ranks of
+    normal scores with exactly the correlation `sigma`, as in Iman and
+    Conover, "A distribution-free approach to inducing rank correlation
+    among input variables", Commun. Stat. Simul. Comput. 11, 311-334 (1982).
+    Reordering keeps every column a Latin hypercube sample, and the rank
+    correlation of the result is close to `sigma`, with no rerolling.
 
     Parameters
     ----------
@@ -109,60 +303,26 @@ def lhs_corr(n_factors, n_samples, genepool=10, sigma=None,
     random_in_cell : bool, default True
         If true, a uniform random point in each hypercube cell is chosen, otherwise the
         center point in each cell is chosen.
+    random_state : int, RandomState instance or None, optional
+        Used to shuffle the normal scores.  Defaults to the global numpy
+        random state.
 
     Returns
     -------
     ndarray
     """
-    keepers = []
-    candidates = numpy.empty([genepool, n_samples], dtype=numpy.float64)
-    keeper_corr = numpy.zeros([n_factors, genepool])
-    corr = None
-
-    def _reroll():
-        nonlocal candidates, keepers, corr
-        for i in range(genepool):
-            if i not in keepers:
-                candidates[i, :] = numpy.random.permutation(n_samples)
-        corr = numpy.corrcoef(candidates)
-        o_corr = corr[corr < 0.999]
-        # print("max_o_corr",numpy.max(o_corr))
-        for j in range(len(keepers)):
-            keeper_corr[j, :] = corr[keepers[j], :]
-
-    _reroll()
-
+    lhs_ = lhs(n_factors, n_samples, genepool=max(genepool, n_factors), random_in_cell=random_in_cell)
     if sigma is None:
-        sigma = numpy.eye(n_factors)
+        return lhs_
+    rng = _random_generator(random_state)
 
-    # initially keep the first column
-    keepers.append(0)
-    for j in range(n_factors - 1):
-        # load in the previously determined correlation row
-        keeper_corr[j, :] = corr[keepers[-1], :]
-        # ident the relevant part of sigma for comparing
-        sig_part = sigma[j + 1, :j + 1]
-        print("sig_part", sig_part)
-        for repeat in range(50000):
-            # find the closest match in the gene pool for target correlation
-            kc = keeper_corr[:j + 1, :]
-            kc = kc[kc < 0.999]
-            if repeat % 1000 == 0:
-                print(repeat, "max_corr", numpy.max(kc))
-            sq_diff_from_target = ((keeper_corr[:j + 1, :] - sig_part[:, None])
-                                   **2).sum(0)
-            k = numpy.argmin(sq_diff_from_target)
-            if sq_diff_from_target[k] < 0.001:
-                break
-            else:
-                _reroll()
-        keepers.append(k)
-        print(keepers)
+    # independent normal scores, shuffled in each row, adjusted to have
+    # exactly the correlation `sigma` instead of their sample correlation
+    scores = norm.ppf(numpy.arange(1, n_samples + 1) / (n_samples + 1))
+    scores = numpy.stack([rng.permutation(scores) for _ in range(n_factors)])
+    target = numpy.linalg.cholesky(sigma)
+    actual = numpy.linalg.cholesky(numpy.corrcoef(scores))
+    scores = target @ numpy.linalg.solve(actual, scores)
 
-    lhs = candidates[keepers, :].copy()
-    if random_in_cell:
-        lhs += numpy.random.rand(*(lhs.shape))
-    else:
-        lhs += 0.5
-    lhs /= n_samples
-    return lhs
+    ranks = numpy.argsort(numpy.argsort(scores, axis=1), axis=1)
+    return numpy.take_along_axis(numpy.sort(lhs_, axis=1), ranks, axis=1)
@@ -0,0 +1,258 @@
+import numpy
+
+from .latin_hypercube import _random_generator
+
+# The number of bits in each coordinate of a Sobol point, which also
+# limits the number of points to 2**_SOBOL_BITS.
+_SOBOL_BITS = 30
+
+# Primitive polynomials and initial direction numbers for Sobol sequences,
+# for dimensions 2 through 40, from S. Joe and F. Y. Kuo, "Constructing
+# Sobol sequences with better two-dimensional projections", SIAM J. Sci.
+# Comput. 30, 2635-2654 (2008).  Each entry gives the degree `s` of the
+# polynomial, the integer `a` encoding its interior coefficients, and
+# the initial direction numbers `m`.
+_JOE_KUO = (
+    (1, 0, (1,)),
+    (2, 1, (1, 3)),
+    (3, 1, (1, 3, 1)),
+    (3, 2, (1, 1, 1)),
+    (4, 1, (1, 1, 3, 3)),
+    (4, 4, (1, 3, 5, 13)),
+    (5, 2, (1, 1, 5, 5, 17)),
+    (5, 4, (1, 1, 5, 5, 5)),
+    (5, 7, (1, 1, 7, 11, 19)),
+    (5, 11, (1, 1, 5, 1, 1)),
+    (5, 13, (1, 1, 1, 3, 11)),
+    (5, 14, (1, 3, 5, 5, 31)),
+    (6, 1, (1, 3, 3, 9, 7, 49)),
+    (6, 13, (1, 1, 1, 15, 21, 21)),
+    (6, 16, (1, 3, 1, 13, 27, 49)),
+    (6, 19, (1, 1, 1, 15, 7, 5)),
+    (6, 22, (1, 3, 1, 15, 13, 25)),
+    (6, 25, (1, 1, 5, 5, 19, 61)),
+    (7, 1, (1, 3, 7, 11, 23, 15, 103)),
+    (7, 4, (1, 3, 7, 13, 13, 15, 69)),
+    (7, 7, (1, 1, 3, 13, 7, 35, 63)),
+    (7, 8, (1, 3, 5, 9, 1, 25, 53)),
+    (7, 14, (1, 3, 1, 13, 9, 35, 107)),
+    (7, 19, (1, 3, 1, 5, 27, 61, 31)),
+    (7, 21, (1, 1, 5, 11, 19, 41, 61)),
+    (7, 28, (1, 3, 5, 3, 3, 13, 69)),
+    (7, 31, (1, 1, 7, 13, 1, 19, 1)),
+    (7, 32, (1, 3, 7, 5, 13, 19, 59)),
+    (7, 37, (1, 1, 3, 9, 25, 29, 41)),
+    (7, 41, (1, 3, 5, 13, 23, 1, 55)),
+    (7, 42, (1, 3, 7, 3, 13, 59, 17)),
+    (7, 50, (1, 3, 1, 3, 5, 53, 69)),
+    (7, 55, (1, 1, 5, 5, 23, 33, 13)),
+    (7, 56, (1, 1, 7, 7, 1, 61, 123)),
+    (7, 59, (1, 1, 7, 9, 13, 61, 49)),
+    (7, 62, (1, 3, 3, 5, 3, 55, 33)),
+    (8, 14, (1, 3, 1, 15, 31, 13, 49, 245)),
+    (8, 21, (1, 3, 5, 15, 31, 59, 63, 97)),
+    (8, 22, (1, 3, 1, 11, 11, 11, 77, 249)),
+)
+
+
+def _is_primitive(s, a):
+    """
+    Check if a polynomial over GF(2) is primitive.
+
+    The polynomial has degree `s`, leading and constant coefficients of 1,
+    and interior coefficients given by the bits of `a`.
+    """
+    poly = (1 << s) | (a << 1) | 1
+    order = (1 << s) - 1
+    # x is a primitive element if its multiplicative order is exactly 2**s - 1
+    factors = [q for q in range(2, order + 1) if order % q == 0 and all(q % r for r in range(2, int(q ** 0.5) + 1))]
+
+    def power_of_x(e):
+        result, base = 1, 2
+        while e:
+            if e & 1:
+                result = _gf2_mulmod(result, base, poly, s)
+            base = _gf2_mulmod(base, base, poly, s)
+            e >>= 1
+        return result
+
+    return power_of_x(order) == 1 and all(power_of_x(order // q) != 1 for q in factors)
+
+
+def _gf2_mulmod(x, y, poly, s):
+    result = 0
+    while y:
+        if y & 1:
+            result ^= x
+        y >>= 1
+        x <<= 1
+        if x >> s:
+            x ^= poly
+    return result
+
+
+def _sobol_parameters(n_factors):
+    """
+    Polynomials and initial direction numbers for `n_factors` dimensions.
+
+    Beyond the dimensions tabulated by Joe and Kuo, the following primitive
+    polynomials are used in order, with initial direction numbers drawn
+    from a fixed random stream, so the sequence remains reproducible.
+    """
+    params = list(_JOE_KUO[:max(n_factors - 1, 0)])
+    if len(params) < n_factors - 1:
+        s, a, _ = params[-1]
+        rng = numpy.random.RandomState(0)
+        while len(params) < n_factors - 1:
+            a += 1
+            if a >= 1 << (s - 1):
+                s, a = s + 1, 0
+            if _is_primitive(s, a):
+                m = tuple(2 * rng.randint(0, 1 << k) + 1 for k in range(s))
+                params.append((s, a, m))
+    return params
+
+
+def _sobol_direction_numbers(n_factors):
+    """
+    Direction numbers for a Sobol sequence.
+
+    Returns
+    -------
+    ndarray, shape (n_factors, _SOBOL_BITS)
+        The direction numbers for each dimension, as integers with their
+        most significant bit at position `_SOBOL_BITS - 1`.
+    """
+    L = _SOBOL_BITS
+    v = numpy.zeros((n_factors, L), dtype=numpy.int64)
+    if n_factors == 0:
+        return v
+    v[0] = 1 << numpy.arange(L - 1, -1, -1)
+    for j, (s, a, m) in enumerate(_sobol_parameters(n_factors), start=1):
+        for k in range(L):
+            if k < s:
+                v[j, k] = m[k] << (L - 1 - k)
+            else:
+                value = v[j, k - s] ^ (v[j, k - s] >> s)
+                for i in range(1, s):
+                    if (a >> (s - 1 - i)) & 1:
+                        value ^= v[j, k - i]
+                v[j, k] = value
+    return v
+
+
+def sobol(n_factors, n_samples, scramble=True, random_state=None):
+    """
+    Sobol low-discrepancy sample of the unit hypercube.
+
+    The points are the first `n_samples` points of a Sobol sequence, using
+    the direction numbers of Joe and Kuo.  The balance properties of the
+    sequence are best when `n_samples` is a power of 2.  Scrambling applies
+    a random linear matrix scramble and a random digital shift to each
+    dimension, which keeps the low discrepancy of the sequence while
+    making the sample random, so that estimates made from it are unbiased
+    and their error can be gauged by repeating with different seeds.
+
+    Parameters
+    ----------
+    n_factors : int
+        The number of columns to sample
+    n_samples : int
+        The number of points to sample, at most 2**30.
+    scramble : bool, default True
+        Whether to scramble the sequence.
+    random_state : int, RandomState instance or None, optional
+        Used to scramble the sequence.  Defaults to the global numpy
+        random state.
+
+    Returns
+    -------
+    ndarray, shape (n_factors, n_samples)
+        Points in the open unit hypercube, each at the center of the
+        smallest cell of the sequence that contains it.
+    """
+    L = _SOBOL_BITS
+    if n_samples > 1 << L:
+        raise ValueError(f"a Sobol sample can have at most {1 << L} points")
+    v = _sobol_direction_numbers(n_factors)
+    shift = numpy.zeros(n_factors, dtype=numpy.int64)
+    if scramble:
+        rng = _random_generator(random_state)
+        powers = 1 << numpy.arange(L - 1, -1, -1, dtype=numpy.int64)
+        for j in range(n_factors):
+            # lower triangular binary matrix with unit diagonal, acting
+            # on the bits of the direction numbers, most significant first
+            scrambler = numpy.tril(rng.randint(0, 2, size=(L, L)), -1) + numpy.eye(L, dtype=numpy.int64)
+            bits = (v[j][None, :] >> (L - 1 - numpy.arange(L))[:, None]) & 1
+            v[j] = powers @ ((scrambler @ bits) % 2)
+        shift[:] = rng.randint(0, 1 << L, size=n_factors)
+
+    index = numpy.arange(n_samples, dtype=numpy.int64)
+    gray = index ^ (index >> 1)
+    points = numpy.repeat(shift[:, None], n_samples, axis=1)
+    for k in range(max(int(n_samples - 1).bit_length(), 1)):
+        has_bit = ((gray >> k) & 1).astype(bool)
+        points[:, has_bit] ^= v[:, k:k + 1]
+    return (points + 0.5) / (1 << L)
+
+
+def _primes(n):
+    """The first `n` prime numbers."""
+    primes = []
+    candidate = 2
+    while len(primes) < n:
+        if all(candidate % p for p in primes if p * p <= candidate):
+            primes.append(candidate)
+        candidate += 1
+    return primes
+
+
+def halton(n_factors, n_samples, scramble=True, random_state=None):
+    """
+    Halton low-discrepancy sample of the unit hypercube.
+
+    Each dimension is the radical inverse of the point index in a
+    different prime base.  Scrambling applies an independent random
+    permutation to each digit of the radical inverse, which breaks up
+    the correlation between dimensions with large bases that otherwise
+    makes plain Halton samples poor in more than about ten dimensions.
+
+    Parameters
+    ----------
+    n_factors : int
+        The number of columns to sample
+    n_samples : int
+        The number of points to sample.
+    scramble : bool, default True
+        Whether to scramble the sequence.
+    random_state : int, RandomState instance or None, optional
+        Used to scramble the sequence.  Defaults to the global numpy
+        random state.
+
+    Returns
+    -------
+    ndarray, shape (n_factors, n_samples)
+        Points in the open unit hypercube, each at the center of the
+        smallest cell of the sequence that contains it.
+    """
+    rng = _random_generator(random_state) if scramble else None
+    index = numpy.arange(n_samples, dtype=numpy.int64)
+    points = numpy.empty((n_factors, n_samples), dtype=numpy.float64)
+    for j, base in enumerate(_primes(n_factors)):
+        # enough digits to tell all the points apart, and with scrambling,
+        # to place them to about the same precision as Sobol points
+        n_digits = int(numpy.ceil(numpy.log(max(n_samples, 2)) / numpy.log(base))) + 1
+        if scramble:
+            n_digits = max(n_digits, int(numpy.ceil(_SOBOL_BITS * numpy.log(2) / numpy.log(base))))
+        remainder = index.copy()
+        result = numpy.zeros(n_samples, dtype=numpy.float64)
+        scale = 1.0
+        for _ in range(n_digits):
+            scale /= base
+            digit = remainder % base
+            remainder //= base
+            if scramble:
+                digit = rng.permutation(base)[digit]
+            result += digit * scale
+        points[j] = result + scale / 2
+    return points
@@ -3,7 +3,8 @@ import numpy
 import pandas
 import warnings
 import operator
-from scipy import stats
+import functools
+from scipy import stats, special
 from typing import Mapping
 
 from ema_workbench.em_framework.samplers import (
@@ -15,8 +16,9 @@ from ema_workbench.em_framework.samplers import (
 )
 
 from ..exceptions import AsymmetricCorrelationError
+from . import low_discrepancy
 
-def induce_correlation(std_uniform_sample, correlation_matrix, inplace=False):
+def induce_correlation(std_uniform_sample, correlation_matrix, inplace=False, chunk_size=65536):
     """
     Induce correlation in an independent standard uniform sample.
 
@@ -25,6 +27,11 @@ def induce_correlation(std_uniform_sample, correlation_matrix, inplace=False):
     correlation of the uniform sample outputs may have a slightly
     different correlation than the defined `correlation_matrix`.
 
+    Only the columns that are correlated with some other column are
+    transformed, and rows are transformed in chunks, so the temporary
+    memory needed is proportional to `chunk_size` and not to the size
+    of the sample.
+
     Args:
         std_uniform_sample (array-like, shape [M,N]): An initial sample to modify.
             This sample should have M rows, one for each sampled observation
@@ -35,33 +42,159 @@ def induce_correlation(std_uniform_sample, correlation_matrix, inplace=False):
             The correlation matrix that will be induced.  This must be a
             symmetric positive definite matrix with 1's on the diagonal.
         inplace (bool, default False): Whether to modify the input
-            sample in-place.
+            sample in-place.  This requires a float64 numpy array.
+        chunk_size (int, default 65536): The number of rows to transform
+            at one time.
 
     Returns:
         array-like, shape [M,N]: The correlated sample.
     """
-    from scipy.stats import norm
-    std_normal_sample = norm.ppf(std_uniform_sample)
+    correlation_matrix = numpy.asarray(correlation_matrix, dtype=numpy.float64)
+    columns, chol = _cholesky_factor(correlation_matrix)
+    if inplace:
+        _correlate_columns(std_uniform_sample, columns, chol, chunk_size)
+    else:
+        cor_uniform_sample = numpy.array(std_uniform_sample, dtype=numpy.float64)
+        _correlate_columns(cor_uniform_sample, columns, chol, chunk_size)
+        return cor_uniform_sample
 
+
+def _cholesky_factor(correlation_matrix):
+    """
+    The columns involved in any correlation, and the Cholesky factor
+    of the correlation matrix between them.
+    """
+    off_diagonal = correlation_matrix - numpy.eye(len(correlation_matrix))
+    columns = numpy.flatnonzero((off_diagonal != 0).any(axis=0))
     try:
-        chol = numpy.linalg.cholesky(correlation_matrix)
+        chol = numpy.linalg.cholesky(correlation_matrix[numpy.ix_(columns, columns)])
     except numpy.linalg.LinAlgError as err:
         raise numpy.linalg.LinAlgError("failed correlation_matrix is\n"+str(correlation_matrix)) from err
+    return columns, chol
 
-    cor_normal_sample = chol.dot(std_normal_sample.T).T
 
-    if inplace:
-        std_uniform_sample[:, :] = norm.cdf(cor_normal_sample)
-    else:
-        cor_uniform_sample = norm.cdf(cor_normal_sample)
-        return cor_uniform_sample
+def _correlate_columns(sample, columns, chol, chunk_size=65536):
+    """
+    Induce correlation in place, in some columns of a float64 array.
+
+    Each chunk of rows is gathered into a preallocated buffer, taken to
+    standard normal values, multiplied by the Cholesky factor into a
+    second buffer, and taken back to standard uniform values.
+    """
+    if len(columns) == 0:
+        return
+    n_rows = len(sample)
+    normal = numpy.empty((min(chunk_size, n_rows), len(columns)))
+    correlated = numpy.empty_like(normal)
+    for start in range(0, n_rows, chunk_size):
+        stop = min(start + chunk_size, n_rows)
+        x, y = normal[:stop - start], correlated[:stop - start]
+        numpy.take(sample[start:stop], columns, axis=1, out=x)
+        special.ndtri(x, out=x)
+        numpy.matmul(x, chol.T, out=y)
+        special.ndtr(y, out=y)
+        sample[start:stop, columns] = y
+
+
+def _correlation_key(parameters):
+    """A hashable definition of the correlation among some parameters."""
+    return tuple(
+        (p.name, tuple(sorted(dict(getattr(p, 'corr', {})).items())))
+        for p in parameters
+    )
+
+
+@functools.lru_cache(maxsize=32)
+def _correlation_array(correlation_key, validate):
+    """
+    The correlation matrix for parameters, and whether there is any
+    correlation to induce, cached by the correlation definition.
+    """
+    position = {name: i for i, (name, _) in enumerate(correlation_key)}
+    correlation = numpy.eye(len(position))
+    any_corr = False
+    for name, corr in correlation_key:
+        i = position[name]
+        for other_name, other_corr in corr:
+            j = position[other_name]
+            if correlation[i, j] != 0:
+                # When correlation is already set, confirm it is identical
+                # or raise an exception
+                if correlation[i, j] != other_corr:
+                    raise AsymmetricCorrelationError(f"{name}, {other_name}")
+            else:
+                any_corr = True
+                correlation[i, j] = other_corr
+                correlation[j, i] = other_corr
+
+    if any_corr and validate:
+        eigenval, eigenvec = numpy.linalg.eigh(correlation)
+        if numpy.min(eigenval) <= 0:
+            raise numpy.linalg.LinAlgError("correlation matrix is not positive definite")
+        elif numpy.min(eigenval) <= 0.001:
+            warnings.warn("correlation matrix is nearly singular, expect numerical problems")
+
+    correlation.flags.writeable = False
+    return correlation, any_corr
+
+
+@functools.lru_cache(maxsize=32)
+def _cached_cholesky_factor(correlation_key):
+    correlation, any_corr = _correlation_array(correlation_key, True)
+    if not any_corr:
+        return numpy.empty(0, dtype=numpy.intp), numpy.empty((0, 0))
+    columns, chol = _cholesky_factor(correlation)
+    chol.flags.writeable = False
+    return columns, chol
+
+
+def _design_values(param, values):
+    """
+    Convert sampled values of a parameter to design values, as the
+    workbench does for each experiment: integers for integer parameters,
+    and category values for categorical and boolean parameters.
+    """
+    from ema_workbench.em_framework.parameters import (
+        IntegerParameter, BooleanParameter, CategoricalParameter,
+    )
+    values = numpy.asarray(values)
+    if isinstance(param, IntegerParameter):
+        values = values.astype(numpy.int64)
+    if isinstance(param, BooleanParameter):
+        values = (values != 0).astype(numpy.int64)
+    if isinstance(param, CategoricalParameter):
+        categories = numpy.empty(len(param.categories), dtype=object)
+        categories[:] = [param.cat_for_index(i).value for i in range(len(param.categories))]
+        return pandas.Series(categories[values]).infer_objects()
+    return values
 
 
 class CorrelatedSampler(AbstractSampler):
 
+    # whether to sample all parameters jointly as standard uniform
+    # variables, even if there is no correlation to induce
+    joint_std_uniform = False
+
     def sample_std_uniform(self, size):
         raise NotImplementedError
 
+    def generate_std_uniform_array(self, parameters, size):
+        """
+        Generate independent standard uniform samples of parameters.
+
+        Args:
+            parameters (Collection): a collection of emat.Parameter instances.
+            size (int): the number of samples to generate.
+
+        Returns:
+            numpy.ndarray: A float64 array with a row for each sample
+                and a column for each parameter.
+        """
+        smp = numpy.empty((size, len(parameters)), dtype=numpy.float64)
+        for j in range(len(parameters)):
+            smp[:, j] = self.sample_std_uniform(size)
+        return smp
+
     def generate_std_uniform_samples(self, parameters, size):
         '''
         The main method of :class: `~sampler.Sampler` and its
@@ -76,10 +209,10 @@ class CorrelatedSampler(AbstractSampler):
             pandas.DataFrame
 
         '''
-        return pandas.DataFrame({
-            param.name: self.sample_std_uniform(size)
-            for param in parameters
-        })
+        return pandas.DataFrame(
+            self.generate_std_uniform_array(parameters, size),
+            columns=[param.name for param in parameters],
+        )
 
     def get_correlation_matrix(
             self,
@@ -91,6 +224,10 @@ class CorrelatedSampler(AbstractSampler):
         """
         Extract a correlation matrix from parameters.
 
+        Matrices are cached by the names and correlation definitions of
+        the parameters, so repeated designs from the same scope do not
+        build and validate them again.
+
         Args:
             parameters (Collection): Parameters for which to generate the
                 correlation matrix for experimental designs
@@ -109,41 +246,41 @@ class CorrelatedSampler(AbstractSampler):
         """
         if not presorted:
             parameters = sorted(parameters, key=operator.attrgetter('name'))
-        parameter_names = [i.name for i in parameters]
+        correlation, any_corr = _correlation_array(_correlation_key(parameters), validate)
 
-        any_corr = False
+        if not any_corr and none_if_none:
+            return None
 
-        # Define correlation matrix
-        correlation = pandas.DataFrame(
-            data=numpy.eye(len(parameter_names)),
+        parameter_names = [i.name for i in parameters]
+        return pandas.DataFrame(
+            data=correlation.copy(),
             index=parameter_names,
             columns=parameter_names,
         )
-        for p in parameters:
-            corr = dict(getattr(p, 'corr', {}))
-            for other_name, other_corr in corr.items():
-                if correlation.loc[p.name, other_name] != 0:
-                    # When correlation is already set, confirm it is identical
-                    # or raise an exception
-                    if correlation.loc[p.name, other_name] != other_corr:
-                        raise AsymmetricCorrelationError(f"{p.name}, {other_name}")
-                else:
-                    any_corr = True
-                    correlation.loc[p.name, other_name] = other_corr
-                    correlation.loc[other_name, p.name] = other_corr
-
-        if any_corr and validate:
-            eigenval, eigenvec = numpy.linalg.eigh(correlation)
-            if numpy.min(eigenval) <= 0:
-                raise numpy.linalg.LinAlgError("correlation matrix is not positive definite")
-            elif numpy.min(eigenval) <= 0.001:
-                import warnings
-                warnings.warn("correlation matrix is nearly singular, expect numerical problems")
 
-        if not any_corr and none_if_none:
-            return None
+    def _sample_columns(self, parameters, nr_samples):
+        """
+        Sample parameters, which must be sorted by name.
+
+        Returns:
+            dict: The sampled values of each parameter, by name.
+        """
+        # Define correlation matrix
+        correlation = self.get_correlation_matrix(parameters, presorted=True)
+
+        if correlation is None and not self.joint_std_uniform:
+            return self.generate_samples(parameters, nr_samples)
+
+        sampled_parameters = self.generate_std_uniform_array(parameters, nr_samples)
+
+        # Induce correlation, using the cached factorization
+        columns, chol = _cached_cholesky_factor(_correlation_key(parameters))
+        _correlate_columns(sampled_parameters, columns, chol)
 
-        return correlation
+        # Apply distribution shapes
+        for j, p in enumerate(parameters):
+            sampled_parameters[:, j] = p.dist.ppf(sampled_parameters[:, j])
+        return {p.name: sampled_parameters[:, j] for j, p in enumerate(parameters)}
 
     def generate_designs(self, parameters, nr_samples):
         """
@@ -164,21 +301,7 @@ class CorrelatedSampler(AbstractSampler):
                 combining the parameters
         """
         parameters = sorted(parameters, key=operator.attrgetter('name'))
-
-        # Define correlation matrix
-        correlation = self.get_correlation_matrix(parameters, presorted=True)
-
-        if correlation is None:
-            sampled_parameters = self.generate_samples(parameters, nr_samples)
-        else:
-            sampled_parameters = self.generate_std_uniform_samples(parameters, nr_samples)
-
-            # Induce correlation
-            induce_correlation(sampled_parameters.values, correlation.values, inplace=True)
-
-            # Apply distribution shapes
-            for p in parameters:
-                sampled_parameters[p.name] = p.dist.ppf(sampled_parameters[p.name])
+        sampled_parameters = self._sample_columns(parameters, nr_samples)
 
         # Construct designs per usual workbench approach
         designs = zip(*[sampled_parameters[u.name] for u in parameters])
@@ -186,12 +309,75 @@ class CorrelatedSampler(AbstractSampler):
 
         return designs
 
+    def generate_design_frame(self, parameters, nr_samples):
+        """
+        Sample the computational experiments as a DataFrame.
+
+        This gives the same experiments as `generate_designs`, with the
+        same conversion of values for integer, boolean and categorical
+        parameters, but converts whole columns at once instead of
+        making each experiment in turn.
+
+        Args:
+            parameters (Collection): Parameters for which to generate the
+                experimental designs
+            nr_samples (int): the number of samples to draw for each parameter
+
+        Returns:
+            pandas.DataFrame: A column for each parameter, sorted by name.
+        """
+        parameters = sorted(parameters, key=operator.attrgetter('name'))
+        sampled_parameters = self._sample_columns(parameters, nr_samples)
+        return pandas.DataFrame(
+            {p.name: _design_values(p, sampled_parameters[p.name]) for p in parameters},
+            index=pandas.RangeIndex(nr_samples),
+            columns=[p.name for p in parameters],
+        )
+
 
 class CorrelatedLHSSampler(CorrelatedSampler, LHSSampler):
     """
     generates a Latin Hypercube sample for each of the parameters
+
+    Args:
+        optimize (bool, default False): Optimize the Latin Hypercube
+            for low correlation between parameters and for spread between
+            samples, using `emat.experiment.latin_hypercube.optimized_lhs`,
+            before any correlation defined in the scope is induced.
+        maximin_weight (float, default 0.5): The weight on the spread
+            between samples in the optimization, between 0 and 1.
+        n_iter (int, optional): The number of exchanges to try in the
+            optimization.
+        time_budget (float, optional): A limit on the optimization time,
+            in seconds.  With a time budget, designs are not exactly
+            reproducible from the random seed.
     """
 
+    def __init__(self, optimize=False, maximin_weight=0.5, n_iter=None, time_budget=None):
+        super().__init__()
+        self.optimize = optimize
+        self.maximin_weight = maximin_weight
+        self.n_iter = n_iter
+        self.time_budget = time_budget
+
+    @property
+    def joint_std_uniform(self):
+        # an optimized design is made jointly for all parameters
+        return self.optimize
+
+    def generate_std_uniform_array(self, parameters, size):
+        if not self.optimize:
+            return super().generate_std_uniform_array(parameters, size)
+        from .latin_hypercube import optimized_lhs
+        smp = optimized_lhs(
+            len(parameters),
+            size,
+            maximin_weight=self.maximin_weight,
+            n_iter=self.n_iter,
+            time_budget=self.time_budget,
+        )
+        return numpy.ascontiguousarray(smp.T)
+
     def sample_std_uniform(self, size):
         '''
         Generate a standard uniform Latin Hypercube Sample.
@@ -206,7 +392,11 @@ class CorrelatedLHSSampler(CorrelatedSampler, LHSSampler):
 
         perc = numpy.linspace(0, (size - 1) / size, size)
         numpy.random.shuffle(perc)
-        smp = stats.uniform(perc, 1. / size).rvs()
+        # the same draws as stats.uniform(perc, 1. / size).rvs(), without
+        # freezing a distribution for every element of `perc`
+        smp = numpy.random.uniform(0.0, 1.0, size)
+        smp *= 1. / size
+        smp += perc
         return smp
 
 
@@ -228,10 +418,58 @@ class CorrelatedMonteCarloSampler(CorrelatedSampler, MonteCarloSampler):
 
         '''
 
-        smp = stats.uniform().rvs(size)
+        smp = numpy.random.uniform(0.0, 1.0, size)
         return smp
 
 
+class CorrelatedQuasiMonteCarloSampler(CorrelatedSampler):
+    """
+    Generator for scrambled low-discrepancy samples of the parameters.
+
+    Points from a low-discrepancy sequence cover the space of the
+    parameters more evenly than random or Latin hypercube samples, so
+    estimates from them (including meta-models fit to them) reach the
+    same accuracy with fewer experiments.  The standard uniform points are
+    transformed to the distribution of each parameter through its `ppf`,
+    after any correlation defined in the scope is induced.
+
+    Args:
+        scramble (bool, default True): Whether to scramble the sequence,
+            using the numpy global random state.
+    """
+
+    # low-discrepancy points are generated jointly for all parameters
+    joint_std_uniform = True
+
+    # a function from `emat.experiment.low_discrepancy`
+    sequence = None
+
+    def __init__(self, scramble=True):
+        super().__init__()
+        self.scramble = scramble
+
+    def generate_std_uniform_array(self, parameters, size):
+        smp = self.sequence(len(parameters), size, scramble=self.scramble)
+        return numpy.ascontiguousarray(smp.T)
+
+
+class SobolSampler(CorrelatedQuasiMonteCarloSampler):
+    """
+    Generator for scrambled Sobol samples for each of the parameters.
+
+    Sobol samples are most evenly spread when the number of
+    samples is a power of 2.
+    """
+    sequence = staticmethod(low_discrepancy.sobol)
+
+
+class HaltonSampler(CorrelatedQuasiMonteCarloSampler):
+    """
+    Generator for scrambled Halton samples for each of the parameters.
+    """
+    sequence = staticmethod(low_discrepancy.halton)
+
+
 class TrimmedUniformLHSSampler(LHSSampler):
 
     def __init__(self, trim_value=0.01):
@@ -4,6 +4,7 @@ from .base import clone_or_construct
 
 from .boosting import (
 	LinearAndGaussian,
+	LinearAndSparseGaussian,
 	LinearInteractRangeAndGaussian,
 	LinearInteractAndGaussian,
 	LinearPossibleInteractAndGaussian,
@@ -1,11 +1,176 @@
 
+import inspect
 import pandas, numpy
+import scipy.optimize
 from sklearn.gaussian_process import GaussianProcessRegressor
 from sklearn.base import BaseEstimator, RegressorMixin, clone
 from sklearn.gaussian_process.kernels import RBF, ConstantKernel as C
+from sklearn.utils import check_random_state
+from sklearn.utils._joblib import Parallel, delayed
+from scipy.linalg import cholesky, cho_solve, solve_triangular
 
 from .frameable import FrameableMixin
 
+# scikit-learn 0.22 added the option to not clone the kernel for each
+# evaluation of the log marginal likelihood, which is only a speedup
+_LML_KWARGS = (
+	{'clone_kernel': False}
+	if 'clone_kernel' in inspect.signature(GaussianProcessRegressor.log_marginal_likelihood).parameters
+	else {}
+)
+
+
+def _minimize(gpr, obj_func, theta_initial, bounds):
+	"""
+	Minimize `obj_func` with the optimizer of a gaussian process regressor.
+
+	This uses the same (private) method as `GaussianProcessRegressor.fit`,
+	so results match fitting serially, but falls back to the documented
+	behavior of the `optimizer` argument if that method is not available.
+	"""
+	if hasattr(gpr, '_constrained_optimization'):
+		return gpr._constrained_optimization(obj_func, theta_initial, bounds)
+	if callable(gpr.optimizer):
+		return gpr.optimizer(obj_func, theta_initial, bounds=bounds)
+	if gpr.optimizer == "fmin_l_bfgs_b":
+		result = scipy.optimize.minimize(obj_func, theta_initial, method="L-BFGS-B", jac=True, bounds=bounds)
+		return result.x, result.fun
+	raise ValueError(f"Unknown optimizer {gpr.optimizer}.")
+
+
+def _optimize_from(kernel, X, y, alpha, optimizer, theta_initial):
+	"""
+	Optimize kernel hyperparameters from one starting point.
+
+	This is a module level function so it can be run in a worker process.
+	"""
+	gpr = GaussianProcessRegressor(kernel=kernel, alpha=alpha, optimizer=optimizer)
+	gpr.kernel_ = clone(kernel)
+	gpr.X_train_ = X
+	gpr.y_train_ = y
+
+	def obj_func(theta, eval_gradient=True):
+		if eval_gradient:
+			lml, grad = gpr.log_marginal_likelihood(theta, eval_gradient=True, **_LML_KWARGS)
+			return -lml, -grad
+		else:
+			return -gpr.log_marginal_likelihood(theta, **_LML_KWARGS)
+
+	return _minimize(gpr, obj_func, theta_initial, gpr.kernel_.bounds)
+
+
+class _RestartSearch:
+	"""
+	The state of the hyperparameter search for one gaussian process.
+
+	All starting points are drawn up front, in the same order as
+	scikit-learn draws them when fitting serially, so the result
+	does not depend on how the restarts are distributed to workers.
+	"""
+
+	def __init__(self, estimator, X, y):
+		self.kernel = clone(estimator.kernel)
+		self.alpha = estimator.alpha
+		self.optimizer = estimator.optimizer
+		self.n_iter_no_change = estimator.n_iter_no_change
+		self.tol = estimator.tol
+		self.X = X
+		y = numpy.asarray(y, dtype=numpy.float64)
+		if estimator.normalize_y:
+			y = (y - numpy.mean(y, axis=0)) / numpy.std(y, axis=0)
+		self.y = y
+		self.thetas = []
+		if self.optimizer is not None and self.kernel.n_dims > 0:
+			self.thetas.append(self.kernel.theta)
+			if estimator.n_restarts_optimizer > 0:
+				bounds = self.kernel.bounds
+				if not numpy.isfinite(bounds).all():
+					raise ValueError(
+						"Multiple optimizer restarts (n_restarts_optimizer>0) "
+						"requires that all bounds are finite.")
+				rng = check_random_state(estimator.random_state)
+				for iteration in range(estimator.n_restarts_optimizer):
+					self.thetas.append(rng.uniform(bounds[:, 0], bounds[:, 1]))
+		self.optima = []
+		self.best_lml = None
+		self.n_no_change = 0
+		self.done = not self.thetas
+
+	def next_thetas(self):
+		"""The starting points to try in the next round."""
+		start = len(self.optima)
+		if self.n_iter_no_change is None:
+			return self.thetas[start:]
+		# try restarts in rounds, so no more than one round is wasted
+		return self.thetas[start:start + max(self.n_iter_no_change, 1)]
+
+	def record(self, optima):
+		"""Record results, in order, stopping early if they stop improving."""
+		for theta, func_min in optima:
+			self.optima.append((theta, func_min))
+			if self.best_lml is None or -func_min > self.best_lml + self.tol:
+				self.best_lml = -func_min
+				self.n_no_change = 0
+			else:
+				self.n_no_change += 1
+				if self.n_iter_no_change is not None and self.n_no_change >= self.n_iter_no_change:
+					self.done = True
+					break
+		if len(self.optima) == len(self.thetas):
+			self.done = True
+
+	@property
+	def best_theta(self):
+		if not self.optima:
+			return None
+		return self.optima[int(numpy.argmin([f for _, f in self.optima]))][0]
+
+
+def _fit_with_restarts(estimators, X, ys, n_jobs=None):
+	"""
+	Fit gaussian processes, running optimizer restarts in parallel.
+
+	The restarts for all of the estimators are pooled together, so that
+	fitting several outputs at once keeps all the workers busy.  Large
+	training arrays are shared with workers as read-only memory maps.
+
+	Parameters
+	----------
+	estimators : Sequence[AnisotropicGaussianProcessRegressor]
+		Estimators prepared with `_prepare_fit`.
+	X : array-like
+		The training data, shared by all of the estimators.
+	ys : Sequence[array-like]
+		The (standardized) target values for each estimator.
+	n_jobs : int, optional
+		The number of worker processes.
+	"""
+	X_ = numpy.asarray(X, dtype=numpy.float64)
+	searches = [_RestartSearch(e, X_, y) for e, y in zip(estimators, ys)]
+	with Parallel(n_jobs=n_jobs, mmap_mode='r') as parallel:
+		while True:
+			tasks = [
+				(n, theta)
+				for n, search in enumerate(searches) if not search.done
+				for theta in search.next_thetas()
+			]
+			if not tasks:
+				break
+			optima = parallel(
+				delayed(_optimize_from)(
+					searches[n].kernel, searches[n].X, searches[n].y,
+					searches[n].alpha, searches[n].optimizer, theta,
+				)
+				for n, theta in tasks
+			)
+			for n, search in enumerate(searches):
+				search.record([o for (i, _), o in zip(tasks, optima) if i == n])
+	for estimator, search, y in zip(estimators, searches, ys):
+		estimator._fit_tuned(X, y, search.best_theta)
+		estimator.n_optimizer_runs_ = len(search.optima)
+	return estimators
+
+
 class AnisotropicGaussianProcessRegressor(
 	GaussianProcessRegressor,
 	FrameableMixin,
@@ -21,10 +186,16 @@ class AnisotropicGaussianProcessRegressor(
 			standardize_before_fit=True,
 			copy_X_train=True,
 			random_state=None,
+			n_jobs=None,
+			n_iter_no_change=None,
+			tol=1e-4,
 	):
 
 		self.kernel_generator = kernel_generator
 		self.standardize_before_fit = standardize_before_fit
+		self.n_jobs = n_jobs
+		self.n_iter_no_change = n_iter_no_change
+		self.tol = tol
 
 		super().__init__(
 			kernel=None,
@@ -40,6 +211,13 @@ class AnisotropicGaussianProcessRegressor(
 		"""
 		Fit Gaussian process regression model.
 
+		If `n_jobs` is given, the optimizer restarts are run in parallel
+		worker processes.  Starting points are drawn from `random_state`
+		before any are run, so the result does not depend on the number
+		of workers.  If `n_iter_no_change` is given, restarts stop once
+		that many consecutive restarts have failed to improve the best
+		log marginal likelihood by more than `tol`.
+
 		Parameters
 		----------
 		X : array-like, shape = (n_samples, n_features)
@@ -52,7 +230,14 @@ class AnisotropicGaussianProcessRegressor(
 		-------
 		self : returns an instance of self.
 		"""
+		y = self._prepare_fit(X, y)
+		if self.n_jobs is None and self.n_iter_no_change is None:
+			return super().fit(X, y)
+		_fit_with_restarts([self], X, [y], n_jobs=self.n_jobs)
+		return self
 
+	def _prepare_fit(self, X, y):
+		"""Generate the kernel, and standardize the target values."""
 		if self.kernel_generator is None:
 			if self.standardize_before_fit:
 				kernel_generator = lambda dims: RBF([1.0] * dims)
@@ -63,7 +248,10 @@ class AnisotropicGaussianProcessRegressor(
 		self.kernel = kernel_generator(X.shape[1])
 
 		self._pre_fit(X, y)
+		return self._standardize_fit(y)
 
+	def _standardize_fit(self, y):
+		"""Set `standardize_Y` from the target values, and apply it."""
 		if self.standardize_before_fit:
 			y = numpy.copy(y)
 			self.standardize_Y = y.std(axis=0, ddof=0)
@@ -75,8 +263,159 @@ class AnisotropicGaussianProcessRegressor(
 			y /= self.standardize_Y
 		else:
 			self.standardize_Y = None
+		return y
+
+	def _fit_tuned(self, X, y, theta):
+		"""Fit with already optimized kernel hyperparameters."""
+		kernel, optimizer = self.kernel, self.optimizer
+		try:
+			if theta is not None:
+				self.kernel = kernel.clone_with_theta(theta)
+				self.optimizer = None
+			return super().fit(X, y)
+		finally:
+			self.kernel, self.optimizer = kernel, optimizer
+
+	def _fit_columns(self, X, Y, n_jobs=None):
+		"""
+		Fit a clone of this estimator to each column of `Y`.
+
+		The optimizer restarts for all of the columns are run in
+		one pool of `n_jobs` workers (or this estimator's `n_jobs`).
+		"""
+		estimators = [clone(self) for _ in range(Y.shape[1])]
+		ys = [e._prepare_fit(X, Y[:, j]) for j, e in enumerate(estimators)]
+		if n_jobs is None:
+			n_jobs = self.n_jobs
+		return _fit_with_restarts(estimators, X, ys, n_jobs=n_jobs)
+
+	def condition(self, X, y, optimize=False):
+		"""
+		Update a fitted regression model for new training data.
 
-		return super().fit(X, y)
+		The kernel hyperparameters found by `fit` are kept, as is the
+		scaling of the target values, so the model only needs to be
+		conditioned on the new data.  When the new training data starts
+		with all of the previous training data, as it does when new
+		experiments are appended, the Cholesky factor of the kernel matrix
+		is extended for the new rows instead of being recomputed, which
+		takes O(n² k) time for k new rows instead of O(n³).
+
+		Parameters
+		----------
+		X : array-like, shape = (n_samples, n_features)
+			Training data, including the data used previously.
+
+		y : array-like, shape = (n_samples, [n_output_dims])
+			Target values, including those used previously.
+
+		optimize : bool, default False
+			Re-optimize the kernel hyperparameters and the target scaling.
+			The optimizer starts from the previous hyperparameters, without
+			random restarts, which is usually much faster than `fit`.
+
+		Returns
+		-------
+		self : returns an instance of self.
+		"""
+		if optimize:
+			self._pre_fit(X, y)
+			y = self._standardize_fit(numpy.asarray(y, dtype=numpy.float64))
+			kernel, n_restarts = self.kernel, self.n_restarts_optimizer
+			try:
+				self.kernel = self.kernel_
+				self.n_restarts_optimizer = 0
+				super().fit(X, y)
+			finally:
+				self.kernel, self.n_restarts_optimizer = kernel, n_restarts
+			self.n_optimizer_runs_ = 1
+			return self
+
+		if numpy.iterable(self.alpha):
+			raise ValueError("conditioning on new data requires a scalar alpha")
+		X_ = numpy.array(X, dtype=numpy.float64)
+		y_ = numpy.array(y, dtype=numpy.float64)
+		if self.standardize_Y is not None:
+			y_ /= self.standardize_Y
+		if self.normalize_y:
+			y_ = (y_ - self._y_train_mean) / self._y_train_std
+
+		n_old = self.X_train_.shape[0]
+		if X_.shape[0] >= n_old and numpy.array_equal(X_[:n_old], self.X_train_):
+			X_new = X_[n_old:]
+			L = self.L_
+			if len(X_new):
+				# extend the factor of [[K11, K12], [K21, K22]] from the factor L11 of K11
+				L21 = solve_triangular(self.L_, self.kernel_(self.X_train_, X_new), lower=True).T
+				K22 = self.kernel_(X_new)
+				K22[numpy.diag_indices_from(K22)] += self.alpha
+				L22 = cholesky(K22 - L21 @ L21.T, lower=True)
+				L = numpy.block([[self.L_, numpy.zeros((n_old, len(X_new)))], [L21, L22]])
+		else:
+			K = self.kernel_(X_)
+			K[numpy.diag_indices_from(K)] += self.alpha
+			L = cholesky(K, lower=True)
+
+		self.X_train_ = X_
+		self.y_train_ = y_
+		self.L_ = L
+		self._K_inv = None
+		self.alpha_ = cho_solve((L, True), y_)
+		y_2d = y_[:, numpy.newaxis] if y_.ndim == 1 else y_
+		alpha_2d = self.alpha_[:, numpy.newaxis] if self.alpha_.ndim == 1 else self.alpha_
+		self.log_marginal_likelihood_value_ = (
+			-0.5 * numpy.einsum("ik,ik->k", y_2d, alpha_2d)
+			- numpy.log(numpy.diag(L)).sum()
+			- L.shape[0] / 2 * numpy.log(2 * numpy.pi)
+		).sum()
+		return self
+
+	def _loo_predict(self, X, y=None, shifts=None):
+		"""
+		Leave-one-out predictions for the training data, in closed form.
+
+		With the kernel hyperparameters held fixed, the prediction for each
+		training point from all the others is y_i - alpha_i / [K⁻¹]_ii, which
+		needs one inversion of the already factored kernel matrix instead of
+		a new fit for each point (Rasmussen and Williams, 2006, section 5.4.2).
+		The scaling of the target values is held fixed as well.
+
+		Parameters
+		----------
+		X : array-like, shape = (n_samples, n_features)
+			The training data this regression was fit to, used only to
+			label the result.
+		y : ignored
+			The target values are taken from the fitted regression.
+		shifts : array-like, shape = (n_samples, n_samples, [n_output_dims]), optional
+			Changes to the target values when each training point is left
+			out, as from refitting an earlier stage of a boosted regressor
+			without it.  Column `i` gives the change to every target value
+			when point `i` is left out.  The prediction for point i is
+			linear in the other target values, with weights -[K⁻¹]_ij / [K⁻¹]_ii,
+			so these changes are simply added through those weights.
+
+		Returns
+		-------
+		y_loo : array, shape = (n_samples, [n_output_dims])
+		"""
+		if len(X) != self.X_train_.shape[0]:
+			raise ValueError("leave-one-out predictions are only available for the training data")
+		K_inv = cho_solve((self.L_, True), numpy.eye(self.L_.shape[0]))
+		K_inv_diag = numpy.diag(K_inv)
+		if self.alpha_.ndim > 1:
+			K_inv_diag = K_inv_diag[:, numpy.newaxis]
+		y_loo = self.y_train_ - self.alpha_ / K_inv_diag
+		y_loo = y_loo * self._y_train_std + self._y_train_mean
+		if self.standardize_Y is not None:
+			y_loo = y_loo * self.standardize_Y
+		if shifts is not None:
+			shifts = numpy.asarray(shifts, dtype=numpy.float64)
+			y_loo = y_loo + (
+				numpy.einsum('ii...->i...', shifts)
+				- numpy.einsum('ij,ji...->i...', K_inv, shifts) / K_inv_diag
+			)
+		return self._post_predict(X, y_loo)
 
 	def predict(self, X, return_std=False, return_cov=False):
 		"""
@@ -140,7 +479,7 @@ class AnisotropicGaussianProcessRegressor(
 
 		y_hat = self._post_predict(X, y_hat)
 		if y_std is not None:
-			y_std = self._post_predict(X, y_hat)
+			y_std = self._post_predict(X, y_std)
 
 		if y_std is not None:
 			return y_hat, y_std
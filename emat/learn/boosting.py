@@ -1,4 +1,5 @@
 
+import numpy
 import pandas
 from typing import Sequence
 from sklearn.base import RegressorMixin, BaseEstimator, clone
@@ -105,6 +106,75 @@ class BoostedRegressor(_BaseComposition, RegressorMixin, FrameableMixin, CrossVa
 					Y_ = Y_ - self._post_predict(X,e_.predict(X))
 		return self
 
+	def condition(self, X, Y, optimize=False):
+		"""
+		Update a fitted regressor for new training data.
+
+		Each stage that has a `condition` method, like the gaussian
+		process regressors, is updated with its existing hyperparameters;
+		other stages are refit, which is cheap for linear regressions.
+
+		Parameters
+		----------
+		X, Y : array-like
+			Training data, including the data used previously.
+		optimize : bool, default False
+			Passed to the `condition` method of each stage, to also
+			re-optimize hyperparameters from their current values.
+
+		Returns
+		-------
+		self
+		"""
+		self._pre_fit(X, Y)
+		Y_ = Y
+		for n, e_ in enumerate(self.estimators_):
+			if hasattr(e_, 'condition'):
+				e_.condition(X, Y_, optimize=optimize)
+			else:
+				e_.fit(X, Y_)
+			if n+1 < len(self.estimators_):
+				if self._use_cv_predict_n(n):
+					Y_ = Y_ - self._post_predict(X,cross_val_predict(e_,X))
+				else:
+					Y_ = Y_ - self._post_predict(X,e_.predict(X))
+		return self
+
+	def _loo_predict(self, X, Y):
+		"""
+		Closed form leave-one-out predictions for the training data.
+
+		These match refitting without each observation, with the
+		hyperparameters of every stage held fixed (as by `condition`).
+		Leaving an observation out of the first stage changes the
+		residuals that the second stage is fit to, and the second stage
+		accounts for those changes in its own leave-one-out predictions.
+
+		Raises
+		------
+		NotImplementedError
+			If any stage has no closed form leave-one-out predictions,
+			or if more than two stages are used.
+		"""
+		if any(self._use_cv_predict_n(n) for n in range(len(self.estimators_) - 1)):
+			raise NotImplementedError('leave-one-out predictions are not available with use_cv_predict')
+		estimators_ = self.estimators_[:self.prediction_tier]
+		if len(estimators_) > 2:
+			raise NotImplementedError('leave-one-out predictions are not available for more than two stages')
+		for e_ in estimators_:
+			if not hasattr(e_, '_loo_predict'):
+				raise NotImplementedError(f'leave-one-out predictions are not available for {type(e_).__name__}')
+		Y_ = numpy.asarray(Y, dtype=numpy.float64)
+		Y_loo = numpy.asarray(estimators_[0]._loo_predict(X, Y_)).reshape(Y_.shape)
+		if len(estimators_) > 1:
+			first, second = estimators_
+			if not hasattr(first, '_loo_shifts'):
+				raise NotImplementedError(f'leave-one-out predictions are not available after {type(first).__name__}')
+			shifts = first._loo_shifts(X, Y_)
+			Y_ = Y_ - numpy.asarray(first.predict(X)).reshape(Y_.shape)
+			Y_loo = Y_loo + numpy.asarray(second._loo_predict(X, Y_, shifts=shifts)).reshape(Y_.shape)
+		return self._post_predict(X, Y_loo)
+
 	def _set_prediction_tier(self, tier):
 		tier_ = tier
 		if tier is not None:
@@ -119,7 +189,7 @@ class BoostedRegressor(_BaseComposition, RegressorMixin, FrameableMixin, CrossVa
 				raise IndexError(f'invalid tier {tier_}')
 			self.prediction_tier = tier
 
-	def predict(self, X, tier=None):
+	def predict(self, X, tier=None, return_std=False):
 		"""
 		Generate predictions from a set of exogenous data.
 
@@ -132,18 +202,36 @@ class BoostedRegressor(_BaseComposition, RegressorMixin, FrameableMixin, CrossVa
 			levels of stacking. For example, setting to 1 results
 			in only using the very first level of the stack.  If not
 			given, the existing value of `prediction_tier` is used.
+		return_std : bool, default False
+			Also return the standard deviation of the predictions.
+			This is taken from the last level of stacking used,
+			which must support `return_std` (e.g. a Gaussian process
+			regression); the earlier levels are treated as exact.
 
 		"""
 		if tier is None:
 			tier = self.prediction_tier
-		Yhat = self.estimators_[0].predict(X)
-		for n_, e_ in enumerate(self.estimators_[1:]):
-			if n_+1 < tier:
+		estimators_ = self.estimators_[:tier]
+		Ystd = None
+		if return_std and len(estimators_) == 1:
+			Yhat, Ystd = estimators_[0].predict(X, return_std=True)
+		else:
+			Yhat = estimators_[0].predict(X)
+		for n_, e_ in enumerate(estimators_[1:]):
+			if return_std and n_+2 == len(estimators_):
+				y_, Ystd = e_.predict(X, return_std=True)
+				Yhat += y_
+			else:
 				Yhat += e_.predict(X)
 		Yhat = self._post_predict(X, Yhat)
+		if return_std:
+			return Yhat, self._post_predict(X, Ystd)
 		return Yhat
 
-	def cross_val_scores(self, X, Y, cv=5, S=None, random_state=None, n_repeats=None, tier=None, n_jobs=-1):
+	def cross_val_scores(
+			self, X, Y, cv=5, S=None, random_state=None, n_repeats=None, tier=None, n_jobs=-1,
+			cache_dir=None, cache_size=None, callback=None,
+	):
 		"""
 		Calculate the cross validation scores for this model.
 
@@ -171,6 +259,15 @@ class BoostedRegressor(_BaseComposition, RegressorMixin, FrameableMixin, CrossVa
 				Repeat the cross validation exercise this many
 				times, with different random seeds, and return
 				the average result.
+			cache_dir : path-like, optional
+				A directory in which to cache results on disk, so
+				they can be reused in later sessions.  Defaults to
+				the 'cross_val_cache_dir' configuration setting.
+			cache_size : int, optional
+				The maximum total size of `cache_dir`, in bytes.
+			callback : callable, optional
+				Called as `callback(fold, scores)` as the results of
+				each fold arrive, with a dict of scores by output.
 
 		Returns:
 			pandas.Series: The cross-validation scores, by output.
@@ -180,7 +277,8 @@ class BoostedRegressor(_BaseComposition, RegressorMixin, FrameableMixin, CrossVa
 		p = self._cross_validate(
 			X, Y, cv=cv, S=S, random_state=random_state,
 			cache_metadata=self.prediction_tier, n_repeats=n_repeats,
-			n_jobs=n_jobs,
+			n_jobs=n_jobs, cache_dir=cache_dir, cache_size=cache_size,
+			callback=callback,
 		)
 		try:
 			return pandas.Series({j: p[f"test_{j}"].mean() for j in self.Y_columns})
@@ -204,7 +302,9 @@ def LinearAndGaussian(
 		copy_X_train=True,
 		random_state=None,
 		use_cv_predict=False,
-		single_target=False
+		single_target=False,
+		n_iter_no_change=None,
+		tol=1e-4,
 ):
 	"""
 	Create a detrended Gaussian process regressor.
@@ -223,9 +323,10 @@ def LinearAndGaussian(
 		(e.g. data is expected to be already centered).
 
 	n_jobs : int or None, optional (default=None)
-		The number of jobs to use for the computation of the linear model.
-		This will only provide
-		speedups for n_targets > 1 and sufficiently large problems.
+		The number of jobs to use for the computation of the linear model,
+		and the number of worker processes used to run the optimizer
+		restarts for the Gaussian process regressions of all targets.
+		Results do not depend on the number of jobs.
 		``None`` means 1 unless in a :obj:`joblib.parallel_backend` context.
 		``-1`` means using all processors. See :term:`Glossary <n_jobs>`
 		for more details.
@@ -319,6 +420,15 @@ def LinearAndGaussian(
 	single_target : bool, optional (default: False)
 		Whether the target values will be a single dimension or multi-dimensional.
 
+	n_iter_no_change : int, optional
+		If given, stop the optimizer restarts for each target once this many
+		consecutive restarts have not improved the best log marginal
+		likelihood by more than `tol`.
+
+	tol : float, optional (default: 1e-4)
+		The minimum improvement in log marginal likelihood that resets the
+		`n_iter_no_change` count.
+
 
 	Returns
 	-------
@@ -333,7 +443,7 @@ def LinearAndGaussian(
 	if single_target:
 		regressor2 = lambda x: x
 	else:
-		regressor2 = lambda x: MultiOutputRegressor(x)
+		regressor2 = lambda x: MultiOutputRegressor(x, n_jobs=n_jobs)
 
 	return BoostedRegressor(
 		[
@@ -357,6 +467,89 @@ def LinearAndGaussian(
 					standardize_before_fit=standardize_before_fit,
 					copy_X_train=copy_X_train,
 					random_state=random_state,
+					n_jobs=n_jobs if single_target else None,
+					n_iter_no_change=n_iter_no_change,
+					tol=tol,
+				))
+			),
+		],
+		use_cv_predict=use_cv_predict,
+	)
+
+
+def LinearAndSparseGaussian(
+		n_inducing=500,
+		fit_intercept=True,
+		n_jobs=None,
+		stats_on_fit=True,
+		kernel_generator=None,
+		alpha=1e-10,
+		optimizer="fmin_l_bfgs_b",
+		n_restarts_optimizer=250,
+		standardize_before_fit=True,
+		random_state=None,
+		use_cv_predict=False,
+		single_target=False,
+		n_iter_no_change=None,
+		tol=1e-4,
+):
+	"""
+	Create a detrended sparse Gaussian process regressor.
+
+	This is like `LinearAndGaussian`, but the Gaussian process regression
+	on the residuals of the linear regression is a
+	`SparseGaussianProcessRegressor`, which uses a subset of the
+	experiments as inducing points.  This is suitable for meta-models
+	fit to many thousands of experiments, where an exact Gaussian
+	process regression is too slow or needs too much memory.
+
+	Parameters
+	----------
+	n_inducing : int, default 500
+		The number of inducing points used for each Gaussian process
+		regression.  These points are selected from the training data
+		so as to spread them evenly across the input space.
+
+	Other parameters are the same as for `LinearAndGaussian`.
+
+	Returns
+	-------
+	BoostedRegressor
+
+	"""
+
+	from .linear_model import LinearRegression
+	from .sparse import SparseGaussianProcessRegressor
+
+	if single_target:
+		regressor2 = lambda x: x
+	else:
+		regressor2 = lambda x: MultiOutputRegressor(x, n_jobs=n_jobs)
+
+	return BoostedRegressor(
+		[
+			(
+				'lr',
+				LinearRegression(
+					fit_intercept=fit_intercept,
+					copy_X=True,
+					n_jobs=n_jobs,
+					stats_on_fit=stats_on_fit,
+				)
+			),
+			(
+				'gpr',
+				regressor2(SparseGaussianProcessRegressor(
+					n_inducing=n_inducing,
+					kernel_generator=kernel_generator,
+					alpha=alpha,
+					optimizer=optimizer,
+					n_restarts_optimizer=n_restarts_optimizer,
+					standardize_before_fit=standardize_before_fit,
+					random_state=random_state,
+					n_jobs=n_jobs if single_target else None,
+					n_iter_no_change=n_iter_no_change,
+					tol=tol,
 				))
 			),
 		],
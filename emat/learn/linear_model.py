@@ -146,6 +146,86 @@ class LinearRegression(_LinearRegression, FrameableMixin, CrossValMixin):
 		y_hat = self._post_predict(X, y_hat)
 		return y_hat
 
+	def _hat_matrix(self, X):
+		"""The hat matrix, which maps the targets to the fitted values."""
+		X1 = numpy.asarray(X, dtype=numpy.float64)
+		if self.fit_intercept:
+			X1 = numpy.column_stack([X1, numpy.ones(X1.shape[0])])
+		return X1 @ numpy.linalg.pinv(X1)
+
+	def _loo_residual(self, X, y, hat):
+		"""The residual of each observation from a fit without it."""
+		leverage = numpy.diag(hat)
+		residual = y - numpy.asarray(self.predict(X)).reshape(y.shape)
+		if y.ndim > 1:
+			leverage = leverage[:, numpy.newaxis]
+		with numpy.errstate(divide='ignore', invalid='ignore'):
+			return residual / (1 - leverage)
+
+	def _loo_predict(self, X, y, shifts=None):
+		"""
+		Leave-one-out predictions for the training data, in closed form.
+
+		Each residual is inflated by the leverage of its observation,
+		e_i / (1 - h_ii), which is the residual from a fit without it.
+
+		Parameters
+		----------
+		X, y : array-like
+			The data this regression was fit to.
+		shifts : array-like, shape = (n_samples, n_samples, [n_targets]), optional
+			Changes to the target values when each observation is left
+			out, as from refitting an earlier stage of a boosted regressor
+			without it.  Column `i` gives the change to every target value
+			when observation `i` is left out.
+
+		Returns
+		-------
+		y_loo : array-like, with the same shape as `y`
+		"""
+		hat = self._hat_matrix(X)
+		y = numpy.asarray(y, dtype=numpy.float64)
+		y_loo = y - self._loo_residual(X, y, hat)
+		if shifts is not None:
+			# the prediction from the other observations is linear in their
+			# target values, ((H y)_i - h_ii y_i) / (1 - h_ii)
+			shifts = numpy.asarray(shifts, dtype=numpy.float64)
+			leverage = numpy.diag(hat)
+			if y.ndim > 1:
+				leverage = leverage[:, numpy.newaxis]
+			with numpy.errstate(divide='ignore', invalid='ignore'):
+				y_loo = y_loo + (
+					numpy.einsum('ij,ji...->i...', hat, shifts)
+					- leverage * numpy.einsum('ii...->i...', shifts)
+				) / (1 - leverage)
+		return self._post_predict(X, y_loo)
+
+	def _loo_shifts(self, X, y):
+		"""
+		Changes to the residuals when each observation is left out.
+
+		Refitting without observation i changes the fitted values by
+		-H[:, i] e_i / (1 - h_ii), so the residuals, which are the target
+		of any later stage of a boosted regressor, change by the opposite.
+
+		Parameters
+		----------
+		X, y : array-like
+			The data this regression was fit to.
+
+		Returns
+		-------
+		shifts : array, shape = (n_samples, n_samples, [n_targets])
+			Column `i` gives the change to every residual when
+			observation `i` is left out.
+		"""
+		hat = self._hat_matrix(X)
+		y = numpy.asarray(y, dtype=numpy.float64)
+		loo_residual = self._loo_residual(X, y, hat)
+		if y.ndim > 1:
+			return hat[:, :, numpy.newaxis] * loo_residual[numpy.newaxis, :, :]
+		return hat * loo_residual[numpy.newaxis, :]
+
 	def coefficients_summary(self):
 		"""
 		A summary DataFrame of the coefficients.
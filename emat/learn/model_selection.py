@@ -1,10 +1,17 @@
 
+import re
+import time
+import inspect
+import numbers
 import pandas, numpy
+import sklearn
 from pandas.util import hash_pandas_object
 from .warnings import ignore_warnings
 
+from sklearn.base import clone
 from sklearn.metrics import r2_score, make_scorer
-from sklearn.exceptions import DataConversionWarning
+from sklearn.exceptions import DataConversionWarning, UndefinedMetricWarning
+from sklearn.utils._joblib import Parallel, delayed
 from sklearn.model_selection import cross_val_score, cross_val_predict, cross_validate
 
 from sklearn.model_selection import StratifiedKFold, KFold, RepeatedKFold, RepeatedStratifiedKFold
@@ -123,6 +130,182 @@ def check_cv(cv='warn', y=None, classifier=False, random_state=None, n_repeats=1
 
 
 
+def _outputs_separable(estimator):
+	"""
+	Whether each output of an estimator is fit independently of the others.
+
+	This is true for linear regressions, for `MultiOutputRegressor`, and
+	for boosted stacks of these, so such estimators can be cross-validated
+	one output at a time with the same results as all outputs at once.
+	"""
+	from sklearn.linear_model import LinearRegression as _LinearRegression
+	from sklearn.multioutput import MultiOutputRegressor
+	from .boosting import BoostedRegressor
+	if isinstance(estimator, BoostedRegressor):
+		return all(_outputs_separable(e) for _, e in estimator.estimators)
+	return isinstance(estimator, (_LinearRegression, MultiOutputRegressor))
+
+
+def _fit_and_predict(estimator, X, Y, train, test, columns, x_columns=None, y_columns=None):
+	"""Fit a clone of an estimator on one training fold, and predict its test fold."""
+	X_train, X_test, Y_train = X[train], X[test], Y[train][:, columns]
+	if x_columns is not None:
+		X_train = pandas.DataFrame(X_train, columns=x_columns)
+		X_test = pandas.DataFrame(X_test, columns=x_columns)
+	if y_columns is not None:
+		Y_train = pandas.DataFrame(Y_train, columns=[y_columns[j] for j in columns])
+	start = time.time()
+	fitted = clone(estimator).fit(X_train, Y_train)
+	fit_time = time.time() - start
+	Y_pred = numpy.asarray(fitted.predict(X_test), dtype=numpy.float64).reshape(len(test), len(columns))
+	return Y_pred, fit_time, time.time() - start - fit_time
+
+
+def cross_validate_parallel(
+		estimator,
+		X,
+		Y,
+		cv=5,
+		n_jobs=None,
+		output_names=None,
+		callback=None,
+		return_predictions=False,
+):
+	"""
+	Cross-validate a multi-output regression, with folds run in parallel.
+
+	The data is written once to shared memory, which worker processes
+	open read-only, instead of being pickled for every fold.  Each fold
+	is a separate task, and for estimators that fit each output
+	independently (linear regressions, `MultiOutputRegressor`, and
+	boosted stacks of these, like `LinearAndGaussian`) so is each
+	output within each fold, which keeps more workers busy.
+
+	Parameters
+	----------
+	estimator : estimator
+		The (unfitted) estimator to cross-validate.
+	X, Y : array-like
+		The independent and dependent data.
+	cv : int, cross-validation generator or an iterable, default 5
+		The cross-validation splitting strategy, as for `check_cv`.
+	n_jobs : int, optional
+		The number of worker processes.
+	output_names : Sequence[str], optional
+		Names for the outputs, used to label scores.  Defaults to
+		the columns of `Y`.
+	callback : callable, optional
+		Called as `callback(fold, scores)` as the results of each task
+		arrive, where `scores` is a dict of R^2 scores by output name,
+		so partial results can be reported before all folds are done.
+	return_predictions : bool, default False
+		Include the out-of-fold predictions in the result.
+
+	Returns
+	-------
+	dict
+		With the same keys as `sklearn.model_selection.cross_validate`
+		using a scorer for each output: 'fit_time', 'score_time', and
+		'test_{name}' for each output name, each an array by fold.  If
+		`return_predictions` is true, 'predictions' holds an array of
+		out-of-fold predictions with the same shape as `Y`.
+	"""
+	x_columns = list(X.columns) if isinstance(X, pandas.DataFrame) else None
+	if isinstance(Y, pandas.Series):
+		Y = Y.to_frame()
+	y_columns = list(Y.columns) if isinstance(Y, pandas.DataFrame) else None
+	X_ = numpy.asarray(X)
+	Y_ = numpy.asarray(Y, dtype=numpy.float64)
+	if Y_.ndim == 1:
+		Y_ = Y_.reshape(-1, 1)
+	n_outputs = Y_.shape[1]
+	if output_names is None:
+		output_names = y_columns or [f"Untitled_{j}" for j in range(n_outputs)]
+
+	if hasattr(cv, 'split') or isinstance(cv, numbers.Integral):
+		cv = check_cv(cv, Y_).split(X_, Y_)
+	splits = [(numpy.asarray(train), numpy.asarray(test)) for train, test in cv]
+	if n_outputs > 1 and _outputs_separable(estimator):
+		groups = [[j] for j in range(n_outputs)]
+	else:
+		groups = [list(range(n_outputs))]
+	tasks = [(f, g) for f in range(len(splits)) for g in groups]
+
+	scores = numpy.full((len(splits), n_outputs), numpy.nan)
+	fit_time = numpy.zeros(len(splits))
+	score_time = numpy.zeros(len(splits))
+	predictions = numpy.full(Y_.shape, numpy.nan) if return_predictions else None
+
+	# with max_nbytes=0, each array is dumped to a memory map just once
+	parallel_args = dict(n_jobs=n_jobs, max_nbytes=0, mmap_mode='r')
+	if 'return_as' in inspect.signature(Parallel).parameters:
+		parallel_args['return_as'] = 'generator'
+	with Parallel(**parallel_args) as parallel:
+		results = parallel(
+			delayed(_fit_and_predict)(
+				estimator, X_, Y_, splits[f][0], splits[f][1], g, x_columns, y_columns,
+			)
+			for f, g in tasks
+		)
+		for (f, g), (Y_pred, t_fit, t_score) in zip(tasks, results):
+			test = splits[f][1]
+			with ignore_warnings(UndefinedMetricWarning):
+				fold_scores = r2_score(Y_[test][:, g], Y_pred, multioutput='raw_values')
+			scores[f, g] = fold_scores
+			fit_time[f] += t_fit
+			score_time[f] += t_score
+			if predictions is not None:
+				predictions[numpy.ix_(test, g)] = Y_pred
+			if callback is not None:
+				callback(f, {output_names[j]: score for j, score in zip(g, fold_scores)})
+
+	result = {'fit_time': fit_time, 'score_time': score_time}
+	for j, name in enumerate(output_names):
+		result[f"test_{name}"] = scores[:, j]
+	if predictions is not None:
+		result['predictions'] = predictions
+	return result
+
+
+DEFAULT_CACHE_SIZE = 256 * 2**20
+"""int: The default size limit for a cross-validation cache directory, in bytes."""
+
+
+def default_cache_dir():
+	"""
+	The default directory for caching cross-validation results.
+
+	This is the 'cross_val_cache_dir' setting in the emat configuration
+	file, if there is one.  Otherwise, cross-validation results are
+	not cached on disk.
+	"""
+	from ..configuration import config
+	return config.get('cross_val_cache_dir', None)
+
+
+def _estimator_key(estimator):
+	"""A text description of an estimator and its parameters, for cache keys."""
+	try:
+		description = estimator.__repr__(N_CHAR_MAX=10**7)
+	except TypeError:
+		description = repr(estimator)
+	# memory addresses of functions in parameters change between sessions
+	return re.sub(r' at 0x[0-9a-fA-F]+', '', description)
+
+
+def _data_key(*arrays):
+	"""A hash of data arrays, for cache keys."""
+	from ..util.hasher import hash_it
+	parts = []
+	for a in arrays:
+		if isinstance(a, (pandas.DataFrame, pandas.Series)):
+			parts.append(pandas.DataFrame(a))
+		else:
+			a = numpy.ascontiguousarray(a)
+			parts.extend([str(a.shape), str(a.dtype), a])
+	return hash_it(*parts)
+
+
 class CrossValMixin:
 
 	def _cross_validate(
@@ -137,6 +320,9 @@ class CrossValMixin:
 			n_repeats=1,
 			shuffle=False,
 			n_jobs=-1,
+			cache_dir=None,
+			cache_size=None,
+			callback=None,
 	):
 		"""
 		Compute the cross validation scores for this model.
@@ -149,6 +335,12 @@ class CrossValMixin:
 		attribute, it is used along with the
 		ExogenouslyStratifiedKFold splitter.
 
+		Results are cached in memory when a `random_state` is given.
+		If a `cache_dir` is given (or set as 'cross_val_cache_dir' in
+		the emat configuration), such results are also cached on disk,
+		keyed by a hash of the data, the estimator parameters, and the
+		actual cross-validation splits, so they persist between sessions.
+
 		Args:
 			X, Y : array-like
 				The independent and dependent data to use for
@@ -162,6 +354,15 @@ class CrossValMixin:
 				vector of length equal to the first dimension
 				(i.e. number of observations) in the `X` and `Y`
 				arrays.
+			cache_dir : path-like, optional
+				A directory in which to cache results on disk.
+			cache_size : int, optional
+				The maximum total size of the files in `cache_dir`,
+				in bytes.  The least recently used results are deleted
+				to keep within this limit.  Defaults to 256 MB.
+			callback : callable, optional
+				Called with partial results as each fold finishes,
+				see `cross_validate_parallel`.
 
 		Returns:
 			pandas.Series: The cross-validation scores, by output.
@@ -211,16 +412,37 @@ class CrossValMixin:
 				self.Y_columns = [Y.name]
 			else:
 				self.Y_columns = [f"Untitled_{j}" for j in range(Y.shape[1])]
+			if cache_dir is None and use_cache:
+				cache_dir = default_cache_dir()
 			with ignore_warnings(DataConversionWarning):
-				ms = {
-					j: make_scorer(single_multiscore(n))
-					for n,j in enumerate(self.Y_columns)
-				}
 				from sklearn.base import is_classifier
 				cv = check_cv(cv, Y, classifier=is_classifier(self),
 							  random_state=random_state, n_repeats=n_repeats,
 							  shuffle=shuffle)
-				p = cross_validate(self, X, Y, cv=cv, scoring=ms, n_jobs=n_jobs)
+				cache_file = None
+				if cache_dir is not None and use_cache and random_state is not None:
+					from ..util.disk_cache import load_cache_if_available
+					# the splits themselves are hashed, so any splitter
+					# (including randomized ones) is keyed correctly
+					cv = list(cv.split(X, Y))
+					p, cache_file = load_cache_if_available(
+						cache_dir=cache_dir,
+						estimator=_estimator_key(self),
+						data=_data_key(X, Y),
+						splits=_data_key(*(i for split in cv for i in split)),
+						outputs=[str(j) for j in self.Y_columns],
+						metadata=str(cache_metadata),
+						sklearn_version=sklearn.__version__,
+					)
+				if p is None:
+					p = cross_validate_parallel(
+						self, X, Y, cv=cv, n_jobs=n_jobs,
+						output_names=self.Y_columns, callback=callback,
+					)
+					if cache_file is not None:
+						from ..util.disk_cache import save_cache, prune_cache
+						save_cache(p, cache_file)
+						prune_cache(cache_dir, DEFAULT_CACHE_SIZE if cache_size is None else cache_size)
 
 		if hashkey is not None:
 			self._cross_validate_results[hashkey] = p
@@ -228,7 +450,8 @@ class CrossValMixin:
 
 	def cross_val_scores(self, X, Y, cv=5, S=None,
 						 random_state=None, n_repeats=1,
-						 cache_metadata=None, n_jobs=-1):
+						 cache_metadata=None, n_jobs=-1,
+						 cache_dir=None, cache_size=None, callback=None):
 		"""
 		Calculate the cross validation scores for this model.
 
@@ -256,6 +479,15 @@ class CrossValMixin:
 				Repeat the cross validation exercise this many
 				times, with different random seeds, and return
 				the average result.
+			cache_dir : path-like, optional
+				A directory in which to cache results on disk, so
+				they can be reused in later sessions.  Defaults to
+				the 'cross_val_cache_dir' configuration setting.
+			cache_size : int, optional
+				The maximum total size of `cache_dir`, in bytes.
+			callback : callable, optional
+				Called as `callback(fold, scores)` as the results of
+				each fold arrive, with a dict of scores by output.
 
 		Returns:
 			pandas.Series: The cross-validation scores, by output.
@@ -264,7 +496,8 @@ class CrossValMixin:
 		p = self._cross_validate(
 			X, Y, cv=cv, S=S, random_state=random_state,
 			cache_metadata=cache_metadata, n_repeats=n_repeats,
-			n_jobs=n_jobs,
+			n_jobs=n_jobs, cache_dir=cache_dir, cache_size=cache_size,
+			callback=callback,
 		)
 		try:
 			return pandas.Series({j:p[f"test_{j}"].mean() for j in self.Y_columns})
@@ -275,7 +508,28 @@ class CrossValMixin:
 			raise
 
 
-	def cross_val_predict(self, X, Y, cv=5):
+	def cross_val_predict(self, X, Y, cv=5, n_jobs=None):
+		"""
+		Generate cross-validated predictions for this model.
+
+		Args:
+			X, Y : array-like
+				The independent and dependent data to use for
+				cross-validation.
+			cv : int, default 5
+				The number of folds to use in cross-validation, or
+				zero for leave-one-out.  If this estimator has a
+				closed form for leave-one-out predictions, as the
+				linear and gaussian process regressions and the
+				two stage boosted regressors do, it is fit once to all
+				of the data, and the predictions are computed exactly
+				as from refits with its hyperparameters held fixed.
+			n_jobs : int, optional
+				The number of worker processes.
+
+		Returns:
+			pandas.DataFrame: The cross-validated predictions.
+		"""
 		if isinstance(Y, pandas.DataFrame):
 			self.Y_columns = Y.columns
 			Yix = Y.index
@@ -285,8 +539,20 @@ class CrossValMixin:
 		else:
 			self.Y_columns = ["Untitled"] * Y.shape[1]
 			Yix = pandas.RangeIndex(Y.shape[0])
+		if cv == 0:
+			fitted = clone(self)
+			if hasattr(fitted, '_loo_predict'):
+				try:
+					fitted.fit(X, Y)
+					p = numpy.asarray(fitted._loo_predict(X, Y))
+				except NotImplementedError:
+					cv = Y.shape[0]
+				else:
+					return pandas.DataFrame(p.reshape(Y.shape[0], -1), columns=self.Y_columns, index=Yix)
+			else:
+				cv = Y.shape[0]
 		with ignore_warnings(DataConversionWarning):
-			p = cross_val_predict(self, X, Y, cv=cv)
+			p = cross_validate_parallel(self, X, Y, cv=cv, n_jobs=n_jobs, return_predictions=True)['predictions']
 		try:
 
 			return pandas.DataFrame(p, columns=self.Y_columns, index=Yix)
@@ -14,6 +14,21 @@ from sklearn.utils.validation import check_is_fitted, has_fit_parameter
 from sklearn.utils.multiclass import check_classification_targets
 from sklearn.utils._joblib import Parallel, delayed
 
+def _predict_with_std(multi_estimator, X):
+	"""
+	Predict means and standard deviations from a multi-output estimator.
+
+	Each component estimator must support `predict(X, return_std=True)`,
+	as Gaussian process regressors do.
+	"""
+	check_is_fitted(multi_estimator, 'estimators_')
+	y, y_std = zip(*(e.predict(X, return_std=True) for e in multi_estimator.estimators_))
+	return (
+		multi_estimator._post_predict(X, np.column_stack([np.ravel(i) for i in y])),
+		multi_estimator._post_predict(X, np.column_stack([np.ravel(i) for i in y_std])),
+	)
+
+
 class CompositeCVMixin:
 
 	def lock_best_estimator(self, dry_run=False):
@@ -46,12 +61,93 @@ class CompositeCVMixin:
 
 
 class MultiOutputRegressor(_MultiOutputRegressor, FrameableMixin, CrossValMixin):
+	"""
+	Multi target regression, fitting one regressor per target.
+
+	Parameters
+	----------
+	estimator : estimator object
+		An estimator object implementing `fit` and `predict`.
+	n_jobs : int, optional
+		The number of jobs to run in parallel.
+	pool_restarts : bool, default True
+		For gaussian process estimators that support it, run the optimizer
+		restarts for all of the targets in one pool of `n_jobs` workers,
+		instead of fitting each target in its own job.
+	"""
+
+	def __init__(self, estimator, n_jobs=None, pool_restarts=True):
+		super().__init__(estimator, n_jobs=n_jobs)
+		self.pool_restarts = pool_restarts
 
 	def fit(self, X, y, sample_weight=None):
 		self._pre_fit(X,y)
+		if self.pool_restarts and sample_weight is None and hasattr(self.estimator, '_fit_columns'):
+			X, y = check_X_y(X, y, multi_output=True)
+			if y.ndim == 1:
+				raise ValueError("y must have at least two dimensions for "
+								 "multi-output regression but has only one.")
+			self.estimators_ = self.estimator._fit_columns(X, y, n_jobs=self.n_jobs)
+			return self
 		return super().fit(X, y, sample_weight=sample_weight)
 
-	def predict(self, X):
+	def condition(self, X, y, optimize=False):
+		"""
+		Update the fitted estimators for new training data.
+
+		Estimators that have a `condition` method, like the gaussian
+		process regressors, keep their hyperparameters; others are refit.
+
+		Parameters
+		----------
+		X : array-like, shape (n_samples, n_features)
+			Training data, including the data used previously.
+		y : array-like, shape (n_samples, n_outputs)
+			Multi-output targets, including those used previously.
+		optimize : bool, default False
+			Passed to the `condition` method of each estimator, to also
+			re-optimize hyperparameters from their current values.
+
+		Returns
+		-------
+		self : object
+		"""
+		self._pre_fit(X,y)
+		check_is_fitted(self, 'estimators_')
+		X, y = check_X_y(X, y, multi_output=True)
+		if y.ndim == 1:
+			raise ValueError("y must have at least two dimensions for "
+							 "multi-output regression but has only one.")
+		for i, e in enumerate(self.estimators_):
+			if hasattr(e, 'condition'):
+				e.condition(X, y[:, i], optimize=optimize)
+			else:
+				e.fit(X, y[:, i])
+		return self
+
+	def _loo_predict(self, X, y, shifts=None):
+		"""
+		Closed form leave-one-out predictions, if every estimator has them.
+
+		Any `shifts` to the target values, with shape (n_samples, n_samples,
+		n_targets), are passed on to each estimator for its own target.
+		"""
+		check_is_fitted(self, 'estimators_')
+		y = np.asarray(y)
+		if not all(hasattr(e, '_loo_predict') for e in self.estimators_):
+			raise NotImplementedError('leave-one-out predictions are not available for these estimators')
+		if shifts is None:
+			return self._post_predict(X, np.column_stack([
+				np.ravel(e._loo_predict(X, y[:, j])) for j, e in enumerate(self.estimators_)
+			]))
+		shifts = np.asarray(shifts)
+		return self._post_predict(X, np.column_stack([
+			np.ravel(e._loo_predict(X, y[:, j], shifts=shifts[:, :, j])) for j, e in enumerate(self.estimators_)
+		]))
+
+	def predict(self, X, return_std=False):
+		if return_std:
+			return _predict_with_std(self, X)
 		y = super().predict(X)
 		y = self._post_predict(X,y)
 		return y
@@ -295,7 +391,9 @@ class MultiOutputRegressorDiverse(
 		self._pre_fit(X,y)
 		return super().fit(X, y, sample_weight=sample_weight)
 
-	def predict(self, X):
+	def predict(self, X, return_std=False):
+		if return_std:
+			return _predict_with_std(self, X)
 		y = super().predict(X)
 		y = self._post_predict(X,y)
 		return y
@@ -0,0 +1,264 @@
+
+import numpy
+from scipy.linalg import cholesky, solve_triangular
+from sklearn.base import BaseEstimator, RegressorMixin
+from sklearn.utils import check_array, check_random_state
+
+from .frameable import FrameableMixin
+from .anisotropic import AnisotropicGaussianProcessRegressor
+
+
+def _jittered_cholesky(K, jitter):
+	"""Lower Cholesky factor of `K`, adding jitter to the diagonal as needed."""
+	eye = numpy.eye(K.shape[0])
+	for attempt in range(6):
+		try:
+			return cholesky(K + jitter * eye, lower=True)
+		except numpy.linalg.LinAlgError:
+			jitter *= 100
+	raise numpy.linalg.LinAlgError("kernel matrix is not positive definite, try increasing alpha")
+
+
+def select_inducing_points(X, n_inducing, random_state=None):
+	"""
+	Select a well spread subset of points, by greedy maximin distance.
+
+	Starting from a random point, each following point is the one that is
+	farthest from all of the points already selected, with distances
+	measured on standardized dimensions.
+
+	Parameters
+	----------
+	X : array-like, shape = (n_samples, n_features)
+		Candidate points.
+	n_inducing : int
+		The number of points to select.  If this is not less than the
+		number of candidates, all the candidates are selected.
+	random_state : int, RandomState instance or None, optional
+		Used to pick the first point.
+
+	Returns
+	-------
+	ndarray
+		The positional indexes of the selected points.
+	"""
+	X = numpy.asarray(X, dtype=numpy.float64)
+	n = X.shape[0]
+	if n_inducing >= n:
+		return numpy.arange(n)
+	scale = X.std(axis=0)
+	scale[scale == 0] = 1
+	Xs = X / scale
+	selected = numpy.empty(n_inducing, dtype=numpy.intp)
+	selected[0] = check_random_state(random_state).randint(n)
+	min_dist = ((Xs - Xs[selected[0]]) ** 2).sum(axis=1)
+	for i in range(1, n_inducing):
+		selected[i] = numpy.argmax(min_dist)
+		numpy.minimum(min_dist, ((Xs - Xs[selected[i]]) ** 2).sum(axis=1), out=min_dist)
+	return numpy.sort(selected)
+
+
+class SparseGaussianProcessRegressor(
+	BaseEstimator,
+	RegressorMixin,
+	FrameableMixin,
+):
+	"""
+	Sparse Gaussian process regression, using inducing points from the data.
+
+	An exact Gaussian process regression needs O(n³) time and O(n²) memory
+	for n training points, which is impractical for more than a few thousand
+	experiments.  This regressor selects `n_inducing` well spread training
+	points as inducing points, fits the kernel hyperparameters with an exact
+	`AnisotropicGaussianProcessRegressor` on those points only, and then
+	conditions on *all* of the training data using the deterministic
+	training conditional (DTC) approximation, which needs O(n m²) time and
+	O(m²) memory for m inducing points.
+
+	The fitted regressor has the same `kernel_` attribute as the exact
+	regressor, so length scales can be read from it in the same way,
+	and `predict` can also return standard deviations.  When there are
+	no more training points than `n_inducing`, this is the same as the
+	exact Gaussian process regression.
+
+	Parameters
+	----------
+	n_inducing : int, default 500
+		The number of inducing points.
+	kernel_generator, alpha, optimizer, n_restarts_optimizer,
+	standardize_before_fit, random_state, n_jobs, n_iter_no_change, tol :
+		See `AnisotropicGaussianProcessRegressor`.  The `random_state` also
+		selects the first inducing point.  The `alpha` (which must be a
+		scalar) is the noise variance in the DTC approximation.
+	chunk_size : int, default 10000
+		The number of training points processed at once when conditioning
+		on the training data, which bounds memory use.
+	"""
+
+	def __init__(
+			self,
+			n_inducing=500,
+			kernel_generator=None,
+			alpha=1e-10,
+			optimizer="fmin_l_bfgs_b",
+			n_restarts_optimizer=250,
+			standardize_before_fit=True,
+			random_state=None,
+			n_jobs=None,
+			n_iter_no_change=None,
+			tol=1e-4,
+			chunk_size=10000,
+	):
+		self.n_inducing = n_inducing
+		self.kernel_generator = kernel_generator
+		self.alpha = alpha
+		self.optimizer = optimizer
+		self.n_restarts_optimizer = n_restarts_optimizer
+		self.standardize_before_fit = standardize_before_fit
+		self.random_state = random_state
+		self.n_jobs = n_jobs
+		self.n_iter_no_change = n_iter_no_change
+		self.tol = tol
+		self.chunk_size = chunk_size
+
+	def fit(self, X, y):
+		"""
+		Fit sparse Gaussian process regression model.
+
+		Parameters
+		----------
+		X : array-like, shape = (n_samples, n_features)
+			Training data
+
+		y : array-like, shape = (n_samples, [n_output_dims])
+			Target values
+
+		Returns
+		-------
+		self : returns an instance of self.
+		"""
+		self._pre_fit(X, y)
+		X = check_array(X, dtype=numpy.float64)
+		y = numpy.asarray(y, dtype=numpy.float64)
+
+		self.inducing_indexes_ = select_inducing_points(X, self.n_inducing, self.random_state)
+		self.exact_ = AnisotropicGaussianProcessRegressor(
+			kernel_generator=self.kernel_generator,
+			alpha=self.alpha,
+			optimizer=self.optimizer,
+			n_restarts_optimizer=self.n_restarts_optimizer,
+			standardize_before_fit=self.standardize_before_fit,
+			random_state=self.random_state,
+			n_jobs=self.n_jobs,
+			n_iter_no_change=self.n_iter_no_change,
+			tol=self.tol,
+		).fit(X[self.inducing_indexes_], y[self.inducing_indexes_])
+		return self._condition(X, y)
+
+	def condition(self, X, y, optimize=False):
+		"""
+		Update a fitted sparse regression model for new training data.
+
+		The kernel hyperparameters and inducing points found by `fit` are
+		kept, and the model is conditioned on the new training data in
+		O(n m²) time.
+
+		Parameters
+		----------
+		X : array-like, shape = (n_samples, n_features)
+			Training data, including the data used previously.
+
+		y : array-like, shape = (n_samples, [n_output_dims])
+			Target values, including those used previously.
+
+		optimize : bool, default False
+			Select new inducing points from the training data, and
+			re-optimize the kernel hyperparameters on them, starting from
+			the previous hyperparameters without random restarts.
+
+		Returns
+		-------
+		self : returns an instance of self.
+		"""
+		self._pre_fit(X, y)
+		X = check_array(X, dtype=numpy.float64)
+		y = numpy.asarray(y, dtype=numpy.float64)
+		if optimize:
+			self.inducing_indexes_ = select_inducing_points(X, self.n_inducing, self.random_state)
+			self.exact_.condition(X[self.inducing_indexes_], y[self.inducing_indexes_], optimize=True)
+		return self._condition(X, y)
+
+	def _condition(self, X, y):
+		"""Condition on all of the training data with the DTC approximation."""
+		exact = self.exact_
+		Z = exact.X_train_
+		self.kernel_ = exact.kernel_
+		self.standardize_Y = exact.standardize_Y
+		self.log_marginal_likelihood_value_ = exact.log_marginal_likelihood_value_
+		if self.standardize_Y is not None:
+			y = y / self.standardize_Y
+
+		# With V = Lm⁻¹ Kmn, the DTC posterior uses A = σ²I + V Vᵀ, which
+		# is accumulated in chunks so the n by m kernel is never stored.
+		sigma2 = float(self.alpha)
+		Lm = _jittered_cholesky(self.kernel_(Z), max(sigma2, 1e-10))
+		A = numpy.zeros((len(Z), len(Z)))
+		b = numpy.zeros((len(Z),) + y.shape[1:])
+		for start in range(0, len(X), self.chunk_size):
+			V = solve_triangular(Lm, self.kernel_(Z, X[start:start + self.chunk_size]), lower=True)
+			A += V @ V.T
+			b += V @ y[start:start + self.chunk_size]
+		LA = _jittered_cholesky(A, sigma2)
+
+		# Predictions use the same quantities as an exact regression, with the
+		# inducing points as training points: the mean is K(x, Z) @ alpha_ and
+		# the variance is k(x, x) - K(x, Z) @ _K_inv @ K(Z, x).
+		self.X_train_ = Z
+		self.alpha_ = solve_triangular(
+			Lm.T, solve_triangular(LA.T, solve_triangular(LA, b, lower=True), lower=False), lower=False
+		)
+		Lm_inv = solve_triangular(Lm, numpy.eye(len(Z)), lower=True)
+		B = solve_triangular(LA, Lm_inv, lower=True)
+		self._K_inv = Lm_inv.T @ Lm_inv - sigma2 * (B.T @ B)
+		self._y_train_mean = numpy.zeros(1)
+		self._y_train_std = 1
+		return self
+
+	def predict(self, X, return_std=False):
+		"""
+		Predict using the sparse Gaussian process regression model.
+
+		Parameters
+		----------
+		X : array-like, shape = (n_samples, n_features)
+			Query points where the GP is evaluated
+
+		return_std : bool, default: False
+			If True, the standard-deviation of the predictive distribution at
+			the query points is returned along with the mean.
+
+		Returns
+		-------
+		y_mean : array, shape = (n_samples, [n_output_dims])
+			Mean of predictive distribution a query points
+
+		y_std : array, shape = (n_samples, [n_output_dims]), optional
+			Standard deviation of predictive distribution at query points.
+			Only returned when return_std is True.
+		"""
+		X_ = check_array(X, dtype=numpy.float64)
+		K_trans = self.kernel_(X_, self.X_train_)
+		y_hat = K_trans @ self.alpha_
+		if self.standardize_Y is not None:
+			y_hat = y_hat * self.standardize_Y
+		y_hat = self._post_predict(X, y_hat)
+		if not return_std:
+			return y_hat
+
+		y_var = self.kernel_.diag(X_) - numpy.einsum('ij,ij->i', K_trans @ self._K_inv, K_trans)
+		y_std = numpy.sqrt(numpy.maximum(y_var, 0))
+		if self.alpha_.ndim > 1:
+			y_std = numpy.repeat(y_std[:, None], self.alpha_.shape[1], axis=1)
+		if self.standardize_Y is not None:
+			y_std = y_std * self.standardize_Y
+		return y_hat, self._post_predict(X, y_std)
@@ -6,4 +6,7 @@ from .core_excel import ExcelCoreModel
 from .core_files.core_files import FilesCoreModel
 from .core_files.gbnrtc_model import GBNRTCModel
 from .core_files.ODOT_model import ODOTModel
+from .core_files.async_evaluator import AsyncSubprocessEvaluator
+from .compiled_meta_model import CompiledMetaModel
+from .candidate_pool import CandidatePool
 
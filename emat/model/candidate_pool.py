@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+""" candidate_pool.py - reusable pools of candidate experiments for meta-models"""
+
+import numpy
+import pandas
+
+from ..util.loggers import get_module_logger
+_logger = get_module_logger(__name__)
+
+
+def _preprocess_chunk(cat_encoder, var_thresh, raw_input_columns, df, dtype):
+    """Preprocess raw input as `MetaModel.preprocess_raw_input` does."""
+    result = cat_encoder.transform(df[raw_input_columns])
+    result = var_thresh.transform(result.astype(numpy.float64))
+    return numpy.asarray(result, dtype=dtype), result.columns
+
+
+def _generate_chunk(cat_encoder, var_thresh, raw_input_columns, scope, n_samples, sampler, random_seed, dtype):
+    """Design and preprocess one chunk of candidate experiments."""
+    from ..experiment.experimental_design import design_experiments
+    design = design_experiments(scope, n_samples=n_samples, random_seed=random_seed, sampler=sampler)
+    matrix, columns = _preprocess_chunk(cat_encoder, var_thresh, raw_input_columns, design, dtype)
+    return design, matrix, columns
+
+
+class CandidatePool:
+    """
+    A pool of candidate experiments, preprocessed for a meta-model.
+
+    Picking new experiments with `MetaModel.pick_new_experiments` needs
+    a large and diverse pool of candidates, which must be converted to the
+    input format of the regression (see `MetaModel.preprocess_raw_input`).
+    A pool holds the raw candidate experiments together with that
+    conversion, as a compact matrix (float32 by default), so that it can
+    be given to several calls of `pick_new_experiments`, for different
+    output focuses or for later batches, without converting it again.
+
+    Pools are usually created with `MetaModel.candidate_pool` or
+    `CandidatePool.from_design`, which design and convert the candidates
+    in chunks, in parallel when given `n_jobs`.
+
+    Args:
+        experiments (pandas.DataFrame): The raw candidate experiments.
+        matrix (numpy.ndarray): The preprocessed candidate experiments,
+            with a row for each row of `experiments`.
+        columns (pandas.Index): The names of the columns of `matrix`.
+    """
+
+    def __init__(self, experiments, matrix, columns):
+        if len(matrix) != len(experiments):
+            raise ValueError('the matrix must have a row for each experiment')
+        self.experiments = experiments
+        self.matrix = matrix
+        self.columns = pandas.Index(columns)
+
+    def __len__(self):
+        return len(self.experiments)
+
+    def __repr__(self):
+        return (
+            f"<emat.CandidatePool with {len(self)} experiments, "
+            f"{len(self.columns)} {self.matrix.dtype} columns>"
+        )
+
+    @property
+    def index(self):
+        """pandas.Index: Labels for the candidate experiments."""
+        return self.experiments.index
+
+    @property
+    def nbytes(self):
+        """int: The memory used by the preprocessed matrix, in bytes."""
+        return self.matrix.nbytes
+
+    @classmethod
+    def from_design(cls, metamodel, experiments, n_jobs=None, chunk_size=100000, dtype=numpy.float32):
+        """
+        Preprocess a design of candidate experiments for a meta-model.
+
+        Args:
+            metamodel (MetaModel): The meta-model that will pick
+                experiments from the pool.
+            experiments (pandas.DataFrame): The raw candidate experiments.
+            n_jobs (int, optional): The number of chunks to preprocess
+                in parallel.  See `joblib.Parallel`.
+            chunk_size (int, default 100000): The number of experiments in
+                each chunk.
+            dtype (numpy.dtype, default float32): The type of the
+                preprocessed matrix.
+
+        Returns:
+            CandidatePool
+        """
+        from sklearn.utils._joblib import Parallel, delayed
+        chunks = [experiments.iloc[start:start + chunk_size] for start in range(0, len(experiments), chunk_size)]
+        results = Parallel(n_jobs=n_jobs)(
+            delayed(_preprocess_chunk)(
+                metamodel.cat_encoder,
+                metamodel.var_thresh,
+                metamodel.raw_input_columns,
+                chunk,
+                dtype,
+            )
+            for chunk in chunks
+        )
+        if not results:
+            return cls(experiments, numpy.zeros((0, len(metamodel.input_sample.columns)), dtype=dtype),
+                       metamodel.input_sample.columns)
+        return cls(experiments, numpy.concatenate([m for m, _ in results]), results[0][1])
+
+    @classmethod
+    def generate(
+            cls,
+            metamodel,
+            scope,
+            n_samples,
+            sampler='lhs',
+            random_seed=1234,
+            n_jobs=None,
+            chunk_size=100000,
+            dtype=numpy.float32,
+    ):
+        """
+        Design and preprocess a pool of candidate experiments.
+
+        The pool is designed in chunks of `chunk_size` experiments.  As
+        when streaming a design with `design_experiments`, each chunk is
+        sampled with its own random seed derived from `random_seed`, so
+        the pool is the same for any `n_jobs`.  Each chunk is designed
+        and preprocessed by the same worker, and only the preprocessed
+        matrix and the raw chunk are sent back.
+
+        Args:
+            metamodel (MetaModel): The meta-model that will pick
+                experiments from the pool.
+            scope (Scope or Box): The scope of the candidate experiments.
+                Give a `Box` with a scope to restrict the candidates to
+                the box.
+            n_samples (int): The number of candidate experiments.
+            sampler (str or AbstractSampler, default 'lhs'): The sampler
+                for the design of each chunk.  See `design_experiments`.
+            random_seed (int, default 1234): A random seed for
+                reproducibility.
+            n_jobs (int, optional): The number of chunks to design and
+                preprocess in parallel.  See `joblib.Parallel`.
+            chunk_size (int, default 100000): The number of experiments in
+                each chunk.
+            dtype (numpy.dtype, default float32): The type of the
+                preprocessed matrix.
+
+        Returns:
+            CandidatePool
+        """
+        from sklearn.utils._joblib import Parallel, delayed
+        n_chunks = -(-n_samples // chunk_size)
+        chunk_seeds = numpy.random.SeedSequence(random_seed).spawn(n_chunks)
+        results = Parallel(n_jobs=n_jobs)(
+            delayed(_generate_chunk)(
+                metamodel.cat_encoder,
+                metamodel.var_thresh,
+                metamodel.raw_input_columns,
+                scope,
+                min(chunk_size, n_samples - chunk_number * chunk_size),
+                sampler,
+                chunk_seed.generate_state(1)[0],
+                dtype,
+            )
+            for chunk_number, chunk_seed in enumerate(chunk_seeds)
+        )
+        experiments = pandas.concat([d for d, _, _ in results], ignore_index=True)
+        matrix = numpy.concatenate([m for _, m, _ in results])
+        _logger.info(f"generated a pool of {len(experiments)} candidate experiments in {n_chunks} chunks")
+        return cls(experiments, matrix, results[0][2])
+
+    def matrix_for(self, metamodel):
+        """
+        The preprocessed candidates for a meta-model.
+
+        A meta-model that uses the same or fewer preprocessed columns
+        than this pool (such as the same meta-model, after `update`) uses
+        the stored matrix, or some of its columns.  Otherwise the raw
+        candidates are preprocessed again.
+
+        Args:
+            metamodel (MetaModel)
+
+        Returns:
+            pandas.DataFrame:
+                The candidates, with the columns of the meta-model's
+                `input_sample`, indexed like `experiments`.
+        """
+        columns = metamodel.input_sample.columns
+        if self.columns.equals(columns):
+            matrix = self.matrix
+        elif columns.isin(self.columns).all():
+            matrix = self.matrix[:, self.columns.get_indexer(columns)]
+        else:
+            _logger.info("candidate pool does not match the meta-model inputs, preprocessing again")
+            matrix, _ = _preprocess_chunk(
+                metamodel.cat_encoder,
+                metamodel.var_thresh,
+                metamodel.raw_input_columns,
+                self.experiments,
+                self.matrix.dtype,
+            )
+        return pandas.DataFrame(matrix, index=self.index, columns=columns, copy=False)
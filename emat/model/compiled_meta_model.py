@@ -0,0 +1,872 @@
+# -*- coding: utf-8 -*-
+""" compiled_meta_model.py - low-overhead evaluation of fitted meta-models"""
+
+import numbers
+import functools
+import numpy
+
+FORMAT_VERSION = 1
+"""int: The version of the array format written by `CompiledMetaModel.save`."""
+
+DEFAULT_MEMORY_BUDGET = 64 * 2**20
+"""int: The default working memory for evaluating many points at once, in bytes."""
+
+
+def _memmap_npz(path, mode='r'):
+    """
+    Memory-map the arrays in an uncompressed `.npz` archive.
+
+    `numpy.load` cannot memory-map the members of an archive, but the
+    members written by `numpy.savez` are stored without compression, so
+    each one is an `.npy` file at a fixed offset within the archive, and
+    its data can be mapped directly.  Empty arrays, and members that are
+    compressed or use another header version, are read into memory.
+
+    Args:
+        path (str): The `.npz` archive to read.
+        mode (str): The `numpy.memmap` mode, usually 'r'.
+
+    Returns:
+        dict: The arrays, by name.
+    """
+    import struct
+    import zipfile
+    from numpy.lib import format as npy_format
+    header_readers = {
+        (1, 0): npy_format.read_array_header_1_0,
+        (2, 0): npy_format.read_array_header_2_0,
+    }
+    arrays = {}
+    with numpy.load(path, allow_pickle=False) as archive, \
+            zipfile.ZipFile(path) as zipped, open(path, 'rb') as raw:
+        for info in zipped.infolist():
+            name = info.filename[:-4] if info.filename.endswith('.npy') else info.filename
+            if info.compress_type == zipfile.ZIP_STORED:
+                # skip the zip local file header to the start of the .npy file
+                raw.seek(info.header_offset)
+                local_header = raw.read(30)
+                name_length, extra_length = struct.unpack('<HH', local_header[26:30])
+                raw.seek(info.header_offset + 30 + name_length + extra_length)
+                reader = header_readers.get(npy_format.read_magic(raw))
+                if reader is not None:
+                    shape, fortran_order, dtype = reader(raw)
+                    if not dtype.hasobject and numpy.prod(shape, dtype=numpy.intp) > 0:
+                        arrays[name] = numpy.memmap(
+                            path, dtype=dtype, mode=mode, shape=shape,
+                            order='F' if fortran_order else 'C', offset=raw.tell(),
+                        )
+                        continue
+            arrays[name] = archive[name]
+    return arrays
+
+
+def _unpack_rbf(kernel):
+    """
+    Get the amplitude and length scales of an RBF kernel.
+
+    Args:
+        kernel (sklearn.gaussian_process.kernels.Kernel):
+            A fitted kernel, which must be an `RBF` kernel, optionally
+            multiplied by a `ConstantKernel`.
+
+    Returns:
+        amplitude (float), length_scale (array)
+
+    Raises:
+        NotImplementedError: For any other kernel.
+    """
+    from sklearn.gaussian_process.kernels import RBF, ConstantKernel, Product
+    if isinstance(kernel, RBF):
+        return 1.0, numpy.asarray(kernel.length_scale, dtype=numpy.float64)
+    if isinstance(kernel, Product):
+        if isinstance(kernel.k1, ConstantKernel) and isinstance(kernel.k2, RBF):
+            return float(kernel.k1.constant_value), numpy.asarray(kernel.k2.length_scale, dtype=numpy.float64)
+        if isinstance(kernel.k2, ConstantKernel) and isinstance(kernel.k1, RBF):
+            return float(kernel.k2.constant_value), numpy.asarray(kernel.k1.length_scale, dtype=numpy.float64)
+    raise NotImplementedError(f'cannot compile a gaussian process with kernel {kernel}')
+
+
+class _LinearStage:
+    """A compiled linear regression."""
+
+    def __init__(self, estimator, n_outputs):
+        coef = numpy.asarray(estimator.coef_, dtype=numpy.float64).reshape(n_outputs, -1)
+        self.coef = numpy.ascontiguousarray(coef.T)
+        self.intercept = numpy.broadcast_to(
+            numpy.asarray(estimator.intercept_, dtype=numpy.float64), (n_outputs,)
+        ).copy()
+
+    kind = 'linear'
+
+    def predict(self, X, dtype=numpy.float64):
+        return X @ self.coef + self.intercept
+
+    def predict_std(self, X, dtype=numpy.float64):
+        raise NotImplementedError('a linear regression has no standard deviation of estimates')
+
+    def predict_mean_std(self, X, dtype=numpy.float64):
+        raise NotImplementedError('a linear regression has no standard deviation of estimates')
+
+    def point_bytes(self, dtype=numpy.float64, return_std=False):
+        return 0
+
+    def arrays(self, include_std=True):
+        return dict(coef=self.coef, intercept=self.intercept)
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        self = cls.__new__(cls)
+        self.coef = arrays['coef']
+        self.intercept = arrays['intercept']
+        return self
+
+
+class _GaussianStage:
+    """
+    A set of compiled gaussian process regressions, one for each output.
+
+    Sparse regressions are compiled the same way, with their inducing
+    points in place of the training points.
+
+    Training points are stored pre-divided by each output's length scales,
+    and centered on their mean, so evaluating the RBF kernels needs only
+    a batched matrix product.
+    """
+
+    def __init__(self, estimators):
+        x_train, inv_length_scale, alpha, amplitude, y_scale, y_offset, noise = [], [], [], [], [], [], []
+        self._k_inv_sources = []
+        for est in estimators:
+            amp, length_scale = _unpack_rbf(est.kernel_)
+            est_x = numpy.asarray(est.X_train_, dtype=numpy.float64)
+            inv_ls = numpy.broadcast_to(1.0 / length_scale, est_x.shape[1:])
+            est_alpha = numpy.asarray(est.alpha_, dtype=numpy.float64)
+            # AnisotropicGaussianProcessRegressor rescales the targets before fitting
+            standardize = getattr(est, 'standardize_Y', None)
+            standardize = 1.0 if standardize is None else standardize
+            scale = numpy.broadcast_to(numpy.squeeze(est._y_train_std * standardize), est_alpha.shape[1:])
+            offset = numpy.broadcast_to(numpy.squeeze(est._y_train_mean * standardize), est_alpha.shape[1:])
+            for j in numpy.ndindex(est_alpha.shape[1:]):
+                # a single regression fit to several outputs shares one kernel
+                x_train.append(est_x * inv_ls)
+                inv_length_scale.append(inv_ls)
+                alpha.append(est_alpha[(slice(None), *j)] * amp * scale[j])
+                amplitude.append(amp)
+                y_scale.append(scale[j])
+                y_offset.append(offset[j])
+                noise.append(float(numpy.mean(est.alpha)))
+                # sparse regressions give the inverse directly, exact ones give a Cholesky factor
+                self._k_inv_sources.append(
+                    (est._K_inv, None) if getattr(est, '_K_inv', None) is not None else (None, est.L_)
+                )
+        x_train = numpy.stack(x_train)
+        self.x_center = x_train.mean(axis=1)
+        self.x_train = numpy.ascontiguousarray(x_train - self.x_center[:, None, :])
+        self.x_train_sq = numpy.einsum('jif,jif->ji', self.x_train, self.x_train)
+        self.inv_length_scale = numpy.stack(inv_length_scale)
+        self.alpha = numpy.ascontiguousarray(numpy.stack(alpha)[:, :, None])
+        self.amplitude = numpy.asarray(amplitude, dtype=numpy.float64)
+        self.y_scale = numpy.abs(numpy.asarray(y_scale, dtype=numpy.float64))
+        self.y_offset = numpy.asarray(y_offset, dtype=numpy.float64)
+        self.noise = numpy.asarray(noise, dtype=numpy.float64)
+        self._k_inv = None
+
+    kind = 'gaussian'
+    _array_names = ('x_train', 'x_train_sq', 'x_center', 'inv_length_scale', 'alpha', 'amplitude', 'y_scale', 'y_offset')
+
+    def arrays(self, include_std=True):
+        arrays = {name: getattr(self, name) for name in self._array_names}
+        if include_std:
+            arrays['k_inv'] = self._get_k_inv()
+            arrays['noise'] = self.noise
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        self = cls.__new__(cls)
+        for name in self._array_names:
+            setattr(self, name, arrays[name])
+        self._k_inv = arrays.get('k_inv')
+        self._k_inv_sources = None
+        self.noise = arrays.get('noise', numpy.full(len(self.amplitude), 1e-10))
+        return self
+
+    def _cast(self, name, dtype):
+        """An array attribute in the given dtype, converted once and kept."""
+        array = getattr(self, name)
+        if array.dtype == dtype:
+            return array
+        if self.__dict__.get('_casts') is None:
+            self._casts = {}
+        key = (name, numpy.dtype(dtype).str)
+        if key not in self._casts:
+            self._casts[key] = array.astype(dtype)
+        return self._casts[key]
+
+    def _kernel(self, X, dtype=numpy.float64):
+        # the kernel from each point to each training point, with shape
+        # (n_outputs, n_points, n_train); the squared scaled distances are
+        # always found in float64, as expanding them cancels digits badly
+        # when length scales are small, and only the rest is done in `dtype`;
+        # the points are centered like the training points for the same reason
+        xs = X[None, :, :] * self.inv_length_scale[:, None, :] - self.x_center[:, None, :]
+        xs_sq = numpy.einsum('jmf,jmf->jm', xs, xs)
+        k = numpy.empty((self.x_train.shape[0], X.shape[0], self.x_train.shape[1]), dtype=dtype)
+        for j in range(k.shape[0]):
+            d2 = xs[j] @ self.x_train[j].T
+            d2 *= -2
+            d2 += self.x_train_sq[j]
+            d2 += xs_sq[j][:, None]
+            numpy.maximum(d2, 0, out=d2)
+            d2 *= -0.5
+            numpy.exp(d2.astype(dtype, copy=False), out=k[j])
+        return k
+
+    def point_bytes(self, dtype=numpy.float64, return_std=False):
+        """The working memory needed to evaluate each point, in bytes."""
+        n_outputs, n_train = self.x_train.shape[:2]
+        itemsize = numpy.dtype(dtype).itemsize
+        # the kernel, plus one output's distances in float64 and in `dtype`,
+        # and for standard deviations two more arrays the size of the kernel
+        return n_outputs * n_train * itemsize * (3 if return_std else 1) + n_train * (8 + itemsize)
+
+    def _mean(self, k, dtype):
+        return (k @ self._cast('alpha', dtype))[:, :, 0].T.astype(numpy.float64) + self.y_offset
+
+    def _std(self, k, dtype):
+        self._get_k_inv()
+        k *= self._cast('amplitude', dtype)[:, None, None]
+        var = self.amplitude[:, None] - numpy.einsum('jmi,jmi->jm', k @ self._cast('_k_inv', dtype), k)
+        numpy.maximum(var, 0, out=var)
+        return numpy.sqrt(var).T * self.y_scale
+
+    def predict(self, X, dtype=numpy.float64):
+        return self._mean(self._kernel(X, dtype), dtype)
+
+    def _get_k_inv(self):
+        if self._k_inv is None:
+            if self._k_inv_sources is None:
+                raise NotImplementedError('this meta-model was saved without standard deviations')
+            from scipy.linalg import solve_triangular
+            k_inv = []
+            for K_inv, L in self._k_inv_sources:
+                if K_inv is None:
+                    L_inv = solve_triangular(L.T, numpy.eye(L.shape[0]))
+                    K_inv = L_inv @ L_inv.T
+                k_inv.append(K_inv)
+            self._k_inv = numpy.stack(k_inv)
+        return self._k_inv
+
+    def predict_std(self, X, dtype=numpy.float64):
+        return self._std(self._kernel(X, dtype), dtype)
+
+    def predict_mean_std(self, X, dtype=numpy.float64):
+        k = self._kernel(X, dtype)
+        return self._mean(k, dtype), self._std(k, dtype)
+
+
+class _HypotheticalPosterior:
+    """
+    Posterior standard deviations at candidate points, as if some of them
+    were added to the training data.
+
+    The posterior variance of a gaussian process does not depend on the
+    observed values, only on where they are, so the effect of running
+    hypothetical experiments at some of the candidates can be found before
+    they are run.  Rather than refitting the regression for each set of
+    hypothetical experiments, this keeps a partial Cholesky factor `V` of
+    the posterior covariance between all the candidates and the chosen
+    ones, so the posterior variance at each candidate is its variance
+    given the training data less the row sums of `V²`.  With `L` the
+    Cholesky factor of the posterior covariance among the chosen points
+    plus the noise, `V` is that covariance between the candidates and the
+    chosen points times `L⁻ᵀ`, and both are kept.  Adding one point
+    appends a column to `V` and a row to `L`, in O(n_candidates ×
+    (n_train + n_chosen)) time, and removing one rotates the later
+    columns of both to drop it (a rank-one downdate), in O(n_candidates ×
+    n_chosen) time.
+
+    Args:
+        stage (_GaussianStage): The compiled gaussian process regressions.
+        features (numpy.ndarray): The candidate points, as regression
+            features with shape (n_candidates, n_features).
+    """
+
+    def __init__(self, stage, features):
+        self._stage = stage
+        self._xs = features[None, :, :] * stage.inv_length_scale[:, None, :]
+        self._k_train = stage._kernel(features) * stage.amplitude[:, None, None]
+        self._k_inv = stage._get_k_inv()
+        self._var = stage.amplitude[:, None] - numpy.einsum(
+            'jmi,jmi->jm', self._k_train @ self._k_inv, self._k_train,
+        )
+        self._V = numpy.zeros(self._var.shape + (0,))
+        self._L = numpy.zeros((self._var.shape[0], 0, 0))
+        self.chosen = []
+
+    def std(self):
+        """
+        The posterior standard deviations at the candidates.
+
+        Returns:
+            numpy.ndarray: Shape (n_candidates, n_outputs)
+        """
+        return numpy.sqrt(numpy.maximum(self._var, 0)).T * self._stage.y_scale
+
+    def add(self, i):
+        """
+        Add a candidate to the hypothetical training points.
+
+        Args:
+            i (int): The position of the candidate.
+        """
+        stage = self._stage
+        m = len(self.chosen)
+        if m == self._V.shape[2]:
+            grow = max(m, 4)
+            self._V = numpy.concatenate([self._V, numpy.zeros(self._V.shape[:2] + (grow,))], axis=2)
+            self._L = numpy.pad(self._L, ((0, 0), (0, grow), (0, grow)))
+        # the covariance with candidate i, given the training data and the chosen points
+        d2 = self._xs - self._xs[:, i:i + 1, :]
+        cov = stage.amplitude[:, None] * numpy.exp(-0.5 * numpy.einsum('jmf,jmf->jm', d2, d2))
+        cov -= numpy.einsum('jmi,ji->jm', self._k_train, (self._k_inv @ self._k_train[:, i, :, None])[:, :, 0])
+        cov -= numpy.einsum('jmk,jk->jm', self._V[:, :, :m], self._V[:, i, :m])
+        pivot = numpy.sqrt(numpy.maximum(cov[:, i], 0) + stage.noise)
+        v = cov / pivot[:, None]
+        self._L[:, m, :m] = self._V[:, i, :m]
+        self._L[:, m, m] = pivot
+        self._V[:, :, m] = v
+        self._var -= v * v
+        self.chosen.append(i)
+
+    def remove(self, i):
+        """
+        Remove a candidate from the hypothetical training points.
+
+        Args:
+            i (int): The position of the candidate, which must have
+                been added before.
+        """
+        p = self.chosen.index(i)
+        m = len(self.chosen)
+        V, L = self._V, self._L
+        # Givens rotations of the columns carry the removed column to the end,
+        # keeping `L` triangular without its row p; applied to the columns of
+        # `V` as well, what is left in the carried column of `V` is the
+        # removed point's own contribution.
+        for q in range(p + 1, m):
+            a = L[:, q, q - 1].copy()
+            b = L[:, q, q].copy()
+            r = numpy.hypot(a, b)
+            r[r == 0] = 1
+            c, s = a / r, b / r
+            for M in (V, L):
+                left, right = M[:, :, q - 1].copy(), M[:, :, q]
+                M[:, :, q - 1] = c[:, None] * left + s[:, None] * right
+                M[:, :, q] = c[:, None] * right - s[:, None] * left
+        self._var += V[:, :, m - 1] ** 2
+        V[:, :, m - 1] = 0
+        L[:, p:m - 1] = L[:, p + 1:m]
+        L[:, m - 1] = 0
+        L[:, :, m - 1] = 0
+        del self.chosen[p]
+
+
+_INVERSE_TRANSFORMS = {
+    'exp': lambda y, a, b: numpy.exp(y) - a,
+    'expm1': lambda y, a, b: numpy.expm1(y),
+    'clip': lambda y, a, b: numpy.clip(y, None if numpy.isnan(a) else a, None if numpy.isnan(b) else b),
+}
+
+
+def _inverse_transform_spec(metamodel, name, v_func):
+    """
+    Describe the inverse of an output transform by a kind and two parameters.
+
+    Returns:
+        tuple or None: The kind (a key of `_INVERSE_TRANSFORMS`) and its
+            parameters, or None if the transform is not one of the
+            standard meta-model types.
+    """
+    specs = getattr(metamodel, '_output_transform_specs', None) or {}
+    t, t_args = specs.get(name, (None, None))
+    if t in ('log', 'log-linear', 'ln') or (t is None and v_func is numpy.exp):
+        return 'exp', 0.0, numpy.nan
+    if t in ('log1p', 'log1p-linear') or (t is None and v_func is numpy.expm1):
+        return 'expm1', numpy.nan, numpy.nan
+    if t in ('logxp', 'logxp-linear'):
+        return 'exp', float(t_args), numpy.nan
+    if t == 'clip':
+        lo, hi = (numpy.nan if i is None else float(i) for i in t_args)
+        return 'clip', lo, hi
+    return None
+
+
+def _category_type(value):
+    if isinstance(value, (bool, numpy.bool_)):
+        return 'bool'
+    if isinstance(value, numbers.Integral):
+        return 'int'
+    if isinstance(value, numbers.Real):
+        return 'float'
+    return 'str'
+
+
+_CATEGORY_TYPES = {
+    'bool': lambda v: v == 'True',
+    'int': int,
+    'float': float,
+    'str': str,
+}
+
+_STAGE_TYPES = {
+    stage.kind: stage for stage in (_LinearStage, _GaussianStage)
+}
+
+
+def _compile_stages(regression, n_outputs):
+    """
+    Convert a fitted regressor into a list of compiled additive stages.
+
+    Raises:
+        NotImplementedError: If the regressor, or any part of it, is
+            not a kind that can be compiled.
+    """
+    from sklearn.linear_model import LinearRegression
+    from sklearn.gaussian_process import GaussianProcessRegressor
+    from sklearn.multioutput import MultiOutputRegressor
+    from ..learn.boosting import BoostedRegressor
+    from ..learn.sparse import SparseGaussianProcessRegressor
+    gaussian = (GaussianProcessRegressor, SparseGaussianProcessRegressor)
+
+    if isinstance(regression, BoostedRegressor):
+        stages = []
+        for estimator in regression.estimators_[:regression.prediction_tier]:
+            stages.extend(_compile_stages(estimator, n_outputs))
+        return stages
+    if isinstance(regression, LinearRegression):
+        return [_LinearStage(regression, n_outputs)]
+    if isinstance(regression, gaussian):
+        return [_GaussianStage([regression])]
+    if isinstance(regression, MultiOutputRegressor) and all(
+            isinstance(e, gaussian) for e in regression.estimators_
+    ):
+        return [_GaussianStage(regression.estimators_)]
+    raise NotImplementedError(f'cannot compile a {type(regression).__name__} regressor')
+
+
+class CompiledMetaModel:
+    """
+    A fitted meta-model, compiled for fast evaluation of individual points.
+
+    Evaluating a `MetaModel` one point at a time, as is done when it is
+    used as a core model for optimization, is dominated by the overhead of
+    building pandas objects and validating inputs in scikit-learn.  This
+    object instead holds everything needed to make predictions as
+    contiguous numpy arrays: the mapping of raw inputs (including one-hot
+    encoding of categorical inputs) to regression features, the variance
+    threshold mask, linear regression coefficients, and gaussian process
+    training data and weights.  Evaluation does not use pandas at all.
+
+    Only the default kind of meta-model regression (a linear regression
+    with a gaussian process on the residuals, using RBF kernels) can be
+    compiled.  Compiled meta-models are created by `MetaModel.compile`,
+    and are used automatically when a `MetaModel` is called with
+    keyword arguments.
+
+    Args:
+        metamodel (MetaModel): The fitted meta-model to compile.
+
+    Raises:
+        NotImplementedError: If the meta-model's regressor cannot be
+            compiled.
+    """
+
+    def __init__(self, metamodel):
+        self.input_names = list(metamodel.raw_input_columns)
+        self.output_names = list(metamodel.output_sample.columns)
+        self.disabled_outputs = list(metamodel.disabled_outputs or [])
+        self.output_transforms = [
+            (self.output_names.index(k), v_func)
+            for k, (_, v_func) in metamodel.output_transforms.items()
+        ]
+        self._output_transform_specs = [
+            (self.output_names.index(k), _inverse_transform_spec(metamodel, k, v_func))
+            for k, (_, v_func) in metamodel.output_transforms.items()
+        ]
+        self._compile_inputs(metamodel)
+        self._stages = _compile_stages(metamodel.regression, len(self.output_names))
+
+    def _compile_inputs(self, metamodel):
+        encoder = metamodel.cat_encoder
+        categorical = list(encoder.categorical_features_)
+        numeric = [i for i in self.input_names if i not in categorical]
+        # encoded features are the numeric inputs followed by the one-hot columns
+        encoded_source = [self.input_names.index(i) for i in numeric]
+        encoded_category = [None] * len(numeric)
+        if categorical:
+            for name, categories in zip(categorical, encoder.categories_):
+                for value in categories:
+                    encoded_source.append(self.input_names.index(name))
+                    encoded_category.append(value)
+
+        keep = metamodel.var_thresh.get_support()
+        invariant_values = numpy.asarray(metamodel.var_thresh.invariant_values, dtype=numpy.float64)
+        position = numpy.cumsum(keep) - 1
+
+        self._numeric_source, self._numeric_dest = [], []
+        self._invariant_source, self._invariant_values = [], []
+        self._categories = {}
+        n_invariant = 0
+        for n, (source, category) in enumerate(zip(encoded_source, encoded_category)):
+            if category is None:
+                if keep[n]:
+                    self._numeric_source.append(source)
+                    self._numeric_dest.append(position[n])
+                else:
+                    self._invariant_source.append(source)
+                    self._invariant_values.append(invariant_values[n_invariant])
+            else:
+                # a category that is dropped as invariant encodes to nothing
+                self._categories.setdefault(source, {})[category] = position[n] if keep[n] else -1
+            if not keep[n]:
+                n_invariant += 1
+        self._numeric_source = numpy.asarray(self._numeric_source, dtype=numpy.intp)
+        self._numeric_dest = numpy.asarray(self._numeric_dest, dtype=numpy.intp)
+        self._invariant_source = numpy.asarray(self._invariant_source, dtype=numpy.intp)
+        self._invariant_values = numpy.asarray(self._invariant_values, dtype=numpy.float64)
+        self.n_features = int(keep.sum())
+
+    def features(self, X):
+        """
+        Convert raw inputs to the features used by the regression.
+
+        Args:
+            X (array-like): Raw input values, with shape (n_points, n_inputs)
+                and columns in the order of `input_names`.
+
+        Returns:
+            numpy.ndarray: Shape (n_points, n_features)
+
+        Raises:
+            ValueError: If a categorical input has a value that was not
+                seen when fitting, or an input that was constant when
+                fitting has a different value.
+        """
+        X = numpy.asarray(X, dtype=object if self._categories else numpy.float64)
+        if X.ndim != 2 or X.shape[1] != len(self.input_names):
+            raise ValueError(f'expected inputs with {len(self.input_names)} columns, not shape {X.shape}')
+        features = numpy.zeros((X.shape[0], self.n_features))
+        features[:, self._numeric_dest] = X[:, self._numeric_source]
+        if len(self._invariant_source):
+            if numpy.any(X[:, self._invariant_source].astype(numpy.float64) != self._invariant_values):
+                raise ValueError("unexpected change in invariant inputs")
+        for source, lookup in self._categories.items():
+            try:
+                dest = numpy.fromiter((lookup[v] for v in X[:, source]), dtype=numpy.intp, count=X.shape[0])
+            except KeyError as err:
+                raise ValueError(f"Found unknown categories [{err.args[0]!r}] "
+                                 f"in input {self.input_names[source]!r}") from None
+            rows = numpy.nonzero(dest >= 0)[0]
+            features[rows, dest[rows]] = 1.0
+        return features
+
+    def _point_features(self, values):
+        """Convert the raw input values for a single point, without building object arrays."""
+        if len(values) != len(self.input_names):
+            raise ValueError(f'expected {len(self.input_names)} inputs, not {len(values)}')
+        features = numpy.zeros((1, self.n_features))
+        features[0, self._numeric_dest] = [values[i] for i in self._numeric_source]
+        for i, v in zip(self._invariant_source, self._invariant_values):
+            if values[i] != v:
+                raise ValueError("unexpected change in invariant inputs")
+        for source, lookup in self._categories.items():
+            try:
+                dest = lookup[values[source]]
+            except KeyError:
+                raise ValueError(f"Found unknown categories [{values[source]!r}] "
+                                 f"in input {self.input_names[source]!r}") from None
+            if dest >= 0:
+                features[0, dest] = 1.0
+        return features
+
+    def predict(self, X, return_std=False, memory_budget=None, dtype=numpy.float64):
+        """
+        Evaluate the meta-model on an array of raw inputs.
+
+        Args:
+            X (array-like): Raw input values, either a single point as
+                a vector of length n_inputs, or a matrix with shape
+                (n_points, n_inputs).  Columns are in the order of
+                `input_names`.
+            return_std (bool, default False): Return the standard deviation
+                of the estimates (without undoing output transforms) instead
+                of the estimates themselves.
+            memory_budget (int, optional): The working memory to use, in
+                bytes.  Points are evaluated in chunks, so that the kernel
+                matrices for each chunk fit within this budget.  Defaults
+                to `DEFAULT_MEMORY_BUDGET`.
+            dtype (numpy.dtype, default float64): The precision for
+                evaluating the gaussian process kernels.  Using float32
+                halves the memory needed for each point and is faster,
+                but estimates are only precise to about six significant
+                digits, and standard deviations to fewer when the kernel
+                matrices are ill-conditioned.
+
+        Returns:
+            numpy.ndarray: The outputs, in the order of `output_names`,
+                with shape (n_outputs,) or (n_points, n_outputs)
+                matching the shape of `X`.  Disabled outputs are
+                not included.
+        """
+        X = numpy.asarray(X, dtype=object if self._categories else numpy.float64)
+        if X.ndim == 1:
+            return self._evaluate(self._point_features(X), return_std, dtype)[0]
+        size = self.chunk_size(memory_budget, dtype, return_std)
+        chunks = [
+            self._evaluate(self.features(X[start:start + size]), return_std, dtype)
+            for start in range(0, len(X), size)
+        ]
+        if not chunks:
+            return numpy.zeros((0, len(self.output_names)))
+        return numpy.concatenate(chunks)
+
+    def chunk_size(self, memory_budget=None, dtype=numpy.float64, return_std=False):
+        """
+        The number of points to evaluate at once within a memory budget.
+
+        Args:
+            memory_budget (int, optional): The working memory to use, in
+                bytes.  Defaults to `DEFAULT_MEMORY_BUDGET`.
+            dtype (numpy.dtype, default float64): The precision for
+                evaluating the gaussian process kernels.
+            return_std (bool, default False): Whether standard deviations
+                are also evaluated, which needs more memory.
+
+        Returns:
+            int
+        """
+        if memory_budget is None:
+            memory_budget = DEFAULT_MEMORY_BUDGET
+        point_bytes = sum(stage.point_bytes(dtype, return_std) for stage in self._stages)
+        # the features and results for each point are small by comparison
+        point_bytes += 8 * (self.n_features + 2 * len(self.output_names))
+        return max(1, int(memory_budget // point_bytes))
+
+    def iter_predict(self, X, return_std=False, memory_budget=None, dtype=numpy.float64):
+        """
+        Evaluate the meta-model on many points, one chunk at a time.
+
+        Only one chunk of points is evaluated and held in memory at once,
+        so any number of points can be evaluated in constant memory, as
+        long as the results are consumed (or reduced) as they are made.
+
+        Args:
+            X (array-like): Raw input values, with shape (n_points, n_inputs)
+                and columns in the order of `input_names`.
+            return_std (bool, default False): Also yield the standard
+                deviation of the estimates (without undoing output
+                transforms).  The estimates and their standard deviations
+                share the same kernel evaluations.
+            memory_budget (int, optional), dtype (numpy.dtype, default float64):
+                See `predict`.
+
+        Yields:
+            numpy.ndarray or tuple: For each chunk of consecutive points,
+                the estimates, with shape (n_chunk, n_outputs), or a tuple
+                of the estimates and their standard deviations.
+        """
+        size = self.chunk_size(memory_budget, dtype, return_std)
+        for start in range(0, len(X), size):
+            features = self.features(X[start:start + size])
+            if return_std:
+                yield self._evaluate_with_std(features, dtype)
+            else:
+                yield self._evaluate(features, dtype=dtype)
+
+    def _evaluate(self, features, return_std=False, dtype=numpy.float64):
+        if return_std:
+            return self._stages[-1].predict_std(features, dtype)
+        result = self._stages[0].predict(features, dtype)
+        for stage in self._stages[1:]:
+            result += stage.predict(features, dtype)
+        return self._inverse_transform(result)
+
+    def _evaluate_with_std(self, features, dtype=numpy.float64):
+        # the last stage gives both, from one evaluation of its kernels
+        result, std = self._stages[-1].predict_mean_std(features, dtype)
+        for stage in self._stages[:-1]:
+            result += stage.predict(features, dtype)
+        return self._inverse_transform(result), std
+
+    def _hypothetical_posterior(self, X):
+        """
+        Track posterior standard deviations with hypothetical training points.
+
+        Args:
+            X (array-like): Raw input values for the candidate points, with
+                shape (n_candidates, n_inputs) and columns in the order of
+                `input_names`.
+
+        Returns:
+            _HypotheticalPosterior
+
+        Raises:
+            NotImplementedError: If the last stage of the regression is not
+                a gaussian process, or this meta-model was saved without
+                standard deviations.
+        """
+        stage = self._stages[-1]
+        if not isinstance(stage, _GaussianStage):
+            raise NotImplementedError('a linear regression has no standard deviation of estimates')
+        return _HypotheticalPosterior(stage, self.features(X))
+
+    def _inverse_transform(self, result):
+        for j, v_func in self.output_transforms:
+            result[:, j] = v_func(result[:, j])
+        return result
+
+    def __call__(self, *args, **kwargs):
+        """
+        Evaluate the meta-model at a single point.
+
+        Args:
+            *args (Mapping, optional): The inputs, as a single mapping.
+            **kwargs:
+                All defined (meta)model parameters are passed as keyword
+                arguments, including both uncertainties and levers.
+
+        Returns:
+            dict:
+                A single dictionary containing all performance measure outcomes.
+        """
+        if len(args) == 1:
+            kwargs = dict(args[0], **kwargs)
+        elif len(args) > 1:
+            raise TypeError(f'takes at most one positional argument, not {len(args)}')
+        output = self._evaluate(self._point_features([kwargs[i] for i in self.input_names]))[0]
+        result = dict(zip(self.output_names, output))
+        for i in self.disabled_outputs:
+            result[i] = None
+        return result
+
+    def save(self, path, include_std=True):
+        """
+        Save this compiled meta-model as a numpy `.npz` archive.
+
+        The archive holds only numeric and string arrays: the input encoding,
+        the linear regression coefficients, the gaussian process training
+        points (scaled by the kernel length scales) and weights, and the
+        output transforms.  It is read back by `CompiledMetaModel.load`,
+        which needs only numpy, not scikit-learn or pandas, and does not
+        depend on the versions of the libraries used to fit the meta-model.
+        The archive is not compressed, so `load` can memory-map its arrays.
+
+        Args:
+            path (str or file-like): Where to write the archive.
+            include_std (bool, default True): Also save the inverse kernel
+                matrices, needed for `predict(X, return_std=True)`.  These
+                take n² values for each output, for n training points.
+
+        Raises:
+            NotImplementedError: If an output transform is not one of
+                the standard meta-model types.
+        """
+        for j, spec in self._output_transform_specs:
+            if spec is None:
+                raise NotImplementedError(f'cannot save the output transform for {self.output_names[j]!r}')
+        categories = [
+            (source, dest, value)
+            for source, lookup in self._categories.items()
+            for value, dest in lookup.items()
+        ]
+        arrays = dict(
+            format_version=numpy.asarray(FORMAT_VERSION),
+            input_names=numpy.asarray(self.input_names, dtype=str),
+            output_names=numpy.asarray(self.output_names, dtype=str),
+            disabled_outputs=numpy.asarray(self.disabled_outputs, dtype=str),
+            n_features=numpy.asarray(self.n_features),
+            numeric_source=self._numeric_source,
+            numeric_dest=self._numeric_dest,
+            invariant_source=self._invariant_source,
+            invariant_values=self._invariant_values,
+            category_source=numpy.asarray([c[0] for c in categories], dtype=numpy.intp),
+            category_dest=numpy.asarray([c[1] for c in categories], dtype=numpy.intp),
+            category_value=numpy.asarray([str(c[2]) for c in categories], dtype=str),
+            category_type=numpy.asarray([_category_type(c[2]) for c in categories], dtype=str),
+            transform_column=numpy.asarray([j for j, _ in self._output_transform_specs], dtype=numpy.intp),
+            transform_kind=numpy.asarray([spec[0] for _, spec in self._output_transform_specs], dtype=str),
+            transform_params=numpy.asarray(
+                [spec[1:] for _, spec in self._output_transform_specs], dtype=numpy.float64,
+            ).reshape(-1, 2),
+            stage_kind=numpy.asarray([stage.kind for stage in self._stages], dtype=str),
+        )
+        for i, stage in enumerate(self._stages):
+            for name, array in stage.arrays(include_std).items():
+                arrays[f'stage{i}_{name}'] = array
+        numpy.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path, mmap_mode=None):
+        """
+        Load a compiled meta-model saved by `save` or `MetaModel.export`.
+
+        Args:
+            path (str or file-like): The `.npz` archive to read.
+            mmap_mode ({None, 'r', 'c'}, optional): If given, the arrays
+                are memory-mapped from the archive in this mode (see
+                `numpy.memmap`) instead of being read into memory, so
+                large training sets are paged in only as they are used,
+                and are shared between processes loading the same file.
+                The path must then be a file name.
+
+        Returns:
+            CompiledMetaModel
+
+        Raises:
+            ValueError: If the file is not a compiled meta-model archive
+                in a format that this version can read.
+        """
+        if mmap_mode is not None:
+            arrays = _memmap_npz(path, mmap_mode)
+        else:
+            with numpy.load(path, allow_pickle=False) as archive:
+                arrays = {k: archive[k] for k in archive.files}
+        if 'format_version' not in arrays or int(arrays['format_version']) != FORMAT_VERSION:
+            raise ValueError(f'{path} is not a compiled meta-model in format version {FORMAT_VERSION}')
+
+        self = cls.__new__(cls)
+        self.input_names = arrays['input_names'].tolist()
+        self.output_names = arrays['output_names'].tolist()
+        self.disabled_outputs = arrays['disabled_outputs'].tolist()
+        self.n_features = int(arrays['n_features'])
+        self._numeric_source = arrays['numeric_source']
+        self._numeric_dest = arrays['numeric_dest']
+        self._invariant_source = arrays['invariant_source']
+        self._invariant_values = arrays['invariant_values']
+        self._categories = {}
+        for source, dest, value, value_type in zip(
+                arrays['category_source'], arrays['category_dest'],
+                arrays['category_value'], arrays['category_type'],
+        ):
+            self._categories.setdefault(int(source), {})[_CATEGORY_TYPES[value_type](value)] = int(dest)
+        self._output_transform_specs = [
+            (int(j), (str(kind), a, b))
+            for j, kind, (a, b) in zip(
+                arrays['transform_column'], arrays['transform_kind'], arrays['transform_params'],
+            )
+        ]
+        self.output_transforms = [
+            (j, functools.partial(_INVERSE_TRANSFORMS[kind], a=a, b=b))
+            for j, (kind, a, b) in self._output_transform_specs
+        ]
+        self._stages = []
+        for i, kind in enumerate(arrays['stage_kind']):
+            prefix = f'stage{i}_'
+            self._stages.append(_STAGE_TYPES[kind].from_arrays({
+                k[len(prefix):]: v for k, v in arrays.items() if k.startswith(prefix)
+            }))
+        return self
+
+    def __repr__(self):
+        return f"<emat.CompiledMetaModel {len(self.input_names)} inputs -> {len(self.output_names)} outputs>"
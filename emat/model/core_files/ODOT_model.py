@@ -158,6 +158,32 @@ class ODOTModel(FilesCoreModel):
         # rename the model / sandbox directory to the experiment number / id
         os.rename(self.model_path,self.model_path + '_' + str(experiment_id))
 
+    def setup_sandbox(self, params: dict, sandbox_path: str):
+        """
+        Create a sandboxed copy of the reference model for one experiment.
+
+        The sandbox is named the same as the directory an experiment is
+        archived to by `archive`, so it is left in place afterwards.
+
+        Args:
+            params (dict): experiment variables including both exogenous
+                uncertainty and policy levers
+            sandbox_path (str): The directory for the sandboxed model.
+        """
+        from shutil import rmtree
+        if os.path.exists(sandbox_path):
+            rmtree(sandbox_path)
+        self.copyeverything(self.config['model_ref'], sandbox_path)
+        pd.Series(params).to_csv(os.path.join(sandbox_path, 'Emat_Parameters.csv'), header=False)
+
+    def subprocess_commands(self, params: dict):
+        """
+        The bat files that update inputs, run, and post-process the model.
+
+        These are the same steps as `setup`, `run` and `post_process`.
+        """
+        return ["EMAT_Inputs.bat", "RunModel.bat", "EMAT_Process.bat"]
+
 
     # final list to push all csv results to TMIP-EMAT
 
@@ -5,3 +5,4 @@ from .gbnrtc_model import GBNRTCModel
 from .ODOT_model import ODOTModel
 
 from .parsers import TableParser, FileParser
+from .async_evaluator import AsyncSubprocessEvaluator
@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+""" async_evaluator.py - run subprocess-driven core models concurrently"""
+
+import asyncio
+import queue
+import subprocess
+import threading
+import time
+import pandas as pd
+
+from ema_workbench.em_framework.evaluators import BaseEvaluator
+from ema_workbench.em_framework.points import experiment_generator
+
+from ...util.loggers import get_module_logger
+_logger = get_module_logger(__name__)
+
+
+async def run_subprocess(command, cwd=None):
+	"""
+	Run a command as a subprocess, and wait for it to finish.
+
+	Args:
+		command (str or List[str]): The command to run.  A str is run
+			through the shell, and a list is run directly as program
+			and arguments.
+		cwd (str, optional): The working directory for the command.
+
+	Raises:
+		subprocess.CalledProcessError: If the command returns a
+			non-zero exit code.
+	"""
+	if isinstance(command, str):
+		process = await asyncio.create_subprocess_shell(command, cwd=cwd)
+	else:
+		process = await asyncio.create_subprocess_exec(*command, cwd=cwd)
+	try:
+		returncode = await process.wait()
+	except asyncio.CancelledError:
+		# don't leave the model running when the run is cancelled or times out
+		if process.returncode is None:
+			process.kill()
+			await process.wait()
+		raise
+	if returncode != 0:
+		raise subprocess.CalledProcessError(returncode, command)
+
+
+class AsyncSubprocessEvaluator(BaseEvaluator):
+	"""
+	Evaluator that runs many subprocess-driven core model runs at once.
+
+	File-based core models spend nearly all of their run time waiting
+	for external programs.  Instead of tying up a Python worker process
+	for every run, this evaluator launches each model run as a set of
+	subprocesses in its own sandbox directory, and awaits them on a
+	single asyncio event loop, so one Python process can drive dozens
+	of simultaneous runs.  Parsing performance measures and writing
+	them to the database are done on the event loop as each run finishes.
+	The database is the one given to `run_experiments`, and if that
+	is `False` nothing is written, and each run's sandbox is instead
+	named for its position in the list of experiments being run.
+
+	The core model must implement `setup_sandbox` and
+	`subprocess_commands` (see `FilesCoreModel`).  Timeouts and retries
+	given to `run_experiments` apply to each run, and a timed out
+	run has its subprocess killed.
+
+	Args:
+		msis (FilesCoreModel): The core model.
+		max_concurrent (int, default 8): The maximum number of model
+			runs at once.
+
+	Example:
+		>>> with AsyncSubprocessEvaluator(model, max_concurrent=24) as evaluator:   # doctest: +SKIP
+		...     results = model.run_experiments(design, evaluator=evaluator)
+	"""
+
+	# results are written to the database as each run finishes,
+	# so `run_experiments` does not write them again
+	writes_measures = True
+
+	def __init__(self, msis, max_concurrent=8):
+		super().__init__(msis)
+		if len(self._msis) != 1:
+			raise ValueError("AsyncSubprocessEvaluator runs a single core model")
+		self.max_concurrent = max_concurrent
+		self._loop = None
+		self._tasks = set()
+		self._cancelled = False
+
+	@property
+	def n_processes(self):
+		"""int: The number of experiments that can run at once."""
+		return self.max_concurrent
+
+	def initialize(self):
+		pass
+
+	def finalize(self):
+		pass
+
+	def cancel(self):
+		"""
+		Cancel the experiments that are running or waiting to run.
+
+		Running model subprocesses are killed, and the current call
+		to `evaluate_experiments` raises `ExperimentsCancelledError`
+		once they have stopped.  Results of experiments that finished
+		before cancellation are already stored in the database.  This
+		method may be called from any thread, or from a signal handler.
+		"""
+		self._cancelled = True
+		loop = self._loop
+		if loop is not None and not loop.is_closed():
+			loop.call_soon_threadsafe(self._cancel_tasks)
+
+	def _cancel_tasks(self):
+		current = asyncio.current_task()
+		for task in self._tasks:
+			if task is not current:
+				task.cancel()
+
+	def evaluate_experiments(self, scenarios, policies, callback, combine="factorial"):
+		"""used by ema_workbench"""
+		from ...exceptions import ExperimentsCancelledError
+
+		model = self._msis[0]
+		self._cancelled = False
+
+		# the database resolved by `run_experiments`, or the model's own
+		db = getattr(model, '_run_db', None)
+		if db is None:
+			db = model.db
+		db = db or None
+
+		# Database lookups happen here, in the calling thread.
+		jobs = [
+			self._prepare(model, experiment, db)
+			for experiment in experiment_generator(scenarios, self._msis, policies, combine=combine)
+		]
+
+		def finish(experiment, experiment_id, measures, run_seconds):
+			# run_seconds is None for failed runs and for results that
+			# were already in the database, neither of which are written
+			from ..core_model import _RUN_SECONDS
+			if run_seconds is not None and db is not None:
+				db.write_experiment_measures(
+					model.scope.name,
+					model.metamodel_id,
+					pd.DataFrame(measures, index=[experiment_id]),
+				)
+			outcomes = dict(measures)
+			if run_seconds is not None and getattr(model, '_time_runs', False):
+				outcomes[_RUN_SECONDS] = run_seconds
+			callback(experiment, outcomes)
+
+		try:
+			asyncio.get_running_loop()
+		except RuntimeError:
+			asyncio.run(self._evaluate(model, jobs, finish))
+		else:
+			self._evaluate_in_thread(model, jobs, finish)
+
+		if self._cancelled:
+			raise ExperimentsCancelledError("experiments cancelled")
+
+	def _evaluate_in_thread(self, model, jobs, finish):
+		"""
+		Run the event loop in a helper thread.
+
+		This is needed when the calling thread already has a running
+		event loop (e.g. in a Jupyter notebook).  Database connections
+		are bound to the calling thread, so measures are handed back
+		to it to be written to the database.
+		"""
+		finished = queue.Queue()
+		errors = []
+
+		def target():
+			try:
+				asyncio.run(self._evaluate(model, jobs, lambda *args: finished.put(args)))
+			except BaseException as err:
+				errors.append(err)
+			finally:
+				finished.put(None)
+
+		thread = threading.Thread(target=target, daemon=True)
+		thread.start()
+		while True:
+			args = finished.get()
+			if args is None:
+				break
+			finish(*args)
+		thread.join()
+		if errors:
+			raise errors[0]
+
+	@staticmethod
+	def _prepare(model, experiment, db):
+		"""Find the experiment id, and any results already in the database."""
+		scenario, policy = experiment.scenario, experiment.policy
+		params = {}
+		params.update(scenario)
+		params.update(policy)
+		if db is None:
+			return experiment, params, experiment.experiment_id, None
+		experiment_id = db.read_experiment_id(model.scope.name, None, scenario, policy)
+		precomputed = None
+		if experiment_id is not None and model.allow_short_circuit:
+			precomputed = db.read_experiment_measures(
+				model.scope.name,
+				design=None,
+				experiment_id=experiment_id,
+			)
+			precomputed = None if precomputed.empty else dict(precomputed.iloc[0])
+		if experiment_id is None:
+			experiment_id = db.write_experiment_parameters_1(
+				model.scope.name, 'ad hoc', scenario, policy
+			)
+		return experiment, params, experiment_id, precomputed
+
+	async def _evaluate(self, model, jobs, finish):
+		self._loop = asyncio.get_event_loop()
+		semaphore = asyncio.Semaphore(self.max_concurrent)
+		tasks = [
+			asyncio.ensure_future(self._run_one(model, job, semaphore, finish))
+			for job in jobs
+		]
+		self._tasks = set(tasks)
+		if self._cancelled:
+			self._cancel_tasks()
+		try:
+			results = await asyncio.gather(*tasks, return_exceptions=True)
+		finally:
+			self._tasks = set()
+			self._loop = None
+		for result in results:
+			if isinstance(result, Exception) and not isinstance(result, asyncio.CancelledError):
+				raise result
+
+	async def _run_one(self, model, job, semaphore, finish):
+		from ...exceptions import ExperimentTimeoutError
+
+		experiment, params, experiment_id, precomputed = job
+		failure_policy = getattr(model, '_failure_policy', None) or {}
+		if failure_policy:
+			failure_policy['attempted'].add(experiment.policy.name)
+		if precomputed is not None:
+			finish(experiment, experiment_id, precomputed, None)
+			return
+
+		timeout = failure_policy.get('timeout')
+		async with semaphore:
+			attempt = 0
+			while True:
+				attempt += 1
+				start = time.perf_counter()
+				try:
+					measures = await asyncio.wait_for(
+						model.run_model_async(params, experiment_id),
+						timeout,
+					)
+					break
+				except asyncio.TimeoutError:
+					err = ExperimentTimeoutError(f"exceeded time limit of {timeout} seconds")
+				except Exception as exc:
+					err = exc
+				if not failure_policy:
+					# without a failure policy, one failed run stops them all
+					self._cancel_tasks()
+					raise err
+				message = f"{type(err).__name__}: {err}"
+				if attempt > failure_policy['max_retries']:
+					_logger.warning(f"experiment {experiment_id} failed after {attempt} attempt(s), {message}")
+					failure_policy['failures'][experiment.policy.name] = message
+					finish(experiment, experiment_id, {}, None)
+					return
+				delay = failure_policy['retry_backoff'] * 2 ** (attempt - 1)
+				_logger.warning(f"experiment {experiment_id} attempt {attempt} failed, {message}, "
+								f"retrying in {delay} seconds")
+				await asyncio.sleep(delay)
+		finish(experiment, experiment_id, measures, time.perf_counter() - start)
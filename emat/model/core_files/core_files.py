@@ -137,6 +137,9 @@ class FilesCoreModel(AbstractCoreModel):
 			4. (optionally) archive model outputs
 			5. record performance measures to database
 
+		If a timeout or retries are set in `run_experiments`, these
+		steps are repeated as needed under those limits.
+
 		Note that this method does *not* return any outcomes.
 		Outcomes are instead written into self.outcomes_output,
 		and can be retrieved from there.
@@ -152,6 +155,10 @@ class FilesCoreModel(AbstractCoreModel):
 				this type.
 
 		"""
+		self._run_model_with_failure_policy(self._run_core_model, scenario, policy)
+
+	def _run_core_model(self, scenario, policy):
+		"""Run one attempt of an experiment, see `run_model`."""
 
 		_logger.debug("run_core_model read_experiment_parameters")
 
@@ -208,6 +215,90 @@ class FilesCoreModel(AbstractCoreModel):
 			_logger.debug(f"run_core_model archive {experiment_id}")
 			self.archive(xl, archive_path, experiment_id)
 
+	def get_sandbox_path(self, experiment_id: int) -> str:
+		"""
+		Get the directory of a sandboxed model instance.
+
+		When experiments are run with an `AsyncSubprocessEvaluator`,
+		each experiment runs in its own copy of the model, so that
+		many experiments can run at once.
+
+		Args:
+			experiment_id (int): The id number for the experiment.
+
+		Returns:
+			str: The sandbox directory for this experiment.
+		"""
+		return f"{self.model_path}_{experiment_id}"
+
+	def setup_sandbox(self, params: dict, sandbox_path: str):
+		"""
+		Create a sandboxed model instance configured for one experiment.
+
+		This is the counterpart of `setup` for concurrent runs.  It is
+		called from a worker thread, so it must neither change the
+		working directory nor use the database.
+
+		Args:
+			params (dict): experiment variables including both exogenous
+				uncertainty and policy levers
+			sandbox_path (str): The directory for the sandboxed model,
+				from `get_sandbox_path`.
+		"""
+		raise NotImplementedError
+
+	def subprocess_commands(self, params: dict):
+		"""
+		The commands that run and post-process the model in a sandbox.
+
+		This is the counterpart of `run` and `post_process` for
+		concurrent runs.
+
+		Args:
+			params (dict): experiment variables including both exogenous
+				uncertainty and policy levers
+
+		Returns:
+			List[str or List[str]]:
+				Commands to run in order, with the sandbox as the
+				working directory.  A command given as a str is run
+				through the shell, and a list is run directly as
+				program and arguments.
+		"""
+		raise NotImplementedError
+
+	async def run_model_async(self, params: dict, experiment_id: int):
+		"""
+		Run one attempt of an experiment in its sandbox.
+
+		Used by `AsyncSubprocessEvaluator`.  The sandbox is set up in
+		a worker thread, the model commands run as subprocesses that
+		are awaited on the event loop, and the performance measures
+		are then parsed from the sandbox outputs.  If the run is
+		cancelled, the running subprocess is killed.
+
+		Args:
+			params (dict): experiment variables including both exogenous
+				uncertainty and policy levers
+			experiment_id (int): The id number for the experiment.
+
+		Returns:
+			dict: The performance measures.
+		"""
+		import asyncio
+		from .async_evaluator import run_subprocess
+
+		sandbox_path = self.get_sandbox_path(experiment_id)
+		_logger.debug(f"run_model_async setup {experiment_id}")
+		await asyncio.get_event_loop().run_in_executor(None, self.setup_sandbox, params, sandbox_path)
+		for command in self.subprocess_commands(params):
+			_logger.debug(f"run_model_async {experiment_id}: {command}")
+			await run_subprocess(command, cwd=sandbox_path)
+		return self.load_measures(
+			self.scope.get_measure_names(),
+			abs_output_path=os.path.join(sandbox_path, self.rel_output_path),
+		)
+
 	@copydoc(AbstractCoreModel.get_experiment_archive_path)
 	def get_experiment_archive_path(self, experiment_id: int) -> str:
 		if self.archive_path is None:
@@ -2,6 +2,7 @@
 """ core_model.py - define coure model API"""
 import os
 import abc
+import copy
 import yaml
 import pandas as pd
 import numpy as np
@@ -23,6 +24,57 @@ from .._pkg_constants import *
 from ..util.loggers import get_module_logger
 _logger = get_module_logger(__name__)
 
+
+_RUN_SECONDS = '_emat_run_seconds'
+
+# the counts reported by `run_experiments` when results are not returned
+_RUN_SUMMARY = ('complete', 'failed', 'already complete', 'quarantined', 'interrupted')
+
+
+def _run_summary(counts):
+    """A Series of experiment counts, as returned by `run_experiments`."""
+    return pd.Series([counts[i] for i in _RUN_SUMMARY], index=_RUN_SUMMARY, name='experiments')
+
+
+def _batches(design, batch_size=None, reorder=None):
+    """
+    Iterate over a design in batches of rows.
+
+    If `reorder` is given, it is called on the remaining rows
+    before each batch is taken, and should return them reordered.
+    """
+    if not batch_size:
+        batch_size = len(design)
+    remaining = design
+    while len(remaining):
+        if reorder is not None:
+            remaining = reorder(remaining)
+        yield remaining.iloc[:batch_size]
+        remaining = remaining.iloc[batch_size:]
+
+
+def _timing_callback(run_seconds):
+    """
+    A workbench callback class that also collects experiment run times.
+
+    Args:
+        run_seconds (dict): Run times are added to this dict, keyed
+            by the workbench experiment_id (i.e. the position of the
+            experiment in the list being run).
+    """
+    from ema_workbench.em_framework.callbacks import DefaultCallback
+
+    class TimingCallback(DefaultCallback):
+        def __call__(self, experiment, outcomes):
+            # the run time is not an outcome, so it is removed before
+            # the outcomes are stored by the workbench
+            if _RUN_SECONDS in outcomes:
+                run_seconds[experiment.experiment_id] = outcomes.pop(_RUN_SECONDS)
+            super().__call__(experiment, outcomes)
+
+    return TimingCallback
+
+
 class AbstractCoreModel(abc.ABC, AbstractWorkbenchModel):
     """
     An interface for using a model with EMAT.
@@ -201,8 +253,91 @@ class AbstractCoreModel(abc.ABC, AbstractWorkbenchModel):
             params (dict): Dictionary of experiment variables
             model_results_path (str): archive path
             experiment_id (int, optional): The id number for this experiment.
-        
+
+        """
+
+    def run_model(self, scenario, policy):
+        """
+        Runs an experiment through the model.
+
+        This method overloads the `run_model` method given in
+        the EMA Workbench, to apply the per-experiment timeout and
+        retry settings given to `run_experiments`, if any.
+
+        Args:
+            scenario (Scenario): A dict-like object that
+                has key-value pairs for each uncertainty.
+            policy (Policy): A dict-like object that
+                has key-value pairs for each lever.
+        """
+        self._run_model_with_failure_policy(super().run_model, scenario, policy)
+
+    def _run_model_with_failure_policy(self, run_model, scenario, policy):
+        """
+        Call `run_model` under the current failure policy.
+
+        With no failure policy set, `run_model` is simply called.
+        Otherwise each attempt is limited to the policy's timeout,
+        failed attempts are retried with exponential backoff, and
+        if all attempts fail a CaseError is raised, which the EMA
+        Workbench logs before moving on to the next experiment,
+        leaving the outcomes of this experiment empty.  An attempt that
+        times out but cannot be stopped (see `call_with_timeout`) is not
+        retried, as it may still be running with this model's state.
+        """
+        import time
+        failure_policy = getattr(self, '_failure_policy', None)
+        if not failure_policy:
+            start = time.perf_counter()
+            run_model(scenario, policy)
+            self._stamp_run_seconds(time.perf_counter() - start)
+            return
+
+        from ema_workbench.util import CaseError
+        from ..util.interrupts import call_with_timeout
+
+        failure_policy['attempted'].add(getattr(policy, 'name', None))
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                start = time.perf_counter()
+                call_with_timeout(run_model, failure_policy['timeout'], scenario, policy)
+                self._stamp_run_seconds(time.perf_counter() - start)
+                return
+            except Exception as err:
+                self.reset_model()
+                # not all versions of the workbench clear outcomes on reset
+                getattr(self, '_outcomes_output', {}).clear()
+                message = f"{type(err).__name__}: {err}"
+                # an abandoned run may still be using this model, so it is not retried
+                if attempt > failure_policy['max_retries'] or getattr(err, 'abandoned', False):
+                    failure_policy['failures'][getattr(policy, 'name', None)] = message
+                    raise CaseError(
+                        f"experiment failed after {attempt} attempt(s), {message}",
+                        dict(**scenario, **policy),
+                        policy,
+                    ) from err
+                delay = failure_policy['retry_backoff'] * 2 ** (attempt - 1)
+                _logger.warning(f"experiment attempt {attempt} failed, {message}, "
+                                f"retrying in {delay} seconds")
+                time.sleep(delay)
+
+    def _stamp_run_seconds(self, seconds):
+        """
+        Add the run time of an experiment to its outcomes.
+
+        The run time travels back with the outcomes from whatever process
+        ran the experiment, and is picked up by the callback used in
+        `_perform_experiments`, which removes it again.  Run times are only
+        added while `run_experiments` is running, so the outcomes of any
+        other call to `run_model` are left as they are.
         """
+        if not getattr(self, '_time_runs', False):
+            return
+        outcomes = self.outcomes_output
+        if isinstance(outcomes, dict):
+            outcomes[_RUN_SECONDS] = seconds
 
     def read_experiments(
             self,
@@ -352,10 +487,17 @@ class AbstractCoreModel(abc.ABC, AbstractWorkbenchModel):
             sampler (str or AbstractSampler, default 'lhs'): The sampler to use for this
                 design.  Available pre-defined samplers include:
                     - 'lhs': Latin Hypercube sampling
+                    - 'olhs': Latin Hypercube sampling, optimized for low correlation
+                        between parameters and for spread between experiments (see
+                        `CorrelatedLHSSampler` to set the optimization time)
                     - 'ulhs': Uniform Latin Hypercube sampling, which ignores defined
                         distribution shapes from the scope and samples everything
                         as if it was from a uniform distribution
                     - 'mc': Monte carlo sampling
+                    - 'sobol': Scrambled Sobol low-discrepancy sampling, which
+                        covers the space more evenly than random sampling, and is
+                        most even when the number of samples is a power of 2
+                    - 'halton': Scrambled Halton low-discrepancy sampling
                     - 'uni': Univariate sensitivity testing, whereby experiments are
                         generated setting each parameter individually to minimum and
                         maximum values (for numeric dtypes) or all possible values
@@ -370,9 +512,17 @@ class AbstractCoreModel(abc.ABC, AbstractWorkbenchModel):
                 for levers and uncertainties, and then combine the two in a full-factorial
                 manner.  This argument has no effect unless `sample_from` is 'all'.
                 Note that jointly may produce a very large design;
+            chunk_size (int, optional): Stream the design into the database
+                `db` instead of returning it, generating and writing this many
+                experiments at a time.  See `emat.experiment.experimental_design.design_experiments`.
+            lazy (bool, default False): If `jointly` is False, return the
+                full-factorial design as a `FactorialDesign`, which makes the
+                combined experiments as they are needed.
 
         Returns:
-            pandas.DataFrame: The resulting design.
+            pandas.DataFrame, FactorialDesign or StreamedDesign:
+                The resulting design, or if `chunk_size` is given, a handle
+                to read the design from the database.
         """
         if 'scope' in kwargs:
             kwargs.pop('scope')
@@ -390,6 +540,14 @@ class AbstractCoreModel(abc.ABC, AbstractWorkbenchModel):
             *,
             design_name=None,
             db=None,
+            resume=False,
+            batch_size=None,
+            timeout=None,
+            max_retries=None,
+            retry_backoff=1.0,
+            scheduler=None,
+            chunk_size=10000,
+            return_results=True,
     ):
         """
         Runs a design of combined experiments using this model.
@@ -411,6 +569,9 @@ class AbstractCoreModel(abc.ABC, AbstractWorkbenchModel):
             design (pandas.DataFrame, optional): experiment definitions
                 given as a DataFrame, where each exogenous uncertainties and
                 policy levers is given as a column, and each row is an experiment.
+                A lazy design, such as a `FactorialDesign` or a `StreamedDesign`,
+                is also accepted, and its experiments are made or read in
+                chunks as they are run.
             evaluator (ema_workbench.Evaluator, optional): Optionally give an
                 evaluator instance.  If not given, a default SequentialEvaluator
                 will be instantiated.
@@ -422,11 +583,69 @@ class AbstractCoreModel(abc.ABC, AbstractWorkbenchModel):
                 If there is no default db, and none is given here,
                 the results are not stored in a database. Set to False to explicitly
                 not use the default database, even if it exists.
+            resume (bool, default False): Run in resumable mode.  Experiments
+                that the database's run manifest records as complete for this
+                model are not dispatched again, and their stored results are
+                merged with the new results in the return value.  Experiments
+                with no record in the run manifest are treated as complete if
+                any of their performance measures are stored.
+                The experiments that are dispatched are recorded in a
+                run manifest in the database, and results are written
+                to the database after each batch.  Interrupting a resumable
+                run with SIGINT or SIGTERM finishes the current batch and
+                then returns the experiments completed so far; calling
+                this method again with `resume=True` picks up the rest.
+                Requires a database.
+            batch_size (int, optional): The number of experiments to dispatch
+                to the evaluator at one time.  Defaults to the entire design
+                when `resume` is False, and to 100 when `resume` is True.
+            timeout (float, optional): A wall-clock time limit in seconds for
+                each attempt to run a single experiment.  Outside the main
+                thread, or on platforms without SIGALRM, an attempt that runs
+                too long cannot be stopped, so the experiment is given up on
+                without any retries.
+            max_retries (int, optional): The number of times a failed or timed
+                out experiment is retried before it is given up on.  If neither
+                this nor `timeout` is given, a failing experiment raises an
+                error that aborts the entire run.  Otherwise, an experiment that
+                fails on every attempt is left without results (its measures
+                are NaN in the returned DataFrame) and, if there is a
+                database, it is recorded as quarantined in the database's
+                run manifest.  Quarantined experiments are not dispatched
+                again by later calls to this method.
+            retry_backoff (float, default 1.0): The delay in seconds before the
+                first retry of a failed experiment.  The delay doubles for
+                each subsequent retry.
+            scheduler (bool or ExperimentScheduler, optional): Set to True to
+                dispatch experiments in order of decreasing expected run
+                time, as predicted by an `ExperimentScheduler` fit on the run
+                times of past experiments recorded in the database.  When
+                experiments are run in batches, the run time model is refit
+                and the remaining experiments reordered before each batch.
+                The projected makespan of the scheduled order, compared to
+                the original order, is logged and stored in the scheduler's
+                `last_report` attribute; give an `ExperimentScheduler`
+                instance instead of True to access it.  The returned
+                DataFrame is in the original order regardless.  Experiments
+                in a lazy design are reordered within each chunk.
+            chunk_size (int, default 10000): The number of experiments to
+                take from a lazy design at one time.  In resumable mode,
+                each chunk is run as a separate resumable run.
+            return_results (bool, default True): Set to False to write results
+                to the database without also collecting them to be returned,
+                so that very large designs can be run in limited memory.
+                A summary of the run is then returned instead.  Requires a
+                database.
 
         Returns:
             pandas.DataFrame:
                 A DataFrame that contains all uncertainties, levers, and measures
-                for the experiments.
+                for the experiments.  If `return_results` is False, a
+                pandas.Series is returned instead, counting the experiments
+                that were 'complete' or 'failed' in this run, that were
+                'already complete' when resuming, that were skipped as
+                'quarantined', and that were not run because the run was
+                'interrupted'.
 
         Raises:
             ValueError:
@@ -436,8 +655,6 @@ class AbstractCoreModel(abc.ABC, AbstractWorkbenchModel):
 
         """
 
-        from ema_workbench import Scenario, Policy, perform_experiments
-
         # catch user gives only a design, not experiment_parameters
         if isinstance(design, str) and design_name is None:
             design_name, design = design, None
@@ -453,9 +670,238 @@ class AbstractCoreModel(abc.ABC, AbstractWorkbenchModel):
                 raise ValueError(f'cannot load design "{design_name}", there is no db')
             design = db.read_experiment_parameters(self.scope.name, design_name)
 
-        if design.empty:
+        lazy = not isinstance(design, pd.DataFrame) and hasattr(design, 'iter_chunks')
+        if lazy and design_name is None:
+            design_name = getattr(design, 'design_name', None)
+
+        if design.empty if not lazy else len(design) == 0:
             raise ValueError(f"no experiments available")
 
+        if not return_results and not db:
+            raise ValueError('cannot run experiments without returning results, there is no db')
+
+        from collections import Counter
+        counts = Counter()
+        # the run manifest is read once, not once per chunk of a lazy design
+        status = self._read_run_status(db) if db else None
+        if status is not None and not lazy:
+            design = self._drop_quarantined_experiments(design, status, counts)
+
+        if timeout is not None or max_retries is not None:
+            self._failure_policy = dict(
+                timeout=timeout,
+                max_retries=max_retries or 0,
+                retry_backoff=retry_backoff,
+                failures={},
+                attempted=set(),
+            )
+        # set before the evaluator is prepared, so they are sent to the workers
+        self._time_runs = True
+        self._run_db = db
+        evaluator = prepare_evaluator(evaluator, self)
+        reorder = self._scheduled_reorder(scheduler, db, evaluator)
+
+        try:
+            if resume:
+                if not db:
+                    raise ValueError('cannot resume experiments, there is no db')
+                if status is None:
+                    status = pd.Series(dtype=object)
+                if lazy:
+                    result = self._run_lazy_design_resumable(
+                        design,
+                        evaluator,
+                        design_name=design_name,
+                        db=db,
+                        batch_size=batch_size or 100,
+                        reorder=reorder,
+                        chunk_size=chunk_size,
+                        status=status,
+                        counts=counts,
+                        return_results=return_results,
+                    )
+                else:
+                    result = self._run_experiments_resumable(
+                        design,
+                        evaluator,
+                        design_name=design_name,
+                        db=db,
+                        batch_size=batch_size or 100,
+                        reorder=reorder,
+                        status=status,
+                        counts=counts,
+                        return_results=return_results,
+                    )
+                return result if return_results else _run_summary(counts)
+
+            import uuid
+            run_id = uuid.uuid4().hex
+            results = []
+            chunk = design
+            if len(design):
+                with evaluator:
+                    for chunk in (design.iter_chunks(chunk_size) if lazy else [design]):
+                        if status is not None and lazy:
+                            chunk = self._drop_quarantined_experiments(chunk, status, counts)
+                        chunk_results = []
+                        for batch in _batches(chunk, batch_size, reorder):
+                            batch_result = self._dispatch_batch(batch, evaluator, db, run_id, counts)
+                            if return_results:
+                                chunk_results.append(batch_result)
+                        if not chunk_results:
+                            continue
+                        chunk_result = pd.concat(chunk_results, sort=False)
+                        if reorder is not None:
+                            chunk_result = chunk_result.loc[chunk.index]
+                        results.append(chunk_result)
+        finally:
+            self._failure_policy = None
+            self._time_runs = False
+            self._run_db = None
+
+        if not return_results:
+            return _run_summary(counts)
+        if not results:
+            return self._empty_results(chunk)
+        return self.ensure_dtypes(pd.concat(results, sort=False))
+
+    def _scheduled_reorder(self, scheduler, db, evaluator):
+        """
+        Prepare a function to reorder pending experiments before each batch.
+
+        Args:
+            scheduler (bool, str, or ExperimentScheduler): The scheduler
+                argument given to `run_experiments`.
+            db (Database or None): The database holding recorded run times.
+            evaluator (ema_workbench.Evaluator): The evaluator to be used.
+
+        Returns:
+            Callable or None
+        """
+        if scheduler is None or scheduler is False:
+            return None
+
+        from .scheduler import ExperimentScheduler
+        if scheduler is True:
+            scheduler = ExperimentScheduler(self.scope)
+        elif not isinstance(scheduler, ExperimentScheduler):
+            raise ValueError(f"unknown scheduler {scheduler}")
+
+        from ..util.evaluators import evaluator_workers
+        n_workers = evaluator_workers(evaluator)
+
+        def reorder(pending):
+            # refit on every batch, to include the run times just recorded
+            if db:
+                scheduler.fit_from_db(db, source=self.metamodel_id)
+            return scheduler.order(pending, n_workers=n_workers)
+
+        return reorder
+
+    def _empty_results(self, design):
+        """An empty DataFrame with the columns returned by `run_experiments`."""
+        columns = (
+                self.scope.get_uncertainty_names()
+                + self.scope.get_lever_names()
+                + self.scope.get_constant_names()
+                + self.scope.get_measure_names()
+        )
+        return pd.DataFrame(columns=columns, index=design.index[:0])
+
+    def _read_run_status(self, db):
+        """
+        Read the run status of this model's experiments from the run manifest.
+
+        Returns:
+            pandas.Series or None: The most recent run status of each
+                experiment, or None if the database has no run manifest.
+        """
+        try:
+            status = db.read_experiment_run_status(self.scope.name, source=self.metamodel_id)
+        except NotImplementedError:
+            return None
+        return status['run_status']
+
+    def _drop_quarantined_experiments(self, design, status, counts):
+        """Remove experiments quarantined in the run manifest from a design."""
+        quarantined = design.index[(status.reindex(design.index) == 'quarantined').values]
+        if len(quarantined):
+            _logger.warning(f"skipping {len(quarantined)} quarantined experiments")
+            design = design.drop(index=quarantined)
+            counts['quarantined'] += len(quarantined)
+        return design
+
+    def _dispatch_batch(self, batch, evaluator, db, run_id, counts):
+        """
+        Run a batch of experiments and store the results.
+
+        Successful experiments are recorded as complete in the run
+        manifest, along with their run time.  Experiments that fail
+        under the current failure policy are not written to the database
+        as results, but are instead recorded as quarantined.  Evaluators
+        with a true `writes_measures` attribute write the results of each
+        experiment to the database themselves as it finishes, so these
+        are not written again here.
+
+        Args:
+            batch (pandas.DataFrame): experiment definitions.
+            evaluator (ema_workbench.Evaluator): The (already entered)
+                evaluator to use.
+            db (Database or None): The database to store results in.
+            run_id (str): The identifier for this run in the run manifest.
+            counts (collections.Counter): The number of experiments
+                that are complete or failed are added to this.
+
+        Returns:
+            pandas.DataFrame
+        """
+        experiments_, outcomes, failures, run_seconds = self._perform_experiments(batch, evaluator)
+        counts['failed'] += len(failures)
+        counts['complete'] += len(batch) - len(failures)
+        if db:
+            if not getattr(evaluator, 'writes_measures', False):
+                db.write_experiment_measures(
+                    self.scope.name,
+                    self.metamodel_id,
+                    outcomes.drop(index=list(failures)),
+                )
+            if failures:
+                _logger.warning(f"{len(failures)} experiments failed and are quarantined")
+                db.write_experiment_run_status(
+                    self.scope.name, run_id, list(failures), 'quarantined',
+                    source=self.metamodel_id, error=failures,
+                )
+            db.write_experiment_run_status(
+                self.scope.name, run_id, [i for i in batch.index if i not in failures],
+                'complete', source=self.metamodel_id, duration=run_seconds,
+            )
+        return pd.concat([experiments_, outcomes], axis=1, sort=False)
+
+    def _perform_experiments(self, design, evaluator):
+        """
+        Dispatch a design of experiments to an (already entered) evaluator.
+
+        Args:
+            design (pandas.DataFrame): experiment definitions.
+            evaluator (ema_workbench.Evaluator): The evaluator to use.
+
+        Returns:
+            experiments (pandas.DataFrame): The experiment inputs,
+                including constants.
+            outcomes (pandas.DataFrame): The resulting performance measures.
+            failures (dict): Experiments that failed under the current
+                failure policy, mapped to a description of the error.
+                Failures are taken from those the failure policy recorded
+                in this process.  Experiments that were run in another
+                process (e.g. by a distributed evaluator) leave no record
+                here, so those are instead treated as failed when they
+                have no outcomes at all, and are mapped to None.
+            run_seconds (dict): The wall-clock run time of each
+                experiment, if available.
+            Both DataFrames are indexed the same as `design`.
+        """
+        from ema_workbench import Scenario, Policy, perform_experiments
+
         scenarios = [
             Scenario(**dict(zip(self.scope._get_uncertainty_and_constant_names(), i)))
             for i in design[self.scope._get_uncertainty_and_constant_names()].itertuples(index=False,
@@ -468,37 +914,181 @@ class AbstractCoreModel(abc.ABC, AbstractWorkbenchModel):
                                                                                  name='ExperimentL'))
         ]
 
-        evaluator = prepare_evaluator(evaluator, self)
+        failure_policy = getattr(self, '_failure_policy', None)
+        if failure_policy:
+            failure_policy['failures'].clear()
+            failure_policy['attempted'].clear()
 
-        with evaluator:
-            experiments, outcomes = perform_experiments(
-                self,
-                scenarios=scenarios,
-                policies=policies,
-                zip_over={'scenarios', 'policies'},
-                evaluator=evaluator,
-            )
+        run_seconds = {}
+        experiments, outcomes = perform_experiments(
+            self,
+            scenarios=scenarios,
+            policies=policies,
+            zip_over={'scenarios', 'policies'},
+            evaluator=evaluator,
+            callback=_timing_callback(run_seconds),
+        )
         experiments.index = design.index
-
-
+        run_seconds = {design.index[n]: t for n, t in run_seconds.items()}
 
         outcomes = pd.DataFrame.from_dict(outcomes)
+        if outcomes.empty:
+            # every experiment failed, so the workbench collected no outcomes
+            outcomes = pd.DataFrame(np.nan, index=design.index, columns=self.scope.get_measure_names())
         outcomes.index = design.index
 
-        if db:
-            db.write_experiment_measures(self.scope.name, self.metamodel_id, outcomes)
-
         # Put constants back into experiments
         experiments_ = experiments.drop(columns=['scenario', 'policy', 'model'])
         for i in self.scope.get_constants():
             experiments_[i.name] = i.value
 
-        return self.ensure_dtypes(pd.concat([
-            experiments_,
-            outcomes
-        ], axis=1, sort=False))
+        failures = {}
+        if failure_policy:
+            recorded = failure_policy['failures']
+            attempted = failure_policy['attempted']
+            for n, (ex_id, missing) in enumerate(outcomes.isna().all(axis=1).items()):
+                name = f"Incognito{n}"
+                if name in recorded:
+                    failures[ex_id] = recorded[name]
+                elif missing and name not in attempted:
+                    # Run in another process, so there is no record of the
+                    # failure. An experiment that failed has no outcomes.
+                    failures[ex_id] = None
+
+        return experiments_, outcomes, failures, run_seconds
+
+    def _run_experiments_resumable(
+            self,
+            design,
+            evaluator,
+            design_name,
+            db,
+            batch_size,
+            reorder,
+            status,
+            counts,
+            return_results,
+    ):
+        """
+        Run only the experiments in a design that lack results in the database.
 
+        See `run_experiments` for a description of the arguments.  The
+        `status` is the run status of each experiment read from the run
+        manifest before the run started, and the numbers of experiments
+        that are already complete or are interrupted are added to `counts`.
+        Returns None if `return_results` is False.
+        """
+        import uuid
+        from ..util.interrupts import GracefulInterrupt
+
+        if len(design) == 0:
+            return self._empty_results(design) if return_results else None
+
+        # only the results for the range of experiment ids in this design
+        # are read, so each chunk of a lazy design reads only its own
+        previous = db.read_experiment_measures_in_range(
+            self.scope.name,
+            design_name,
+            design.index.min(),
+            design.index.max(),
+            source=self.metamodel_id,
+        )
+        previous = previous.loc[previous.index.isin(design.index)]
+        # results stored without a run manifest record, as by older versions
+        # of emat, are complete if there are any
+        unrecorded = previous.index[status.reindex(previous.index).isna().values]
+        unrecorded = unrecorded[previous.loc[unrecorded].notna().any(axis=1).values]
+        complete = (status.reindex(design.index) == 'complete').values
+        done = design.index[complete | design.index.isin(unrecorded)]
+        counts['already complete'] += len(done)
+        pending = design.loc[~design.index.isin(done)]
+
+        results = []
+        if return_results:
+            previous = previous.reindex(done)
+            experiment_names = self.scope.get_uncertainty_names() + self.scope.get_lever_names()
+            previous_experiments = design.loc[done, [i for i in experiment_names if i in design.columns]]
+            for i in self.scope.get_constants():
+                previous_experiments[i.name] = i.value
+            results.append(pd.concat([previous_experiments, previous], axis=1, sort=False))
+
+        if len(done):
+            _logger.info(f"resuming run, {len(done)} experiments already complete, "
+                         f"{len(pending)} pending")
+
+        if len(pending):
+            run_id = uuid.uuid4().hex
+            db.write_experiment_run_status(
+                self.scope.name, run_id, pending.index, 'queued', source=self.metamodel_id,
+            )
+            dispatched = pending.index[:0]
+            with GracefulInterrupt() as interrupt, evaluator:
+                for batch in _batches(pending, batch_size, reorder):
+                    if interrupt.requested:
+                        break
+                    batch_result = self._dispatch_batch(batch, evaluator, db, run_id, counts)
+                    dispatched = dispatched.append(batch.index)
+                    if return_results:
+                        results.append(batch_result)
+            if interrupt.requested:
+                unfinished = pending.index[~pending.index.isin(dispatched)]
+                counts['interrupted'] += len(unfinished)
+                db.write_experiment_run_status(
+                    self.scope.name, run_id, unfinished, 'interrupted', source=self.metamodel_id,
+                )
+                _logger.warning(f"run {run_id} interrupted, {len(unfinished)} experiments "
+                                f"not run, use `resume=True` to continue")
+
+        if not return_results:
+            return None
+        result = pd.concat(results, sort=False)
+        result = result.loc[design.index[design.index.isin(result.index)]]
+        if result.empty:
+            return self._empty_results(design)
+        result.index.name = design.index.name
+        return self.ensure_dtypes(result)
+
+    def _run_lazy_design_resumable(
+            self,
+            design,
+            evaluator,
+            design_name,
+            db,
+            batch_size,
+            reorder,
+            chunk_size,
+            status,
+            counts,
+            return_results,
+    ):
+        """
+        Run a lazy design in resumable mode, one chunk at a time.
 
+        See `run_experiments` and `_run_experiments_resumable` for a
+        description of the arguments.
+        """
+        results = []
+        for chunk in design.iter_chunks(chunk_size):
+            chunk = self._drop_quarantined_experiments(chunk, status, counts)
+            result = self._run_experiments_resumable(
+                chunk,
+                evaluator,
+                design_name=design_name,
+                db=db,
+                batch_size=batch_size,
+                reorder=reorder,
+                status=status,
+                counts=counts,
+                return_results=return_results,
+            )
+            if return_results:
+                results.append(result)
+            if counts['interrupted']:
+                # the run was interrupted, leave the remaining chunks to resume later
+                break
+        if not return_results:
+            return None
+        return self.ensure_dtypes(pd.concat(results, sort=False))
 
     def create_metamodel_from_data(
             self,
@@ -537,7 +1127,8 @@ class AbstractCoreModel(abc.ABC, AbstractWorkbenchModel):
             db (Database, optional): The database to use for loading and saving metamodels.
                 If none is given, the default database for this model is used.
                 If there is no default db, and none is given here,
-                the metamodel is not stored in a database.
+                the metamodel is not stored in a database.  Set to False
+                to not use a database, even if this model has a default db.
             random_state (int, optional): A random state to use in the metamodel
                 regression fitting.
             experiment_stratification (pandas.Series, optional):
@@ -557,7 +1148,7 @@ class AbstractCoreModel(abc.ABC, AbstractWorkbenchModel):
         from .core_python import PythonCoreModel
         from .meta_model import MetaModel
 
-        db = db if db is not None else self.db
+        db = self.db if db is None else (db or None)
 
         experiment_inputs = self.ensure_dtypes(experiment_inputs)
 
@@ -755,6 +1346,284 @@ class AbstractCoreModel(abc.ABC, AbstractWorkbenchModel):
             suppress_converge_warnings=suppress_converge_warnings,
         )
 
+    def adaptive_design(
+            self,
+            initial_design=None,
+            *,
+            n_initial=None,
+            batch_size=None,
+            target_score=0.9,
+            max_experiments=None,
+            max_batches=10,
+            n_candidates=None,
+            design_name='adaptive',
+            output_focus=None,
+            db=None,
+            evaluator=None,
+            cv=5,
+            random_seed=1234,
+            suppress_converge_warnings=False,
+            regressor=None,
+            refit_every=1,
+    ):
+        """
+        Build a meta-model using a batch-sequential design of experiments.
+
+        Starting from an initial design, this method repeatedly runs a batch
+        of experiments through this core model, fits a meta-model on all of
+        the results so far, and uses `MetaModel.pick_new_experiments` to
+        select the next batch, until the cross-validation score of the
+        meta-model reaches `target_score` or the budget of experiments or
+        batches is used up.
+
+        To keep the core model busy, the meta-model is fit and scored on the
+        results through batch k, and used to pick batch k+2, in a background
+        thread while batch k+1 is running.  Batch k+2 is kept away from the
+        experiments in batch k+1, whose results are not yet known.  Once the
+        target score is reached, the batch already running is finished, and
+        the final meta-model is fit on all of the completed experiments.
+
+        Each batch is stored in the database as a design named
+        `{design_name}_{k}`, and each meta-model fit along the way is stored
+        with the same name, so the sequence can be inspected afterwards.
+
+        Args:
+            initial_design (pandas.DataFrame or str, optional): The first batch
+                of experiments, or the name of a design in the database.  If not
+                given, a Latin Hypercube design is created.
+            n_initial (int, optional): The number of experiments in the initial
+                design, if it is created here.  Defaults to 10 per uncertainty
+                and lever.
+            batch_size (int, optional): The number of experiments in each later
+                batch.  Defaults to the number of uncertainties and levers.
+            target_score (float, default 0.9): Stop once the smallest
+                cross-validation score across the output measures (or just the
+                measures in `output_focus`, if given) reaches this value.
+            max_experiments (int, optional): The maximum total number of
+                experiments to run, including the initial design.
+            max_batches (int, default 10): The maximum number of batches to
+                run after the initial design.
+            n_candidates (int, optional): The size of the pool of candidate
+                experiments generated for picking each batch.  Defaults to
+                20 times `batch_size`.
+            design_name (str, default 'adaptive'): The prefix for the names of
+                the designs and meta-models stored in the database.
+            output_focus (Collection[str], optional): A subset of output measures
+                that are the focus of the new experiments, passed to
+                `MetaModel.pick_new_experiments`, and used to compute the score.
+            db (Database, optional): The database to use.  If not given, the
+                default database for this model is used, if there is one.
+                Set to False to not use a database.
+            evaluator (ema_workbench.Evaluator, optional): The evaluator used
+                to run the core model.
+            cv (int, default 5): The number of folds used for the
+                cross-validation scores.
+            random_seed (int, default 1234): A random seed, used for the
+                initial design, the candidate pools, and the meta-models.
+            suppress_converge_warnings (bool, default False):
+                Suppress convergence warnings during metamodel fitting.
+            regressor (Estimator, optional): A scikit-learn estimator implementing a
+                multi-target regression, which must be a Gaussian process regression
+                or contain one as its 'gpr' step.  If not given, a detrended simple
+                Gaussian process regression is used.
+            refit_every (int, default 1): How often to search for new meta-model
+                hyperparameters.  With the default, every meta-model is fit from
+                scratch.  Otherwise, only every `refit_every`-th meta-model is,
+                and those in between are copies of the previous meta-model
+                updated with the new experiments by `MetaModel.update`, which
+                keeps the kernel hyperparameters and is much faster.
+
+        Returns:
+            PythonCoreModel:
+                The final meta-model, fit on every completed experiment.  Its
+                `adaptive_history` attribute is a DataFrame giving the number
+                of experiments, the meta-model id, and the cross-validation
+                score of each meta-model fit along the way.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        db = self.db if db is None else (db or None)
+        # Passed on to methods that fall back to `self.db` when given None.
+        model_db = db if db is not None else False
+        scope_name = self.scope.name
+        input_names = self.scope.get_uncertainty_names() + self.scope.get_lever_names()
+        measure_names = self.scope.get_measure_names()
+        transforms = {i.name: i.metamodeltype for i in self.scope.get_measures()}
+        if batch_size is None:
+            batch_size = len(input_names)
+        if n_candidates is None:
+            n_candidates = 20 * batch_size
+
+        if isinstance(initial_design, str):
+            if db is None:
+                raise ValueError(f'cannot load design "{initial_design}", there is no db')
+            initial_design = db.read_experiment_parameters(scope_name, initial_design)
+        elif initial_design is None:
+            initial_design = self.design_experiments(
+                n_samples=n_initial,
+                random_seed=random_seed,
+                db=model_db,
+                design_name=f'{design_name}_0',
+            )
+        elif db is not None:
+            initial_design = initial_design.copy()
+            initial_design.index = db.write_experiment_parameters(
+                scope_name, f'{design_name}_0', initial_design,
+            )
+            initial_design.index.name = 'experiment'
+
+        def budget(n_run, k):
+            # the number of experiments available for batch k
+            if k > max_batches:
+                return 0
+            if max_experiments is None:
+                return batch_size
+            return max(min(batch_size, max_experiments - n_run), 0)
+
+        def score_of(scores):
+            if output_focus is not None:
+                scores = scores[[i for i in output_focus if i in scores.index]]
+            return scores.min()
+
+        # Everything below that runs in the background thread avoids
+        # the database, as database connections are bound to one thread.
+        # Meta-models are made without a database, and are given it when
+        # they are recorded, in this thread.
+        def fit(data, metamodel_id, previous=None):
+            if previous is not None:
+                return update(data, metamodel_id, *previous)
+            data = data.dropna(subset=measure_names, how='any')
+            mm = self.create_metamodel_from_data(
+                data[input_names],
+                data[measure_names],
+                transforms,
+                metamodel_id=metamodel_id,
+                db=False,
+                random_state=random_seed,
+                experiment_stratification=data['_batch_'],
+                suppress_converge_warnings=suppress_converge_warnings,
+                regressor=regressor,
+            )
+            return mm, score_of(mm.function.cross_val_scores(cv=cv)), len(data)
+
+        def update(data, metamodel_id, previous, previous_rows):
+            from .core_python import PythonCoreModel
+            func = copy.deepcopy(previous.function)
+            new_data = data.iloc[previous_rows:].dropna(subset=measure_names, how='any')
+            func.update(
+                new_data[func.raw_input_columns],
+                new_data[func.output_sample.columns],
+                new_stratification=new_data['_batch_'],
+            )
+            mm = PythonCoreModel(
+                func,
+                configuration=None,
+                scope=previous.scope,
+                safe=True,
+                db=None,
+                name=f"MetaModel{metamodel_id}",
+                metamodel_id=metamodel_id,
+            )
+            return mm, score_of(func.cross_val_scores(cv=cv)), len(func.input_sample)
+
+        def previous_for(n_fits, mm, fitted_rows):
+            # the previous meta-model, if the next one is to be updated from it
+            if refit_every > 1 and n_fits % refit_every:
+                return mm, fitted_rows
+            return None
+
+        def pick(mm, n, k, pending):
+            candidates = self.design_experiments(
+                n_samples=n_candidates,
+                random_seed=random_seed + k,
+                db=False,
+            )
+            return mm.function.pick_new_experiments(
+                candidates,
+                n,
+                output_focus=output_focus,
+                pending_experiments=pending,
+            )
+
+        def fit_and_pick(data, metamodel_id, mm, n, k, pending, previous):
+            score = n_fit = None
+            if data is not None:
+                mm, score, n_fit = fit(data, metamodel_id, previous)
+                if score >= target_score:
+                    return mm, score, n_fit, None
+            if n <= 0:
+                return mm, score, n_fit, None
+            return mm, score, n_fit, pick(mm, n, k, pending)
+
+        def new_metamodel_id():
+            if db is not None:
+                return db.get_new_metamodel_id(scope_name)
+            return np.random.randint(1, 2**63, dtype='int64')
+
+        history = []
+        def record(mm, score, n_fit, k):
+            mm.db = db
+            _logger.info(f"adaptive design, batch {k}: {n_fit} experiments, cv score {score:.4f}")
+            history.append(dict(
+                batch=k,
+                n_experiments=n_fit,
+                metamodel_id=mm.metamodel_id,
+                cv_score=score,
+            ))
+            if db is not None:
+                db.write_metamodel(scope_name, mm, metamodel_name=f'{design_name}_{k}')
+
+        data = self.run_experiments(initial_design, evaluator, db=model_db)
+        data['_batch_'] = 0
+        n_run = len(initial_design)
+
+        # Nothing is running yet, so the first meta-model is fit in the foreground.
+        mm, score, n_fit = fit(data, new_metamodel_id())
+        fitted_rows = len(data)
+        n_fits = 1
+        record(mm, score, n_fit, 0)
+        next_batch = None
+        if score < target_score and budget(n_run, 1) > 0:
+            next_batch = pick(mm, budget(n_run, 1), 1, None)
+
+        k = 1
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            while next_batch is not None and len(next_batch):
+                batch = next_batch
+                if db is not None:
+                    batch = batch.copy()
+                    batch.index = db.write_experiment_parameters(scope_name, f'{design_name}_{k}', batch)
+                    batch.index.name = 'experiment'
+                n_run += len(batch)
+                refit = len(data) > fitted_rows
+                future = executor.submit(
+                    fit_and_pick,
+                    data.copy() if refit else None,
+                    new_metamodel_id() if refit else None,
+                    mm,
+                    budget(n_run, k + 1),
+                    k + 1,
+                    batch,
+                    previous_for(n_fits, mm, fitted_rows) if refit else None,
+                )
+                result = self.run_experiments(batch, evaluator, db=model_db)
+                result['_batch_'] = k
+                mm_, score_, n_fit_, next_batch = future.result()
+                if refit:
+                    mm, score = mm_, score_
+                    fitted_rows = len(data)
+                    n_fits += 1
+                    record(mm, score, n_fit_, k - 1)
+                data = pd.concat([data, result], sort=False)
+                k += 1
+
+        if len(data) > fitted_rows:
+            mm, score, n_fit = fit(data, new_metamodel_id(), previous_for(n_fits, mm, fitted_rows))
+            record(mm, score, n_fit, k - 1)
+
+        mm.adaptive_history = pd.DataFrame(history).set_index('batch')
+        return mm
+
 
     def feature_scores(
             self,
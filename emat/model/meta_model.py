@@ -8,6 +8,8 @@ from ..learn.boosting import LinearAndGaussian
 from ..util.one_hot import OneHotCatEncoder
 from ..util.variance_threshold import VarianceThreshold
 from ..experiment.experimental_design import batch_pick_new_experiments, minimum_weighted_distance
+from ..experiment.experimental_design import FactorialDesign, StreamedDesign
+from .candidate_pool import CandidatePool
 from ..database.database import Database
 from ..scope.scope import Scope
 
@@ -152,6 +154,30 @@ def create_metamodel(
     return result
 
 
+def _fitted_attributes(regression):
+    """
+    The fitted attributes of a regressor and of the regressors it contains.
+
+    By scikit-learn convention, fitting a regressor sets attributes named
+    with a trailing underscore, so these are new objects whenever the
+    regressor is refit.  The prediction tier of a boosted regressor, which
+    can be changed without refitting, is included as well.
+
+    Returns:
+        list: (object, attribute name, value) tuples.
+    """
+    from sklearn.base import BaseEstimator
+    found = []
+    for key, value in vars(regression).items():
+        if key == 'prediction_tier' or (key.endswith('_') and not key.startswith('_')):
+            found.append((regression, key, value))
+            if isinstance(value, (list, tuple)):
+                for i in value:
+                    if isinstance(i, BaseEstimator):
+                        found.extend(_fitted_attributes(i))
+    return found
+
+
 class MetaModel:
     """
     A gaussian process regression-based meta-model.
@@ -258,6 +284,7 @@ class MetaModel:
         self.sample_stratification = sample_stratification
 
         self.output_transforms = {}
+        self._output_transform_specs = {}
         if metamodel_types is not None:
             for k,t in metamodel_types.items():
                 if t is None:
@@ -276,6 +303,7 @@ class MetaModel:
                         self._metamodel_types[t][0](t_args),
                         self._metamodel_types[t][1](t_args)
                     )
+                    self._output_transform_specs[k] = (t, t_args)
                 else:
                     if isinstance(t, str):
                         t = t.lower()
@@ -284,6 +312,7 @@ class MetaModel:
                     if t not in self._metamodel_types:
                         raise ValueError(f'unknown metamodeltype "{t}" for output "{k}"')
                     self.output_transforms[k] = self._metamodel_types[t]
+                    self._output_transform_specs[k] = (t, None)
 
         for k, (v_func,_) in self.output_transforms.items():
             self.output_sample[k] = v_func(self.output_sample[k])
@@ -333,6 +362,75 @@ class MetaModel:
         result = self.var_thresh.transform(result)
         return result
 
+    def update(self, new_inputs, new_outputs, refit=False, new_stratification=None):
+        """
+        Add new experiments to the training data of this meta-model.
+
+        By default the meta-model is updated without a new search for
+        hyperparameters: the linear regression is refit, and the gaussian
+        process regressions are conditioned on the new experiments using
+        their existing kernels, extending each Cholesky factor instead of
+        recomputing it.  This is much faster than creating a new meta-model,
+        so it is suitable between batches of an adaptive design, with an
+        occasional `refit` to re-tune the kernels as the sample grows.
+
+        Args:
+            new_inputs (pandas.DataFrame):
+                The raw input values of the new experiments.
+            new_outputs (pandas.DataFrame):
+                The performance measures of the new experiments, including
+                all of the active outputs of this meta-model.
+            refit (bool, default False):
+                Also re-optimize the kernel hyperparameters, starting from
+                the previous values instead of from random restarts.
+            new_stratification (array-like, optional):
+                The stratification of the new experiments, required if this
+                meta-model was created with a `sample_stratification`.
+
+        Returns:
+            MetaModel: self
+
+        Raises:
+            ValueError: If the new inputs include categorical values that
+                were not in the original sample, or vary an input that was
+                constant in the original sample.
+        """
+        if len(new_inputs) != len(new_outputs):
+            raise ValueError('new_inputs and new_outputs must have the same length')
+        if len(new_inputs):
+            self._append_sample(new_inputs, new_outputs, new_stratification)
+        if hasattr(self.regression, 'condition'):
+            self.regression.condition(self.input_sample, self.output_sample, optimize=refit)
+        else:
+            self.regression.fit(self.input_sample, self.output_sample)
+        self._compiled = None
+        return self
+
+    def _append_sample(self, new_inputs, new_outputs, new_stratification):
+        """Preprocess new experiments and append them to the training sample."""
+        new_input_sample = self.preprocess_raw_input(new_inputs, to_type=numpy.float64)
+        new_output_sample = new_outputs[self.output_sample.columns].astype(float)
+        new_output_sample.index = new_input_sample.index
+        for k, (v_func,_) in self.output_transforms.items():
+            new_output_sample[k] = v_func(new_output_sample[k])
+
+        if self.sample_stratification is not None:
+            if new_stratification is None:
+                raise ValueError('new_stratification is required for a stratified meta-model')
+            if isinstance(self.sample_stratification, pandas.Series):
+                self.sample_stratification = pandas.concat([
+                    self.sample_stratification,
+                    pandas.Series(numpy.asarray(new_stratification), index=new_input_sample.index),
+                ])
+            else:
+                self.sample_stratification = numpy.concatenate([
+                    numpy.asarray(self.sample_stratification),
+                    numpy.asarray(new_stratification),
+                ])
+
+        self.input_sample = pandas.concat([self.input_sample, new_input_sample])
+        self.output_sample = pandas.concat([self.output_sample, new_output_sample])
+
     def __call__(self, *args, **kwargs):
         """
         Evaluate the meta-model.
@@ -347,11 +445,8 @@ class MetaModel:
                 A single dictionary containing all performance measure outcomes.
         """
         if len(args) == 1:
-            if isinstance(args[0], pandas.DataFrame):
-                return args[0].apply(
-                    lambda x: pandas.Series(self.__call__(**x)),
-                    axis=1,
-                )
+            if isinstance(args[0], (pandas.DataFrame, FactorialDesign, StreamedDesign)):
+                return self._predict_frame(args[0])
             else:
                 raise TypeError(f'mm(...) optionally takes a DataFrame as a '
                                 f'positional argument, not {type(args[0])}')
@@ -359,6 +454,10 @@ class MetaModel:
             raise TypeError(f'mm(...) takes at most one '
                             f'positional argument, not {len(args)}')
 
+        compiled = self._get_compiled()
+        if compiled is not None:
+            return compiled(**kwargs)
+
         input_row = pandas.DataFrame.from_dict(kwargs, orient='index').T[self.raw_input_columns]
         input_row = self.preprocess_raw_input(input_row, to_type=numpy.float)
 
@@ -374,6 +473,129 @@ class MetaModel:
 
         return result
 
+    def compile(self):
+        """
+        Compile this meta-model for fast evaluation of individual points.
+
+        Returns:
+            CompiledMetaModel
+
+        Raises:
+            NotImplementedError: If the regressor used by this meta-model
+                cannot be compiled.
+        """
+        from .compiled_meta_model import CompiledMetaModel
+        return CompiledMetaModel(self)
+
+    def export(self, path, include_std=True):
+        """
+        Export this meta-model in a compact format that needs only numpy.
+
+        Meta-models stored in a database are pickles of the complete
+        scikit-learn regressor, which are slow to load and tied to the
+        library versions used to create them.  This method instead writes
+        the compiled meta-model (see `compile`) as an `.npz` archive of
+        plain arrays, which can be loaded in milliseconds with
+        `CompiledMetaModel.load`, optionally memory-mapped, and evaluated
+        without scikit-learn.
+
+        Args:
+            path (str or file-like): Where to write the archive.
+            include_std (bool, default True): Also save what is needed to
+                compute the standard deviation of estimates.
+
+        Raises:
+            NotImplementedError: If the regressor used by this meta-model
+                cannot be compiled.
+        """
+        self.compile().save(path, include_std=include_std)
+
+    _compiled = None
+    _compiled_state = ()
+
+    def _get_compiled(self):
+        """The compiled meta-model, or None if the regression cannot be compiled."""
+        # the regression can be refit, replaced or given a new prediction
+        # tier directly, so the compiled meta-model is rebuilt if any of
+        # the attributes it was compiled from have changed
+        if self._compiled is None or not all(
+                getattr(obj, key, None) is value for obj, key, value in self._compiled_state
+        ):
+            try:
+                self._compiled = self.compile()
+            except NotImplementedError as err:
+                _logger.debug(f"meta-model not compiled, {err}")
+                self._compiled = False
+            self._compiled_state = [(self, 'regression', self.regression)]
+            self._compiled_state.extend(_fitted_attributes(self.regression))
+        return self._compiled or None
+
+    def __getstate__(self):
+        # the compiled meta-model is rebuilt when needed, not stored
+        state = self.__dict__.copy()
+        state.pop('_compiled', None)
+        state.pop('_compiled_state', None)
+        return state
+
+    predict_chunk_size = 10000
+    """int: The number of rows processed at once when evaluating a DataFrame."""
+
+    def _predict_frame(self, df, return_std=False, trend_only=False, residual_only=False):
+        """
+        Evaluate the meta-model on every row of a DataFrame.
+
+        Rows are preprocessed and predicted together, in chunks of
+        `predict_chunk_size` rows to bound memory use, and the output
+        transforms are applied to whole columns at once.
+
+        Args:
+            df (pandas.DataFrame, FactorialDesign or StreamedDesign): Input
+                values, with a row for each point to evaluate.
+            return_std (bool, default False): Return the standard deviation
+                of the estimates (without undoing output transforms) instead
+                of the estimates themselves.
+            trend_only, residual_only (bool): See `predict`.
+
+        Returns:
+            pandas.DataFrame: The outputs, with the same index as `df`.
+        """
+        if isinstance(df, pandas.DataFrame):
+            input_chunks = (
+                df.iloc[start:start + self.predict_chunk_size]
+                for start in range(0, len(df), self.predict_chunk_size)
+            )
+        else:
+            input_chunks = df.iter_chunks(self.predict_chunk_size)
+
+        chunks = []
+        for input_chunk in input_chunks:
+            index = input_chunk.index
+            input_chunk = self.preprocess_raw_input(input_chunk[self.raw_input_columns], to_type=numpy.float)
+            if return_std:
+                _, output_chunk = self.regression.predict(input_chunk, return_std=True)
+            elif trend_only:
+                output_chunk = self.regression.detrend_predict(input_chunk)
+            elif residual_only:
+                output_chunk = self.regression.residual_predict(input_chunk)
+            else:
+                output_chunk = self.regression.predict(input_chunk)
+            chunks.append(pandas.DataFrame(numpy.asarray(output_chunk), columns=self.output_sample.columns, index=index))
+
+        if chunks:
+            result = pandas.concat(chunks)
+        else:
+            result = pandas.DataFrame(columns=self.output_sample.columns, index=df.index[:0], dtype=float)
+
+        # undo the output transforms, except on standard deviations
+        if not return_std:
+            for k, (_,v_func) in self.output_transforms.items():
+                result[k] = v_func(result[k])
+
+        for i in self.disabled_outputs:
+            result[i] = None
+
+        return result
+
     def compute_std(self, *args, **kwargs):
         """
         Evaluate standard deviations of estimates generated by the meta-model.
@@ -390,11 +612,8 @@ class MetaModel:
                 estimate of all performance measure outcomes.
         """
         if len(args) == 1:
-            if isinstance(args[0], pandas.DataFrame):
-                return args[0].apply(
-                    lambda x: pandas.Series(self.compute_std(**x)),
-                    axis=1,
-                )
+            if isinstance(args[0], (pandas.DataFrame, FactorialDesign, StreamedDesign)):
+                return self._predict_frame(args[0], return_std=True)
             else:
                 raise TypeError(f'compute_std() optionally takes a DataFrame as a '
                                 f'positional argument, not {type(args[0])}')
@@ -418,6 +637,87 @@ class MetaModel:
 
         return result
 
+    def iter_predict(self, df, return_std=False, memory_budget=None, dtype=numpy.float64):
+        """
+        Evaluate the meta-model on a large DataFrame, one chunk at a time.
+
+        This is meant for very large pools of candidate experiments, with
+        millions of rows, for which evaluating the meta-model at once would
+        need more memory than is available: the gaussian process kernel
+        between the candidates and the training experiments alone takes
+        8 bytes for each pair in each output.  Here the rows are evaluated
+        in chunks sized to fit within `memory_budget`, and only one chunk's
+        results are held at a time, so any number of rows can be processed
+        in constant memory, as long as the results are reduced or written
+        out as they are made.
+
+        Args:
+            df (pandas.DataFrame): Input values, with a row for each
+                point to evaluate.  A lazy design, such as a
+                `FactorialDesign`, is also accepted, and its rows are
+                made one chunk at a time.
+            return_std (bool, default False): Also give the standard
+                deviation of the estimates (without undoing output
+                transforms).  The estimates and their standard deviations
+                share the same kernel evaluations.
+            memory_budget (int, optional): The working memory to use, in
+                bytes.  Defaults to
+                `emat.model.compiled_meta_model.DEFAULT_MEMORY_BUDGET`.
+            dtype (numpy.dtype, default float64): The precision for
+                evaluating the gaussian process kernels.  Using
+                `numpy.float32` halves the memory needed for each row and
+                is faster, but estimates are only precise to about six
+                significant digits, and standard deviations to fewer when
+                the kernel matrices are ill-conditioned.  This is used
+                only if this meta-model can be
+                compiled (see `compile`); otherwise rows are evaluated
+                in float64, `predict_chunk_size` rows at a time.
+
+        Yields:
+            pandas.DataFrame or tuple: For each chunk of consecutive rows of
+                `df`, the estimates, with the same index as those rows, or
+                a tuple of the estimates and their standard deviations.
+        """
+        compiled = self._get_compiled()
+        if compiled is not None:
+            chunk_size = compiled.chunk_size(memory_budget, dtype, return_std)
+        else:
+            chunk_size = self.predict_chunk_size
+
+        def _frame(values, index):
+            result = pandas.DataFrame(numpy.asarray(values), index=index, columns=self.output_sample.columns)
+            for i in self.disabled_outputs:
+                result[i] = None
+            return result
+
+        if isinstance(df, pandas.DataFrame):
+            chunks = (df.iloc[start:start + chunk_size] for start in range(0, len(df), chunk_size))
+        else:
+            chunks = df.iter_chunks(chunk_size)
+
+        for input_chunk in chunks:
+            input_chunk = input_chunk[self.raw_input_columns]
+            if compiled is not None:
+                features = compiled.features(input_chunk.values)
+                if return_std:
+                    estimates, std = compiled._evaluate_with_std(features, dtype)
+                else:
+                    estimates = compiled._evaluate(features, dtype=dtype)
+            else:
+                features = self.preprocess_raw_input(input_chunk, to_type=numpy.float)
+                if return_std:
+                    estimates, std = self.regression.predict(features, return_std=True)
+                else:
+                    estimates = self.regression.predict(features)
+                estimates = numpy.array(estimates, dtype=numpy.float64)
+                for k, (_, v_func) in self.output_transforms.items():
+                    j = self.output_sample.columns.get_loc(k)
+                    estimates[:, j] = v_func(estimates[:, j])
+            if return_std:
+                yield _frame(estimates, input_chunk.index), _frame(std, input_chunk.index)
+            else:
+                yield _frame(estimates, input_chunk.index)
+
     def predict(self, *args, trend_only=False, residual_only=False, **kwargs):
         """
         Generate predictions using the meta-model.
@@ -435,11 +735,8 @@ class MetaModel:
                 estimate of all performance measure outcomes.
         """
         if len(args) == 1:
-            if isinstance(args[0], pandas.DataFrame):
-                return args[0].apply(
-                    lambda x: pandas.Series(self.predict(**x, trend_only=trend_only, residual_only=residual_only)),
-                    axis=1,
-                )
+            if isinstance(args[0], (pandas.DataFrame, FactorialDesign, StreamedDesign)):
+                return self._predict_frame(args[0], trend_only=trend_only, residual_only=residual_only)
             else:
                 raise TypeError(f'predict() optionally takes a DataFrame as a '
                                 f'positional argument, not {type(args[0])}')
@@ -475,17 +772,37 @@ class MetaModel:
 
         Args:
             cv (int, default 5): The number of folds to use in
-                cross-validation.
+                cross-validation.  Set to zero for leave-one-out
+                scores, which for the default regressor are computed
+                in closed form from the fitted regression, instead of
+                by refitting.  These match refitting both stages of the
+                regression without each experiment, with the kernel
+                hyperparameters and target scaling held fixed.
             gpr_only (bool, default False): Whether to limit the
                 cross-validation analysis to only the GPR step (i.e.,
                 to measure the improvement in meta-model fit from
                 using the GPR-based meta-model, over and above
                 using the linear regression meta-model alone.)
+            **kwargs: Passed to the `cross_val_scores` method of the
+                regressor.  For the default regressor, these include
+                `cache_dir`, a directory in which to cache the results
+                so they are reused in later sessions, when a
+                `random_state` is also given.
 
         Returns:
             pandas.Series: The cross-validation scores, by output.
 
         """
+        if cv == 0 and not gpr_only:
+            loo = self._loo_predict()
+            if loo is not None:
+                from sklearn.metrics import r2_score
+                return pandas.Series(
+                    r2_score(self.output_sample, loo, multioutput='raw_values'),
+                    index=self.output_sample.columns,
+                )
+            cv = len(self.input_sample)
+
         if self.sample_stratification is not None:
             from ..learn.splits import ExogenouslyStratifiedKFold
             cv = ExogenouslyStratifiedKFold(exo_data=self.sample_stratification, n_splits=cv)
@@ -504,17 +821,41 @@ class MetaModel:
         Args:
             cv (int, default 5): The number of folds to use in
                 cross-validation. Set to zero for leave-one-out
-                (i.e., the maximum number of folds), which may be
-                quite slow.
+                (i.e., the maximum number of folds).  For the default
+                regressor these are computed in closed form from the
+                fitted regression, and match refitting both stages of
+                the regression without each experiment, with the kernel
+                hyperparameters and target scaling held fixed; for
+                other regressors this refits once per experiment, which
+                may be quite slow.
 
         Returns:
             pandas.DataFrame: The cross-validated predictions.
 
         """
         if cv==0:
+            loo = self._loo_predict()
+            if loo is not None:
+                return loo
             cv = len(self.input_sample)
         return self.regression.cross_val_predict(self.input_sample, self.output_sample, cv=cv)
 
+    def _loo_predict(self):
+        """
+        Closed form leave-one-out predictions, or None if unavailable.
+        """
+        if not hasattr(self.regression, '_loo_predict'):
+            return None
+        try:
+            loo = self.regression._loo_predict(self.input_sample, self.output_sample)
+        except NotImplementedError:
+            return None
+        return pandas.DataFrame(
+            numpy.asarray(loo),
+            index=self.input_sample.index,
+            columns=self.output_sample.columns,
+        )
+
 
     def __repr__(self):
         in_dim = len(self.raw_input_columns)
@@ -539,12 +880,23 @@ class MetaModel:
                 input (not raw input) and the rows correspond to the
                 outputs.
         """
+        if hasattr(self.regression, 'step1'):
+            gpr_estimators = self.regression.step1.estimators_
+        else:
+            gpr_estimators = self.regression.gpr.estimators_
+
+        def _length_scale(kernel):
+            # a scaled kernel (C() * RBF()) keeps the length scale in its second term
+            if hasattr(kernel, 'length_scale'):
+                return kernel.length_scale
+            return _length_scale(kernel.k2)
+
         return pandas.DataFrame(
             [
-                est.kernel_.length_scale
-                for est in self.regression.step1.estimators_
+                _length_scale(est.kernel_)
+                for est in gpr_estimators
             ],
-            index=self.regression.Y_columns,
+            index=self.output_sample.columns,
             columns=self.input_sample.columns,
         ).T
 
@@ -590,6 +942,53 @@ class MetaModel:
                 w[i] = each_w if col in balance else 0
         return numpy.dot(s, w)
 
+    def candidate_pool(
+            self,
+            scope,
+            n_samples,
+            sampler='lhs',
+            random_seed=1234,
+            n_jobs=None,
+            chunk_size=100000,
+            dtype=numpy.float32,
+    ):
+        """
+        Generate a reusable pool of candidate experiments.
+
+        The pool can be given as `possible_experiments` to any number of
+        calls of `pick_new_experiments`, which then do not design or
+        preprocess candidates again.  See `CandidatePool.generate`.
+
+        Args:
+            scope (Scope or Box): The scope of the candidate experiments.
+                Give a `Box` with a scope to restrict the candidates to
+                the box.
+            n_samples (int): The number of candidate experiments.
+            sampler (str or AbstractSampler, default 'lhs'): The sampler
+                used to design the candidates.
+            random_seed (int, default 1234): A random seed for
+                reproducibility.
+            n_jobs (int, optional): The number of chunks of candidates to
+                design and preprocess in parallel.
+            chunk_size (int, default 100000): The number of candidates in
+                each chunk.
+            dtype (numpy.dtype, default float32): The type of the
+                preprocessed candidates.
+
+        Returns:
+            CandidatePool
+        """
+        return CandidatePool.generate(
+            self,
+            scope,
+            n_samples,
+            sampler=sampler,
+            random_seed=random_seed,
+            n_jobs=n_jobs,
+            chunk_size=chunk_size,
+            dtype=dtype,
+        )
+
     def pick_new_experiments(
             self,
             possible_experiments,
@@ -601,6 +1000,7 @@ class MetaModel:
             debug=None,
             future_experiments=None,
             future_experiments_std=None,
+            pending_experiments=None,
     ):
         """
         Select a set of new experiments to perform from a pool of candidates.
@@ -620,10 +1020,12 @@ class MetaModel:
         from the new experiments on a subset of output measures.
 
         Args:
-            possible_experiments:
+            possible_experiments (pandas.DataFrame or CandidatePool):
                 A pool of possible experiments.  All selected experiments will
                 be selected from this pool, so the pool should be sufficiently
                 large and diverse to provide requried support for this process.
+                A `CandidatePool` (see `candidate_pool`) is already
+                preprocessed, and can be reused for several picks.
             batch_size (int):
                 How many experiments to select from `possible_experiments`.
             output_focus (Mapping or Collection, optional):
@@ -639,6 +1041,10 @@ class MetaModel:
                 if no `db` or `scope` is given.
             debug (Tuple[str,str], optional): The names of x and y axis to plot for
                 debugging.
+            pending_experiments (pandas.DataFrame, optional): Experiments that
+                are already selected and being run, but whose results are not
+                yet part of this meta-model.  New experiments are kept away
+                from these as well as from the experiments already included.
 
         Returns:
             pandas.DataFrame:
@@ -659,10 +1065,21 @@ class MetaModel:
             _logger.info(f"length_scales =\n{self.get_length_scales()}")
             _logger.info(f"dimension_weights = {dimension_weights}")
 
-        possible_experiments_processed = self.preprocess_raw_input(possible_experiments, float)
+        if isinstance(possible_experiments, CandidatePool):
+            possible_experiments_processed = possible_experiments.matrix_for(self)
+            possible_experiments = possible_experiments.experiments
+        else:
+            possible_experiments_processed = self.preprocess_raw_input(possible_experiments, float)
+
+        existing_experiments = self.input_sample
+        if pending_experiments is not None and len(pending_experiments):
+            existing_experiments = pandas.concat([
+                existing_experiments,
+                self.preprocess_raw_input(pending_experiments, float),
+            ])
 
         picks = batch_pick_new_experiments(
-                self.input_sample,
+                existing_experiments,
                 possible_experiments_processed,
                 batch_size,
                 dimension_weights,
@@ -720,20 +1137,7 @@ class MetaModel:
         candidate_wgt_value = candidate_raw_value * candidate_density
         proposed_experiment = candidate_wgt_value.idxmax()
         if plot:
-            from matplotlib import pyplot as plt
-            fig, axs = plt.subplots(1, 1, figsize=(4, 4))
-            axs.scatter(
-                candidate_experiments.iloc[:, 0],
-                candidate_experiments.iloc[:, 1],
-                c=candidate_wgt_value,
-            )
-            axs.scatter(
-                candidate_experiments.iloc[:, 0].loc[proposed_experiment],
-                candidate_experiments.iloc[:, 1].loc[proposed_experiment],
-                color="red", marker='x',
-            )
-            plt.show()
-            plt.close(fig)
+            _plot_heuristic_pick(candidate_experiments, candidate_wgt_value, proposed_experiment)
         return proposed_experiment
 
     def heuristic_batch_pick_experiment(
@@ -744,40 +1148,137 @@ class MetaModel:
             poorness_of_fit=None,
             plot=True,
     ):
+        """
+        Select a batch of new experiments where the meta-model is least certain.
+
+        Experiments are picked one at a time, each where the standard
+        deviation of the estimates (weighted by `poorness_of_fit` across
+        outputs, and by the density of the candidate) is greatest, as if
+        the experiments already picked had been added to the training
+        data.  Then each pick is in turn dropped and replaced by the best
+        candidate given the others, until no further exchanges are made.
+
+        For meta-models that can be compiled (see `compile`), the effect of
+        the picked experiments on the standard deviations is updated
+        incrementally as experiments are added and dropped, with rank-one
+        changes to a Cholesky factor of the posterior covariance, instead
+        of refitting the gaussian processes and evaluating all the
+        candidates again for every pick.
+
+        Args:
+            batch_size (int): How many experiments to select.
+            candidate_experiments (pandas.DataFrame): A pool of candidate
+                experiments, from which the batch is selected.
+            scope (Scope): The exploratory scope, used to weight the
+                candidates by their density.
+            poorness_of_fit (Mapping, optional): Weights for the standard
+                deviation of each output.  Defaults to one minus the
+                cross-validation score of each output.
+            plot (bool, default True): Plot the value of the candidates
+                at each pick.
+
+        Returns:
+            pandas.DataFrame:
+                A subset of rows from `candidate_experiments`
+        """
         _logger.info(f"computing density")
-        candidate_density = candidate_experiments.apply(lambda x: scope.get_density(x), axis=1)
+        candidate_density = scope.get_density(candidate_experiments)
 
         if poorness_of_fit is None:
             _logger.info(f"computing poorness of fit")
             crossval = self.cross_val_scores()
             poorness_of_fit = dict(1 - crossval)
 
-        proposed_candidate_ids = set()
-        proposed_candidates = None
+        compiled = self._get_compiled()
+        if compiled is None:
+            return self._heuristic_batch_pick_refitting(
+                batch_size, candidate_experiments, poorness_of_fit, candidate_density, plot,
+            )
+
+        posterior = compiled._hypothetical_posterior(candidate_experiments[compiled.input_names].values)
+        output_weights = numpy.asarray([poorness_of_fit.get(k, 0) for k in compiled.output_names], dtype=float)
+        density = numpy.asarray(candidate_density, dtype=float)
+
+        def pick():
+            candidate_wgt_value = (posterior.std() * output_weights).sum(axis=1) * density
+            proposed = int(numpy.argmax(candidate_wgt_value))
+            if plot:
+                _plot_heuristic_pick(
+                    candidate_experiments,
+                    pandas.Series(candidate_wgt_value, index=candidate_experiments.index),
+                    candidate_experiments.index[proposed],
+                )
+            return proposed
+
+        _logger.info(f"populating initial batch")
+        proposed_positions = []
+        for i in range(batch_size):
+            proposed = pick()
+            if proposed in proposed_positions:
+                break
+            posterior.add(proposed)
+            proposed_positions.append(proposed)
+
+        _logger.info(f"initial batch complete, checking for exchanges")
+        n_exchanges = 1
+        while n_exchanges > 0:
+            n_exchanges = 0
+            for i in range(len(proposed_positions)):
+                provisionally_dropping = proposed_positions[i]
+                posterior.remove(provisionally_dropping)
+                provisional_replacement = pick()
+                if provisional_replacement not in proposed_positions:
+                    n_exchanges += 1
+                    proposed_positions[i] = provisional_replacement
+                    _logger.info(
+                        f"replacing {candidate_experiments.index[provisionally_dropping]} "
+                        f"with {candidate_experiments.index[provisional_replacement]}"
+                    )
+                posterior.add(proposed_positions[i])
+            _logger.info(f"{n_exchanges} exchanges completed.")
+
+        return candidate_experiments.iloc[proposed_positions]
+
+    def _heuristic_batch_pick_refitting(
+            self,
+            batch_size,
+            candidate_experiments,
+            poorness_of_fit,
+            candidate_density,
+            plot=True,
+    ):
+        """
+        Select a batch for `heuristic_batch_pick_experiment`, by refitting.
+
+        This is used for regressors that cannot be compiled, which must
+        support `set_hypothetical_training_points`.
+        """
+        proposed_candidate_ids = []
 
         _logger.info(f"populating initial batch")
         for i in range(batch_size):
-            self.regression.set_hypothetical_training_points(proposed_candidates)
+            self.regression.set_hypothetical_training_points(
+                candidate_experiments.loc[proposed_candidate_ids] if proposed_candidate_ids else None
+            )
             proposed_id = self.heuristic_pick_experiment(
                 candidate_experiments,
                 poorness_of_fit,
                 candidate_density,
                 plot=plot,
             )
-            proposed_candidate_ids.add(proposed_id)
-            proposed_candidates = candidate_experiments.loc[proposed_candidate_ids]
-
-        proposed_candidate_ids = list(proposed_candidate_ids)
+            if proposed_id in proposed_candidate_ids:
+                break
+            proposed_candidate_ids.append(proposed_id)
 
         _logger.info(f"initial batch complete, checking for exchanges")
         # Exchanges
         n_exchanges = 1
         while n_exchanges > 0:
             n_exchanges = 0
-            for i in range(batch_size):
+            for i in range(len(proposed_candidate_ids)):
                 provisionally_dropping = proposed_candidate_ids[i]
                 self.regression.set_hypothetical_training_points(
-                    candidate_experiments.loc[set(proposed_candidate_ids) - {provisionally_dropping}]
+                    candidate_experiments.loc[[j for j in proposed_candidate_ids if j != provisionally_dropping]]
                 )
                 provisional_replacement = self.heuristic_pick_experiment(
                     candidate_experiments,
@@ -792,5 +1293,22 @@ class MetaModel:
             _logger.info(f"{n_exchanges} exchanges completed.")
 
         self.regression.clear_hypothetical_training_points()
-        return proposed_candidates
+        return candidate_experiments.loc[proposed_candidate_ids]
+
 
+def _plot_heuristic_pick(candidate_experiments, candidate_wgt_value, proposed_experiment):
+    """Plot the value of candidates, and the one picked, on their first two dimensions."""
+    from matplotlib import pyplot as plt
+    fig, axs = plt.subplots(1, 1, figsize=(4, 4))
+    axs.scatter(
+        candidate_experiments.iloc[:, 0],
+        candidate_experiments.iloc[:, 1],
+        c=candidate_wgt_value,
+    )
+    axs.scatter(
+        candidate_experiments.iloc[:, 0].loc[proposed_experiment],
+        candidate_experiments.iloc[:, 1].loc[proposed_experiment],
+        color="red", marker='x',
+    )
+    plt.show()
+    plt.close(fig)
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+""" scheduler.py - order experiments by expected run time"""
+
+import heapq
+import numpy as np
+import pandas as pd
+
+from ..scope.scope import Scope
+from ..util.one_hot import OneHotCatEncoder
+
+from ..util.loggers import get_module_logger
+_logger = get_module_logger(__name__)
+
+
+def projected_makespan(run_seconds, n_workers=1):
+    """
+    Project the total wall-clock time to run a queue of experiments.
+
+    Each experiment is assigned, in order, to the first worker that
+    becomes free, which is how a pool of workers consumes a queue of
+    experiments.
+
+    Args:
+        run_seconds (array-like): The run time of each experiment, in
+            dispatch order.
+        n_workers (int, default 1): The number of parallel workers.
+
+    Returns:
+        float
+    """
+    workers = [0.0] * max(int(n_workers), 1)
+    for t in np.asarray(run_seconds, dtype=float):
+        heapq.heappush(workers, heapq.heappop(workers) + t)
+    return max(workers)
+
+
+class ExperimentScheduler:
+    """
+    Order experiments to shorten the makespan of a parallel run.
+
+    A runtime model is fit on the recorded run times of past experiments,
+    using the experiment parameters as features, and experiments are then
+    dispatched in order of decreasing expected run time.  As each worker
+    in a pool takes the next experiment from the queue as soon as it is
+    free, this keeps long experiments from being left to run alone at the
+    end of a run while other workers sit idle.
+
+    Args:
+        scope (Scope): The exploratory scope of the experiments.
+        min_history (int, default 10): The minimum number of timed
+            experiments needed to fit the runtime model.  With less
+            history than this, experiments are left in their original order.
+        random_state (int, default 0): Random seed for the runtime model.
+
+    Attributes:
+        last_report (dict): The projected makespan of the most recently
+            ordered set of experiments, in both the original ('fifo')
+            and scheduled ('scheduled') order, as computed by `report`.
+    """
+
+    def __init__(self, scope:Scope, min_history:int=10, random_state:int=0):
+        self.scope = scope
+        self.min_history = min_history
+        self.random_state = random_state
+        self.regression = None
+        self.last_report = None
+
+    def _parameters(self, experiments):
+        names = self.scope.get_uncertainty_names() + self.scope.get_lever_names()
+        return self.scope.ensure_dtypes(experiments[[i for i in names if i in experiments.columns]])
+
+    def _features(self, experiments):
+        x = self._cat_encoder.transform(self._parameters(experiments))
+        return x.reindex(columns=self._feature_names, fill_value=0).astype(np.float64)
+
+    def fit(self, experiments:pd.DataFrame, run_seconds:pd.Series):
+        """
+        Fit the runtime model.
+
+        Args:
+            experiments (pandas.DataFrame): The parameters of past experiments.
+            run_seconds (pandas.Series): The recorded run time of each
+                experiment, with an index matching `experiments`.
+
+        Returns:
+            self
+        """
+        from sklearn.ensemble import ExtraTreesRegressor
+        run_seconds = pd.Series(run_seconds).dropna()
+        run_seconds = run_seconds[run_seconds.index.isin(experiments.index)]
+        if len(run_seconds) < self.min_history:
+            self.regression = None
+            return self
+        experiments = experiments.loc[run_seconds.index]
+        x = self._parameters(experiments)
+        self._cat_encoder = OneHotCatEncoder(handle_unknown='ignore').fit(x)
+        self._feature_names = list(self._cat_encoder.transform(x).columns)
+        self.regression = ExtraTreesRegressor(
+            n_estimators=50,
+            min_samples_leaf=2,
+            random_state=self.random_state,
+        )
+        # run times are positive and skewed, so model them in log space
+        self.regression.fit(self._features(experiments), np.log(run_seconds.clip(lower=1e-3)))
+        return self
+
+    def fit_from_db(self, db, design_name=None, source=None):
+        """
+        Fit the runtime model on run times recorded in a database.
+
+        Args:
+            db (Database): The database holding the run manifest.
+            design_name (str, optional): Only use the run times of
+                experiments in this design.
+            source (int, optional): Only use the run times of this model
+                (0 = core model or non-zero = meta-model id).
+
+        Returns:
+            self
+        """
+        runs = db.read_experiment_run_status(self.scope.name, design_name, source=source)
+        runs = runs[(runs['run_status'] == 'complete') & runs['run_duration'].notna()]
+        if len(runs) < self.min_history:
+            self.regression = None
+            return self
+        experiments = db.read_experiment_parameters(self.scope.name, design_name)
+        return self.fit(experiments, runs['run_duration'])
+
+    def predict(self, design:pd.DataFrame):
+        """
+        Predict the run time of experiments.
+
+        Args:
+            design (pandas.DataFrame): The experiments.
+
+        Returns:
+            pandas.Series: The expected run time in seconds, or
+                NaN for all experiments if the runtime model has
+                not been fit.
+        """
+        if self.regression is None:
+            return pd.Series(np.nan, index=design.index)
+        return pd.Series(
+            np.exp(self.regression.predict(self._features(design))),
+            index=design.index,
+        )
+
+    def report(self, design:pd.DataFrame, n_workers:int=1, run_seconds=None):
+        """
+        Compare the projected makespan of FIFO and scheduled dispatch.
+
+        Args:
+            design (pandas.DataFrame): The experiments, in their original order.
+            n_workers (int, default 1): The number of parallel workers.
+            run_seconds (pandas.Series, optional): Run times to use in the
+                projection.  If not given, the predicted run times are used.
+
+        Returns:
+            dict
+        """
+        if run_seconds is None:
+            run_seconds = self.predict(design)
+        run_seconds = pd.Series(run_seconds).reindex(design.index)
+        if run_seconds.isna().any():
+            return dict(fifo=np.nan, scheduled=np.nan, n_workers=n_workers)
+        fifo = projected_makespan(run_seconds, n_workers)
+        scheduled = projected_makespan(self.order(design, run_seconds=run_seconds).index.map(run_seconds), n_workers)
+        return dict(fifo=fifo, scheduled=scheduled, n_workers=n_workers)
+
+    def order(self, design:pd.DataFrame, n_workers:int=None, run_seconds=None):
+        """
+        Sort experiments so the longest expected are dispatched first.
+
+        Args:
+            design (pandas.DataFrame): The experiments.
+            n_workers (int, optional): If given, the projected makespan
+                of this order is compared with the original order, and
+                stored in `last_report`.
+            run_seconds (pandas.Series, optional): Run times to sort by.
+                If not given, the predicted run times are used.
+
+        Returns:
+            pandas.DataFrame: The same experiments, reordered.  If the
+                runtime model has not been fit, the order is unchanged.
+        """
+        if run_seconds is None:
+            run_seconds = self.predict(design)
+        run_seconds = pd.Series(run_seconds).reindex(design.index)
+        if n_workers is not None:
+            self.last_report = self.report(design, n_workers, run_seconds=run_seconds)
+        if run_seconds.isna().any():
+            return design
+        if n_workers is not None:
+            _logger.info(
+                f"projected makespan on {n_workers} workers: "
+                f"{self.last_report['scheduled']:.1f}s scheduled, "
+                f"{self.last_report['fifo']:.1f}s FIFO"
+            )
+        position = np.argsort(-run_seconds.values, kind='stable')
+        return design.iloc[position]
@@ -576,10 +576,17 @@ class Scope:
             sampler (str or AbstractSampler, default 'lhs'): The sampler to use for this
                 design.  Available pre-defined samplers include:
                     - 'lhs': Latin Hypercube sampling
+                    - 'olhs': Latin Hypercube sampling, optimized for low correlation
+                        between parameters and for spread between experiments (see
+                        `CorrelatedLHSSampler` to set the optimization time)
                     - 'ulhs': Uniform Latin Hypercube sampling, which ignores defined
                         distribution shapes from the scope and samples everything
                         as if it was from a uniform distribution
                     - 'mc': Monte carlo sampling
+                    - 'sobol': Scrambled Sobol low-discrepancy sampling, which
+                        covers the space more evenly than random sampling, and is
+                        most even when the number of samples is a power of 2
+                    - 'halton': Scrambled Halton low-discrepancy sampling
                     - 'uni': Univariate sensitivity testing, whereby experiments are
                         generated setting each parameter individually to minimum and
                         maximum values (for numeric dtypes) or all possible values
@@ -594,9 +601,17 @@ class Scope:
                 for levers and uncertainties, and then combine the two in a full-factorial
                 manner.  This argument has no effect unless `sample_from` is 'all'.
                 Note that jointly may produce a very large design;
+            chunk_size (int, optional): Stream the design into the database
+                `db` instead of returning it, generating and writing this many
+                experiments at a time.  See `emat.experiment.experimental_design.design_experiments`.
+            lazy (bool, default False): If `jointly` is False, return the
+                full-factorial design as a `FactorialDesign`, which makes the
+                combined experiments as they are needed.
 
         Returns:
-            pandas.DataFrame: The resulting design.
+            pandas.DataFrame, FactorialDesign or StreamedDesign:
+                The resulting design, or if `chunk_size` is given, a handle
+                to read the design from the database.
         """
         if 'scope' in kwargs:
             kwargs.pop('scope')
@@ -606,26 +621,99 @@ class Scope:
 
     def _any_correlated_parameters(self):
         for p in self.get_parameters():
-            if len(p.corr):
+            if len(getattr(p, 'corr', None) or []):
                 return True
         return False
 
-    def get_density(self, *args, **kwargs):
+    def get_density(self, *args, log=False, **kwargs):
         """
-        Compute the parametric density at any point.
+        Compute the parametric density at any point, or at many points.
+
+        The density is the product of the marginal densities of the
+        uncertainties and levers, using probability masses for discrete
+        and categorical parameters.  Correlated parameters are joined by a
+        Gaussian copula with the correlations defined in the scope, which
+        is how correlation is induced when experiments are designed; for
+        discrete parameters in a correlation, the copula is evaluated at
+        the middle of each value's step in the cumulative distribution.
+        Constants have no distribution and do not affect the density.
+
+        Args:
+            *args (Mapping or pandas.DataFrame): Parameter values.  Give a
+                DataFrame to evaluate the density at every row at once.
+                Parameters that are not given are at their default values.
+            log (bool, default False): Give the log of the density, which
+                does not underflow when there are many parameters.
+            **kwargs: Parameter values, which update those in `args`.
+
+        Returns:
+            float, or pandas.Series with the same index as a given DataFrame
         """
+        if len(args) == 1 and isinstance(args[0], pandas.DataFrame) and not kwargs:
+            log_density = self._log_density(args[0])
+            return log_density if log else numpy.exp(log_density)
+
+        point = {}
+        for arg in args:
+            point.update(arg)
+        point.update(kwargs)
+        log_density = self._log_density(pandas.DataFrame({k: [v] for k, v in point.items()})).iloc[0]
+        return log_density if log else numpy.exp(log_density)
+
+    def _log_density(self, df):
+        """The log of the parametric density at each row of a DataFrame."""
+        from scipy.stats import norm
+        from scipy.linalg import cholesky, solve_triangular
+        from ..util.distributions import is_discrete_dist
+
+        parameters = self.get_uncertainties() + self.get_levers()
+        correlation = None
         if self._any_correlated_parameters():
-            raise NotImplementedError("density with correlated parameters is coming soon")
-
-        if args:
-            for arg in args:
-                kwargs.update(arg)
+            from ..experiment.samplers import CorrelatedSampler
+            correlation = CorrelatedSampler().get_correlation_matrix(parameters, none_if_none=True)
+            correlated = [
+                name for name in correlation.index
+                if numpy.count_nonzero(correlation.loc[name].values) > 1
+            ]
+        else:
+            correlated = []
+
+        log_density = numpy.zeros(len(df))
+        copula_u = {}
+        with numpy.errstate(divide='ignore'):
+            for p in parameters:
+                if p.name in df.columns:
+                    values = df[p.name]
+                else:
+                    values = pandas.Series([p.default] * len(df), index=df.index)
+                if p.dtype == 'cat':
+                    x = pandas.Categorical(values, categories=p.values).codes.astype(float)
+                    x[x < 0] = numpy.nan
+                else:
+                    x = numpy.asarray(values, dtype=float)
+                if is_discrete_dist(p.dist):
+                    log_p = p.dist.logpmf(x)
+                    if p.name in correlated:
+                        copula_u[p.name] = p.dist.cdf(x) - numpy.exp(log_p) / 2
+                else:
+                    log_p = p.dist.logpdf(x)
+                    if p.name in correlated:
+                        copula_u[p.name] = p.dist.cdf(x)
+                # unknown categories, and values outside the support, have no density
+                log_density += numpy.where(numpy.isnan(x), -numpy.inf, numpy.nan_to_num(log_p, nan=-numpy.inf))
+
+        if correlated:
+            chol = cholesky(correlation.loc[correlated, correlated].values, lower=True)
+            u = numpy.column_stack([copula_u[name] for name in correlated])
+            z = norm.ppf(numpy.clip(numpy.nan_to_num(u, nan=0.5), 1e-15, 1 - 1e-15))
+            w = solve_triangular(chol, z.T, lower=True)
+            log_copula = (
+                    - numpy.log(numpy.diag(chol)).sum()
+                    - 0.5 * ((w ** 2).sum(axis=0) - (z ** 2).sum(axis=1))
+            )
+            log_density = numpy.where(numpy.isfinite(log_density), log_density + log_copula, log_density)
 
-        density = 1.0
-        for p in self.get_parameters():
-            value = kwargs.get(p.name, p.default)
-            density *= p.dist.pdf(value)
-        return density
+        return pandas.Series(log_density, index=df.index)
 
     def shortname(self, name):
         """
@@ -43,6 +43,8 @@ def load_cache_if_available(cache_dir=None, cache_file=None, **kwargs):
 		os.makedirs(subdir, exist_ok=True)
 		cache_file = os.path.join(subdir, hh[6:] + ".gz")
 		if os.path.exists(cache_file):
+			# mark as recently used, for `prune_cache`
+			os.utime(cache_file)
 			return filez.load(cache_file), None
 		else:
 			with open(cache_file+'.info.txt', 'wt') as notes:
@@ -63,3 +65,52 @@ def save_cache(obj, cache_file):
 		return
 	filez.save(obj, cache_file, overwrite=True)
 
+
+def prune_cache(cache_dir, max_size):
+	"""
+	Delete the least recently used files in a cache directory.
+
+	Parameters
+	----------
+	cache_dir : path-like
+		A cache directory managed by `load_cache_if_available`.
+	max_size : int
+		The maximum total size of the cache files, in bytes.  Files
+		are deleted, oldest first by modification time (which is
+		updated when a cached object is loaded), until the rest
+		fit within this limit.
+
+	Returns
+	-------
+	int
+		The number of cached objects deleted.
+	"""
+	if cache_dir is None or max_size is None or not os.path.isdir(cache_dir):
+		return 0
+	entries = []
+	for dirpath, dirnames, filenames in os.walk(cache_dir):
+		for filename in filenames:
+			if filename.endswith('.info.txt'):
+				continue
+			cache_file = os.path.join(dirpath, filename)
+			try:
+				stat = os.stat(cache_file)
+				size = stat.st_size
+				if os.path.exists(cache_file+'.info.txt'):
+					size += os.path.getsize(cache_file+'.info.txt')
+			except OSError:
+				continue
+			entries.append((stat.st_mtime, size, cache_file))
+	total = sum(size for _, size, _ in entries)
+	n_deleted = 0
+	for _, size, cache_file in sorted(entries):
+		if total <= max_size:
+			break
+		for f in (cache_file, cache_file+'.info.txt'):
+			try:
+				os.remove(f)
+			except OSError:
+				pass
+		total -= size
+		n_deleted += 1
+	return n_deleted
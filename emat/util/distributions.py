@@ -1,7 +1,7 @@
 
 
+import numpy as np
 from scipy.stats import *
-from scipy._lib._util import _lazyselect
 from scipy.stats._distn_infrastructure import rv_frozen
 
 
@@ -216,7 +216,11 @@ class truncated:
 		self.lower_bound = lower_bound
 		self.upper_bound = upper_bound
 
-		self.mass_below_lower_bound = self.frozen_dist.cdf(lower_bound)
+		# for discrete distributions, the mass at the lower bound is kept
+		if is_discrete_dist(frozen_dist):
+			self.mass_below_lower_bound = self.frozen_dist.cdf(lower_bound - 1)
+		else:
+			self.mass_below_lower_bound = self.frozen_dist.cdf(lower_bound)
 		total_truncated_mass = (1-self.frozen_dist.cdf(upper_bound)
 								+self.mass_below_lower_bound)
 		self.untruncated_mass = (1-total_truncated_mass)
@@ -231,38 +235,40 @@ class truncated:
 		)
 
 	def cdf(self, x):
-		r = _lazyselect([x < self.lower_bound,
-						 self.lower_bound <= x <= self.upper_bound,
-						 x > self.upper_bound],
-						[lambda x: 0,
-						 lambda x: ((self.frozen_dist.cdf(x)-self.mass_below_lower_bound)
-									*self.untruncated_mass),
-						 lambda x: 1],
-						(x, ))
-		return r
+		x = np.asarray(x, dtype=float)
+		r = (self.frozen_dist.cdf(x) - self.mass_below_lower_bound) / self.untruncated_mass
+		return np.clip(np.where(x < self.lower_bound, 0.0, np.where(x > self.upper_bound, 1.0, r)), 0.0, 1.0)
 
 	def sf(self, x):
 		return 1-self.cdf(x)
 
+	def _within_bounds(self, x):
+		return (self.lower_bound <= x) & (x <= self.upper_bound)
+
 	def pdf(self, x):
-		r = _lazyselect([x < self.lower_bound,
-						 (self.lower_bound <= x) & (x <= self.upper_bound),
-						 x > self.upper_bound],
-						[lambda x: 0,
-						 lambda x: self.frozen_dist.pdf(x)/self.untruncated_mass,
-						 lambda x: 0],
-						(x, ))
-		return r
+		x = np.asarray(x, dtype=float)
+		return np.where(self._within_bounds(x), self.frozen_dist.pdf(x)/self.untruncated_mass, 0.0)
 
 	def logpdf(self, x):
-		r = _lazyselect([x < self.lower_bound,
-						 (self.lower_bound <= x) & (x <= self.upper_bound),
-						 x > self.upper_bound],
-						[lambda x: 0,
-						 lambda x: self.frozen_dist.logpdf(x)-np.log(self.untruncated_mass),
-						 lambda x: 0],
-						(x, ))
-		return r
+		x = np.asarray(x, dtype=float)
+		with np.errstate(divide='ignore'):
+			return np.where(
+				self._within_bounds(x),
+				self.frozen_dist.logpdf(x)-np.log(self.untruncated_mass),
+				-np.inf,
+			)
+
+	def pmf(self, x):
+		return np.exp(self.logpmf(x))
+
+	def logpmf(self, x):
+		x = np.asarray(x, dtype=float)
+		with np.errstate(divide='ignore'):
+			return np.where(
+				self._within_bounds(x),
+				self.frozen_dist.logpmf(x)-np.log(self.untruncated_mass),
+				-np.inf,
+			)
 
 	def stats(self):
 		raise NotImplementedError("not implemented for truncated")
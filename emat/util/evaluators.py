@@ -22,3 +22,25 @@ def prepare_evaluator(evaluator, model):
 			evaluator = DistributedEvaluator(model, client=evaluator)
 
 	return evaluator
+
+
+def evaluator_workers(evaluator):
+	"""
+	Get the number of experiments an evaluator can run at once.
+
+	Args:
+		evaluator (ema_workbench.Evaluator): The evaluator.
+
+	Returns:
+		int
+	"""
+	n_processes = getattr(evaluator, 'n_processes', None)
+	if n_processes:
+		return int(n_processes)
+	client = getattr(evaluator, 'client', None)
+	if client is not None:
+		try:
+			return max(sum(client.nthreads().values()), 1)
+		except Exception:
+			pass
+	return 1
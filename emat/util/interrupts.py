@@ -0,0 +1,118 @@
+import signal
+import threading
+
+from .loggers import get_module_logger
+_logger = get_module_logger(__name__)
+
+
+class GracefulInterrupt:
+	"""
+	Context manager that defers SIGINT and SIGTERM.
+
+	Inside the context, the first interrupt signal does not raise an
+	exception; instead it sets the `requested` attribute to the signal
+	number, so that a long-running loop can check it at a safe point (e.g. between
+	batches of experiments) and shut down cleanly.  A second signal
+	restores the original handlers and raises `KeyboardInterrupt`
+	immediately.
+
+	Signal handlers can only be installed from the main thread; when
+	used from any other thread this context manager does nothing and
+	`requested` always remains None.
+
+	Args:
+		signals (Iterable[int], optional): The signals to intercept.
+			Defaults to SIGINT and SIGTERM.
+	"""
+
+	def __init__(self, signals=None):
+		if signals is None:
+			signals = (signal.SIGINT, signal.SIGTERM)
+		self.signals = tuple(signals)
+		self.requested = None
+		self._original_handlers = {}
+
+	def _handler(self, signum, frame):
+		if self.requested:
+			self._restore()
+			raise KeyboardInterrupt
+		self.requested = signum
+		_logger.warning(
+			f"received signal {signum}, finishing current work before stopping "
+			f"(signal again to stop immediately)"
+		)
+
+	def _restore(self):
+		for signum, handler in self._original_handlers.items():
+			signal.signal(signum, handler)
+		self._original_handlers = {}
+
+	def __enter__(self):
+		self.requested = None
+		if threading.current_thread() is threading.main_thread():
+			for signum in self.signals:
+				self._original_handlers[signum] = signal.signal(signum, self._handler)
+		return self
+
+	def __exit__(self, exc_type, exc_val, exc_tb):
+		self._restore()
+		return False
+
+
+def call_with_timeout(func, timeout, *args, **kwargs):
+	"""
+	Call a function, raising an error if it runs too long.
+
+	When called from the main thread of a process on a platform that
+	supports SIGALRM, the call is interrupted by an alarm signal, so
+	that any child process started with `subprocess.run` is killed as
+	the error propagates.  Otherwise the function is run in a daemon
+	thread, which is abandoned (but not stopped) if it times out; the
+	error raised then has its `abandoned` attribute set, as the function
+	may still be running and whatever state it uses should not be reused.
+
+	Args:
+		func (Callable): The function to call.
+		timeout (float or None): The time limit in seconds.  If None,
+			the function is called with no time limit.
+		*args, **kwargs: Arguments passed to `func`.
+
+	Returns:
+		Any: The return value of `func`.
+
+	Raises:
+		ExperimentTimeoutError: If the time limit is exceeded.
+	"""
+	from ..exceptions import ExperimentTimeoutError
+
+	if timeout is None:
+		return func(*args, **kwargs)
+
+	if hasattr(signal, 'SIGALRM') and threading.current_thread() is threading.main_thread():
+		def _alarm(signum, frame):
+			raise ExperimentTimeoutError(f"exceeded time limit of {timeout} seconds")
+		original_handler = signal.signal(signal.SIGALRM, _alarm)
+		signal.setitimer(signal.ITIMER_REAL, timeout)
+		try:
+			return func(*args, **kwargs)
+		finally:
+			signal.setitimer(signal.ITIMER_REAL, 0)
+			signal.signal(signal.SIGALRM, original_handler)
+
+	result = {}
+	def _target():
+		try:
+			result['value'] = func(*args, **kwargs)
+		except BaseException as err:
+			result['error'] = err
+	worker = threading.Thread(target=_target, daemon=True)
+	worker.start()
+	worker.join(timeout)
+	if worker.is_alive():
+		raise ExperimentTimeoutError(
+			f"exceeded time limit of {timeout} seconds, and could not be stopped",
+			abandoned=True,
+		)
+	if 'error' in result:
+		raise result['error']
+	return result.get('value')
@@ -1,6 +1,7 @@
 import unittest
 import os
 import pytest
+import pandas as pd
 
 import emat
 from emat.scope.scope import Scope
@@ -83,7 +84,354 @@ class TestCoreModelMethods(unittest.TestCase):
                        '190 Daily VHT':272612.499025}
         self.assertEqual(expected_pm, pm_vals)
 
-        
+
+def test_resumable_run_experiments():
+    import signal
+    from emat.examples import road_test
+    from emat.model.core_python import Road_Capacity_Investment
+
+    s, db, m = road_test()
+    calls = []
+
+    def counted_road_test(**kwargs):
+        calls.append(1)
+        if interrupt_on and len(calls) == interrupt_on:
+            os.kill(os.getpid(), signal.SIGINT)
+        return Road_Capacity_Investment(**kwargs)
+
+    m2 = PythonCoreModel(counted_road_test, scope=s, db=db)
+    design = m2.design_experiments(n_samples=10, design_name='resumable')
+
+    # interrupt during the second batch, which is finished before stopping
+    interrupt_on = 3
+    partial = m2.run_experiments(design_name='resumable', resume=True, batch_size=2)
+    assert len(calls) == 4
+    assert list(partial.index) == list(design.index[:4])
+    status = db.read_experiment_run_status(s.name, 'resumable')
+    assert (status.loc[design.index[:4], 'run_status'] == 'complete').all()
+    assert (status.loc[design.index[4:], 'run_status'] == 'interrupted').all()
+
+    # resuming dispatches only the remaining experiments
+    interrupt_on = None
+    full = m2.run_experiments(design_name='resumable', resume=True, batch_size=2)
+    assert len(calls) == 10
+    assert list(full.index) == list(design.index)
+    status = db.read_experiment_run_status(s.name, 'resumable')
+    assert (status['run_status'] == 'complete').all()
+
+    # merged results match a regular non-resumable run
+    direct = m.run_experiments(design, db=False)
+    pd.testing.assert_frame_equal(full[direct.columns], direct, check_dtype=False)
+
+    # nothing left to dispatch
+    again = m2.run_experiments(design_name='resumable', resume=True)
+    assert len(calls) == 10
+    pd.testing.assert_frame_equal(again[direct.columns], direct, check_dtype=False)
+
+
+def test_run_times_are_not_outcomes():
+    from emat.examples import road_test
+
+    s, db, m = road_test()
+    design = m.design_experiments(n_samples=3, design_name='timed')
+    results = m.run_experiments(design)
+    assert '_emat_run_seconds' not in results.columns
+    status = db.read_experiment_run_status(s.name, 'timed')
+    assert status['run_duration'].notna().all()
+
+    # a later single run returns only the measures
+    outcomes = m.run_experiment(design.iloc[0])
+    assert set(outcomes) == set(s.get_measure_names())
+
+
+def test_experiment_timeouts_and_quarantine():
+    import time
+    from emat.examples import road_test
+    from emat.model.core_python import Road_Capacity_Investment
+
+    s, db, m = road_test()
+    design = m.design_experiments(n_samples=6, design_name='flaky')
+    hanging, crashing, flaky = design.index[1], design.index[3], design.index[4]
+    attempts = {}
+
+    def flaky_road_test(**kwargs):
+        ex_id = db.read_experiment_id(s.name, 'flaky', kwargs)
+        attempts[ex_id] = attempts.get(ex_id, 0) + 1
+        if ex_id == hanging:
+            time.sleep(10)
+        if ex_id == crashing:
+            raise ZeroDivisionError('poison experiment')
+        if ex_id == flaky and attempts[ex_id] == 1:
+            raise RuntimeError('transient failure')
+        return Road_Capacity_Investment(**kwargs)
+
+    m2 = PythonCoreModel(flaky_road_test, scope=s, db=db)
+    result = m2.run_experiments(
+        design_name='flaky', timeout=1, max_retries=1, retry_backoff=0.01,
+    )
+    measures = s.get_measure_names()
+    assert len(result) == 6
+    assert result.loc[[hanging, crashing], measures].isna().all().all()
+    assert result.drop(index=[hanging, crashing])[measures].notna().all().all()
+    assert attempts[hanging] == 2
+    assert attempts[crashing] == 2
+    assert attempts[flaky] == 2
+
+    status = db.read_experiment_run_status(s.name, 'flaky')
+    quarantined = status[status['run_status'] == 'quarantined']
+    assert sorted(quarantined.index) == sorted([hanging, crashing])
+    assert (status.drop(index=[hanging, crashing])['run_status'] == 'complete').all()
+    assert 'ExperimentTimeoutError' in status.loc[hanging, 'run_error']
+    assert 'poison experiment' in status.loc[crashing, 'run_error']
+    pending = db.read_experiment_parameters(s.name, 'flaky', only_pending=True)
+    assert sorted(pending.index) == sorted([hanging, crashing])
+
+    # quarantined experiments are not dispatched again
+    attempts.clear()
+    resumed = m2.run_experiments(design_name='flaky', resume=True, timeout=1)
+    assert attempts == {}
+    assert len(resumed) == 4
+
+
+
+
+def test_timeouts_outside_the_main_thread_are_not_retried():
+    import threading
+    import time
+    from emat.examples import road_test
+    from emat.model.core_python import Road_Capacity_Investment
+
+    s, db, m = road_test()
+    design = m.design_experiments(n_samples=4, db=False)
+    hanging_alpha = design['alpha'].iloc[1]
+    attempts = []
+
+    def hanging_road_test(**kwargs):
+        if kwargs['alpha'] == hanging_alpha:
+            attempts.append(time.perf_counter())
+            time.sleep(3)
+        return Road_Capacity_Investment(**kwargs)
+
+    m2 = PythonCoreModel(hanging_road_test, scope=s)
+    results = {}
+    worker = threading.Thread(target=lambda: results.setdefault('result', m2.run_experiments(
+        design, db=False, timeout=0.5, max_retries=2, retry_backoff=0.01,
+    )))
+    worker.start()
+    worker.join()
+    result = results['result']
+    measures = s.get_measure_names()
+    # the hanging run could not be stopped, so it is abandoned without retries
+    assert len(attempts) == 1
+    assert result.loc[design.index[1], measures].isna().all()
+    assert result.drop(index=design.index[1])[measures].notna().all().all()
+
+def test_all_nan_outcomes_are_not_quarantined():
+    import numpy as np
+    from emat.examples import road_test
+    from emat.model.core_python import Road_Capacity_Investment
+
+    s, db, m = road_test()
+    design = m.design_experiments(n_samples=4, design_name='nan_outcomes')
+    empty, crashing = design.index[1], design.index[2]
+
+    calls = []
+
+    def sparse_road_test(**kwargs):
+        ex_id = db.read_experiment_id(s.name, 'nan_outcomes', kwargs)
+        calls.append(ex_id)
+        if ex_id == crashing:
+            raise ZeroDivisionError('poison experiment')
+        result = Road_Capacity_Investment(**kwargs)
+        if ex_id == empty:
+            result = {k: np.nan for k in result}
+        return result
+
+    m2 = PythonCoreModel(sparse_road_test, scope=s, db=db)
+    result = m2.run_experiments(design_name='nan_outcomes', max_retries=0)
+    measures = s.get_measure_names()
+    assert result.loc[[empty, crashing], measures].isna().all().all()
+
+    status = db.read_experiment_run_status(s.name, 'nan_outcomes')
+    assert status.loc[crashing, 'run_status'] == 'quarantined'
+    assert (status.drop(index=[crashing])['run_status'] == 'complete').all()
+
+    # completed experiments with all-NaN outcomes are not run again on resume
+    calls.clear()
+    resumed = m2.run_experiments(design_name='nan_outcomes', resume=True, max_retries=0)
+    assert calls == []
+    assert sorted(resumed.index) == sorted(design.index.drop(crashing))
+    assert resumed.loc[empty, measures].isna().all()
+
+def test_projected_makespan():
+    from emat.model.scheduler import projected_makespan
+    assert projected_makespan([1, 1, 1, 1, 4], n_workers=2) == 6
+    assert projected_makespan([4, 1, 1, 1, 1], n_workers=2) == 4
+    assert projected_makespan([4, 1, 1, 1, 1], n_workers=1) == 8
+
+
+def test_cost_aware_scheduler():
+    import numpy as np
+    from emat.examples import road_test
+    from emat.model.scheduler import ExperimentScheduler
+
+    s, db, m = road_test()
+    design = m.design_experiments(n_samples=40, design_name='timed', random_seed=42)
+
+    # run times are recorded in the run manifest
+    m.run_experiments(design_name='timed')
+    status = db.read_experiment_run_status(s.name, 'timed')
+    assert (status['run_status'] == 'complete').all()
+    assert (status['run_duration'] > 0).all()
+
+    # runtime model learns which experiments take longest
+    run_seconds = 1 + design['expand_capacity'] / 10
+    scheduler = ExperimentScheduler(s).fit(design, run_seconds)
+    ordered = scheduler.order(design, n_workers=4)
+    assert sorted(ordered.index) == sorted(design.index)
+    top = ordered.index[:10]
+    assert run_seconds[top].mean() > run_seconds.drop(top).mean()
+    report = scheduler.report(design, n_workers=4, run_seconds=run_seconds)
+    assert report['scheduled'] <= report['fifo']
+    assert scheduler.last_report['n_workers'] == 4
+    assert np.isfinite(scheduler.last_report['scheduled'])
+
+    # too little history leaves the order unchanged
+    untrained = ExperimentScheduler(s, min_history=100).fit(design, run_seconds)
+    assert list(untrained.order(design).index) == list(design.index)
+
+    # run_experiments reorders dispatch but returns results in design order
+    design2 = m.design_experiments(n_samples=12, design_name='timed2', random_seed=43)
+    scheduler2 = ExperimentScheduler(s, min_history=5)
+    result = m.run_experiments(design_name='timed2', scheduler=scheduler2, batch_size=4)
+    assert list(result.index) == list(design2.index)
+    assert scheduler2.regression is not None
+    assert np.isfinite(scheduler2.last_report['fifo'])
+
+
+def test_adaptive_design():
+    from emat.examples import road_test
+    from emat.learn.boosting import LinearAndGaussian
+
+    s, db, m = road_test()
+    mm = m.adaptive_design(
+        n_initial=20,
+        batch_size=5,
+        target_score=1.0,
+        max_experiments=35,
+        regressor=LinearAndGaussian(n_restarts_optimizer=2),
+    )
+
+    # the budget stops the loop, and every batch is stored
+    history = mm.adaptive_history
+    assert list(history.index) == [0, 1, 2, 3]
+    assert list(history['n_experiments']) == [20, 25, 30, 35]
+    assert db.read_design_names(s.name) == ['adaptive_0', 'adaptive_1', 'adaptive_2', 'adaptive_3']
+    for k in range(1, 4):
+        assert len(db.read_experiment_all(s.name, f'adaptive_{k}')) == 5
+    assert list(history['metamodel_id']) == db.read_metamodel_ids(s.name)
+    assert mm.metamodel_id == history['metamodel_id'].iloc[-1]
+    assert len(mm.function.input_sample) == 35
+    assert mm.db is db
+
+    # reaching the target score finishes the running batch, then stops
+    mm2 = m.adaptive_design(
+        n_initial=20,
+        batch_size=5,
+        target_score=-1e9,
+        design_name='easy',
+        db=False,
+        regressor=LinearAndGaussian(n_restarts_optimizer=2),
+    )
+    assert list(mm2.adaptive_history['n_experiments']) == [20]
+    assert len(mm2.function.input_sample) == 20
+    # without a database, the meta-model does not take the model's default db
+    assert mm2.db is None
+
+    # between hyperparameter searches, the previous meta-model is updated
+    mm3 = m.adaptive_design(
+        n_initial=20,
+        batch_size=5,
+        target_score=1.0,
+        max_experiments=35,
+        design_name='updated',
+        db=False,
+        refit_every=2,
+        regressor=LinearAndGaussian(n_restarts_optimizer=2),
+    )
+    assert list(mm3.adaptive_history['n_experiments']) == [20, 25, 30, 35]
+    assert len(mm3.function.input_sample) == 35
+    assert list(mm3.function.sample_stratification) == [0] * 20 + [1] * 5 + [2] * 5 + [3] * 5
+    assert mm3.db is None
+    assert db.read_design_names(s.name) == ['adaptive_0', 'adaptive_1', 'adaptive_2', 'adaptive_3']
+    assert list(history['metamodel_id']) == db.read_metamodel_ids(s.name)
+
+
+def test_lazy_factorial_design():
+    from emat.examples import road_test
+    from emat.experiment.experimental_design import FactorialDesign
+
+    s, db, m = road_test()
+    eager = m.design_experiments(n_samples=(6, 4), jointly=False, db=False)
+    lazy = m.design_experiments(n_samples=(6, 4), jointly=False, db=False, lazy=True)
+    assert isinstance(lazy, FactorialDesign)
+    assert len(lazy) == 24
+    assert list(lazy.columns) == list(eager.columns)
+    pd.testing.assert_frame_equal(lazy.to_frame(), eager)
+    pd.testing.assert_frame_equal(lazy.iloc[5:19:3], eager.iloc[5:19:3])
+    pd.testing.assert_series_equal(lazy.iloc[-3], eager.iloc[-3])
+    chunks = list(lazy.iter_chunks(10))
+    assert [len(c) for c in chunks] == [10, 10, 4]
+    pd.testing.assert_frame_equal(pd.concat(chunks), eager)
+
+    # experiments are written to the database in chunks, and labeled with their ids
+    lazy = m.design_experiments(n_samples=(6, 4), jointly=False, lazy=True, design_name='lazy')
+    stored = db.read_experiment_parameters(s.name, 'lazy')
+    assert list(lazy.index) == list(stored.index)
+    pd.testing.assert_frame_equal(lazy.to_frame()[stored.columns], stored, check_dtype=False)
+
+    # runs and meta-model scoring consume the design in chunks
+    result = m.run_experiments(lazy, chunk_size=10)
+    direct = m.run_experiments(lazy.to_frame(), db=False)
+    pd.testing.assert_frame_equal(result, direct)
+    resumed = m.run_experiments(lazy, resume=True, chunk_size=10)
+    pd.testing.assert_frame_equal(resumed[direct.columns], direct, check_dtype=False)
+
+    mm = m.create_metamodel_from_design('lazy')
+    pd.testing.assert_frame_equal(mm.predict(lazy), mm.predict(lazy.to_frame()))
+    pd.testing.assert_frame_equal(pd.concat(mm.iter_predict(lazy)), mm.predict(lazy.to_frame()))
+
+
+def test_run_lazy_design_without_results():
+    from emat.examples import road_test
+
+    s, db, m = road_test()
+    lazy = m.design_experiments(n_samples=(6, 4), jointly=False, lazy=True, design_name='lazy')
+    reads = []
+    read_experiment_run_status = db.read_experiment_run_status
+    read_experiment_measures_in_range = db.read_experiment_measures_in_range
+    db.read_experiment_run_status = lambda *a, **k: reads.append('status') or read_experiment_run_status(*a, **k)
+    db.read_experiment_measures_in_range = lambda *a, **k: reads.append(a[2:4]) or read_experiment_measures_in_range(*a, **k)
+
+    summary = m.run_experiments(lazy, chunk_size=10, return_results=False)
+    assert summary.to_dict() == {
+        'complete': 24, 'failed': 0, 'already complete': 0, 'quarantined': 0, 'interrupted': 0,
+    }
+    stored = db.read_experiment_measures(s.name, 'lazy')
+    assert list(stored.index) == list(lazy.index)
+
+    # the run manifest is read once, and results only for each chunk's ids
+    reads.clear()
+    summary = m.run_experiments(lazy, resume=True, chunk_size=10, return_results=False)
+    assert summary['already complete'] == 24
+    assert summary['complete'] == 0
+    ids = list(lazy.index)
+    assert reads == ['status', (ids[0], ids[9]), (ids[10], ids[19]), (ids[20], ids[23])]
+
+    with pytest.raises(ValueError):
+        m.run_experiments(lazy.to_frame(), db=False, return_results=False)
+
+
 if __name__ == '__main__':
     unittest.main()
 
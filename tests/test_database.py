@@ -246,6 +246,53 @@ class TestDatabaseGZ():
         assert m.metamodel_id == None
 
 
+def test_write_experiments_with_concurrent_writer(tmp_path):
+    import sqlite3
+    from emat.database.sqlite import sql_queries as sq
+    s = emat.Scope(emat.package_file('model', 'tests', 'road_test.yaml'))
+    db = SQLiteDB(str(tmp_path / 'concurrent.db'), initialize=True)
+    s.store_scope(db)
+
+    # another connection adds an experiment just as this one starts writing
+    class Cursor:
+        def __init__(self, cursor):
+            self._cursor = cursor
+        def __getattr__(self, name):
+            return getattr(self._cursor, name)
+        def _interject(self, query):
+            if query == sq.INSERT_EX and not other_ids:
+                other = sqlite3.connect(db.database_path)
+                other_ids.append(other.execute(sq.INSERT_EX, ['other', s.name]).lastrowid)
+                other.commit()
+                other.close()
+        def execute(self, query, *args):
+            self._interject(query)
+            return self._cursor.execute(query, *args)
+        def executemany(self, query, *args):
+            self._interject(query)
+            return self._cursor.executemany(query, *args)
+
+    class Connection:
+        def __init__(self, conn):
+            self._conn = conn
+        def __getattr__(self, name):
+            return getattr(self._conn, name)
+        def cursor(self):
+            return Cursor(self._conn.cursor())
+
+    other_ids = []
+    conn = db.conn
+    db.conn = Connection(conn)
+    try:
+        design = s.design_experiments(n_samples=5, random_seed=1, db=db, design_name='mine')
+    finally:
+        db.conn = conn
+    assert len(other_ids) == 1
+    assert other_ids[0] not in design.index
+    assert len(design) == 5
+    stored = db.read_experiment_parameters(s.name, 'mine')
+    assert sorted(stored.index) == sorted(design.index)
+
 
 emat.package_file('model', 'tests', 'road_test.yaml')
 
@@ -57,6 +57,133 @@ class TestExperimentMethods(unittest.TestCase):
         exp_def2 = self.db_test.read_experiment_parameters(self.scp.name,'lhs_not_joint')
         assert (exp_def[exp_def2.columns] == exp_def2).all().all()
 
+    def test_optimized_latin_hypercube(self):
+        from emat.experiment.latin_hypercube import optimized_lhs
+        h = optimized_lhs(6, 40, random_state=0)
+        assert h.shape == (6, 40)
+        for column in h:
+            assert sorted(np.floor(column * 40)) == list(range(40))
+        h0 = optimized_lhs(6, 40, random_state=0, n_iter=0)
+        off_diagonal = ~np.eye(6, dtype=bool)
+        assert np.abs(np.corrcoef(h)[off_diagonal]).max() < np.abs(np.corrcoef(h0)[off_diagonal]).max() / 3
+
+        exp_def = self.scp.design_experiments(
+            n_samples_per_factor=10,
+            random_seed=1234,
+            sampler='olhs',
+        )
+        exp_def2 = self.scp.design_experiments(
+            n_samples_per_factor=10,
+            random_seed=1234,
+            sampler='olhs',
+        )
+        assert len(exp_def) == self.scp.n_sample_factors()*10
+        assert (exp_def == exp_def2).all().all()
+        assert (exp_def['TestRiskVar'] == 1.0).all()
+        assert (exp_def['Freeway Capacity']).mean() == approx(1.5, abs=1e-3)
+
+    def test_low_discrepancy(self):
+        from emat.experiment.low_discrepancy import sobol, halton
+        h = sobol(3, 8, scramble=False)
+        assert (np.floor(h * 8) / 8 == [
+            [0, 0.5, 0.75, 0.25, 0.375, 0.875, 0.625, 0.125],
+            [0, 0.5, 0.25, 0.75, 0.375, 0.875, 0.125, 0.625],
+            [0, 0.5, 0.25, 0.75, 0.625, 0.125, 0.875, 0.375],
+        ]).all()
+        for sample in (sobol(50, 256, random_state=0), halton(50, 256, random_state=0)):
+            assert sample.shape == (50, 256)
+            assert (sample > 0).all() and (sample < 1).all()
+        # scrambled Sobol points remain stratified in every dimension
+        for column in sobol(50, 256, random_state=0):
+            assert sorted(np.floor(column * 256)) == list(range(256))
+        assert (np.floor(halton(2, 9, scramble=False)[1] * 9) == np.arange(9)[[0, 3, 6, 1, 4, 7, 2, 5, 8]]).all()
+
+        for sampler in ('sobol', 'halton'):
+            exp_def = self.scp.design_experiments(
+                n_samples=128,
+                random_seed=1234,
+                sampler=sampler,
+            )
+            exp_def2 = self.scp.design_experiments(
+                n_samples=128,
+                random_seed=1234,
+                sampler=sampler,
+            )
+            assert len(exp_def) == 128
+            assert (exp_def == exp_def2).all().all()
+            assert (exp_def['TestRiskVar'] == 1.0).all()
+            assert (exp_def['Freeway Capacity']).mean() == approx(1.5, abs=0.01)
+
+    def test_design_quality(self):
+        from emat.experiment import design_quality as dq
+        from emat.experiment.low_discrepancy import sobol
+        from scipy.spatial.distance import pdist
+        x = np.random.RandomState(0).rand(300, 4)
+        assert dq.maximin_distance(x) == approx(pdist(x).min())
+        assert dq.max_abs_correlation(x) == approx(np.abs(np.corrcoef(x.T) - np.eye(4)).max())
+        coverage = dq.projection_coverage(x, n_bins=10)
+        assert len(coverage) == 6
+        assert coverage[(0, 1)] == len(set(zip((x[:, 0] * 10).astype(int), (x[:, 1] * 10).astype(int)))) / 100
+
+        # centered L2 discrepancy, against the double sum over all pairs
+        z = np.abs(x - 0.5)
+        pairs = np.prod(
+            1 + 0.5 * z[:, None, :] + 0.5 * z[None, :, :] - 0.5 * np.abs(x[:, None, :] - x[None, :, :]),
+            axis=2,
+        )
+        expected = np.sqrt(
+            (13 / 12) ** 4 - 2 / 300 * np.prod(1 + 0.5 * z - 0.5 * z ** 2, axis=1).sum() + pairs.sum() / 300 ** 2
+        )
+        assert dq.centered_l2_discrepancy(x, chunk_size=64) == approx(expected)
+        assert dq.centered_l2_discrepancy(sobol(4, 256, random_state=0).T) < dq.centered_l2_discrepancy(x[:256])
+
+        exp_def = self.scp.design_experiments(n_samples=100, random_seed=1234, sampler='lhs')
+        quality = dq.design_quality(exp_def, self.scp)
+        assert quality['n_experiments'] == 100
+        assert quality['n_factors'] == self.scp.n_sample_factors()
+        assert 0 < quality['maximin_distance'] <= quality['mean_nearest_distance']
+
+        # uniform LHS ignores the shape of the distributions, but not their bounds
+        exp_def = self.scp.design_experiments(n_samples=100, random_seed=1234, sampler='ulhs')
+        for p in self.scp.get_uncertainties():
+            if p.dtype == 'float' and p.max > p.min:
+                x = (exp_def[p.name] - p.min) / (p.max - p.min)
+                assert np.histogram(x, bins=10, range=(0, 1))[0].tolist() == [10] * 10
+
+        bench = dq.benchmark_samplers(n_factors=[3], n_samples=[64], samplers=['mc', 'sobol'])
+        assert list(bench.index) == [(3, 64, 'mc'), (3, 64, 'sobol')]
+        assert bench.loc[(3, 64, 'sobol'), 'centered_l2_discrepancy'] < bench.loc[(3, 64, 'mc'), 'centered_l2_discrepancy']
+
+    def test_streamed_design(self):
+        handle = self.scp.design_experiments(
+            n_samples=250,
+            random_seed=1234,
+            sampler='mc',
+            db=self.db_test,
+            design_name='mc_streamed',
+            chunk_size=100,
+        )
+        assert len(handle) == 250
+        exp_def = handle.read()
+        assert len(exp_def) == 250
+        assert (exp_def['TestRiskVar'] == 1.0).all()
+        chunks = list(handle.iter_chunks(chunk_size=60))
+        assert [len(c) for c in chunks] == [60, 60, 60, 60, 10]
+        assert (pd.concat(chunks) == exp_def).all().all()
+
+        handle2 = self.scp.design_experiments(
+            n_samples=250,
+            random_seed=1234,
+            sampler='mc',
+            db=self.db_test,
+            design_name='mc_streamed_2',
+            chunk_size=100,
+        )
+        assert (handle2.read().values == exp_def.values).all()
+
+        with pytest.raises(ValueError):
+            self.scp.design_experiments(n_samples=10, chunk_size=5)
+
     def test_monte_carlo(self):
         exp_def = self.scp.design_experiments(
             n_samples_per_factor=10,
@@ -215,6 +342,121 @@ class TestCorrelatedExperimentMethods(unittest.TestCase):
         assert np.corrcoef([exp_def.input_flow, exp_def.value_of_time])[0, 1] == approx(-0.5, rel=0.05)
         assert np.corrcoef([exp_def.unit_cost_expansion, exp_def.value_of_time])[0, 1] == approx(0.9, rel=0.05)
 
+    def test_correlated_sobol(self):
+        scope_file = emat.package_file("model", "tests", "road_test_corr.yaml")
+        scp = Scope(scope_file)
+        exp_def = scp.design_experiments(
+            n_samples=1024,
+            random_seed=1234,
+            sampler='sobol',
+        )
+        assert len(exp_def) == 1024
+        assert (exp_def['free_flow_time'] == 60).all()
+        assert (exp_def['initial_capacity'] == 100).all()
+        assert exp_def['amortization_period'].dtype == np.int64
+        assert set(exp_def['debt_type']) == {'GO Bond', 'Rev Bond', 'Paygo'}
+        assert np.corrcoef([exp_def.alpha, exp_def.beta])[0, 1] == approx(0.75, rel=0.05)
+        assert np.corrcoef([exp_def.alpha, exp_def.expand_capacity])[0, 1] == approx(0.0, abs=0.05)
+        assert np.corrcoef([exp_def.input_flow, exp_def.value_of_time])[0, 1] == approx(-0.5, rel=0.05)
+        assert np.corrcoef([exp_def.unit_cost_expansion, exp_def.value_of_time])[0, 1] == approx(0.9, rel=0.05)
+
+    def test_correlation_induction(self):
+        from scipy.stats import norm
+        from emat.experiment.samplers import induce_correlation, CorrelatedLHSSampler
+        from emat.experiment.latin_hypercube import lhs_corr
+        scope_file = emat.package_file("model", "tests", "road_test_corr.yaml")
+        scp = Scope(scope_file)
+        parms = scp.get_uncertainties() + scp.get_levers()
+        sampler = CorrelatedLHSSampler()
+
+        # only correlated columns change, and chunks give the same result
+        correlation = sampler.get_correlation_matrix(parms)
+        u = np.random.RandomState(0).rand(1000, len(parms))
+        expected = norm.cdf(np.linalg.cholesky(correlation.values).dot(norm.ppf(u).T).T)
+        result = induce_correlation(u, correlation.values)
+        assert result == approx(expected)
+        assert (result[:, correlation.columns.get_loc('expand_capacity')] == u[:, correlation.columns.get_loc('expand_capacity')]).all()
+        induce_correlation(u, correlation.values, inplace=True, chunk_size=64)
+        assert u == approx(expected)
+
+        # cached matrices are not changed through the returned DataFrame
+        correlation.iloc[0, 1] = 0.123
+        assert sampler.get_correlation_matrix(parms).iloc[0, 1] != 0.123
+
+        # whole-column designs match the workbench designs
+        np.random.seed(1234)
+        samples = sampler.generate_designs(parms, 20)
+        samples.kind = dict
+        expected = pd.DataFrame.from_records([_ for _ in samples])
+        np.random.seed(1234)
+        pd.testing.assert_frame_equal(sampler.generate_design_frame(parms, 20), expected)
+
+        # correlated Latin hypercube keeps every column stratified
+        sigma = np.full((4, 4), 0.6) + 0.4 * np.eye(4)
+        h = lhs_corr(4, 500, sigma=sigma, random_state=0)
+        assert (np.sort(np.floor(h * 500), axis=1) == np.arange(500)).all()
+        assert np.corrcoef(h)[~np.eye(4, dtype=bool)] == approx(0.6, abs=0.05)
+
+
+
+class TestBatchPickMethods(unittest.TestCase):
+
+    def test_batch_pick_new_experiments(self):
+        from emat.experiment.experimental_design import (
+            batch_pick_new_experiments,
+            minimum_weighted_distance,
+        )
+        rng = np.random.RandomState(42)
+        weights = np.array([2.0, 1.0, 0.5])
+        existing = pd.DataFrame(rng.rand(10, 3), columns=list('abc'))
+        possible = pd.DataFrame(rng.rand(300, 3), columns=list('abc'), index=np.arange(300) + 1000)
+
+        def brute_force_distance(fixed, other):
+            d = ((other[:, None, :] - fixed[None, :, :]) ** 2 * weights).sum(axis=2)
+            return d.min(axis=1)
+
+        assert minimum_weighted_distance(existing, possible, weights) == approx(
+            brute_force_distance(existing.values, possible.values)
+        )
+
+        # the maximin greedy selection and exchanges, recomputing everything
+        picked = []
+        for i in range(8):
+            fixed = np.concatenate([existing.values, possible.values[picked]])
+            picked.append(int(np.argmax(brute_force_distance(fixed, possible.values))))
+        n_exchanges = 1
+        while n_exchanges:
+            n_exchanges = 0
+            for i in range(8):
+                others = picked[:i] + picked[i + 1:]
+                fixed = np.concatenate([existing.values, possible.values[others]])
+                j = int(np.argmax(brute_force_distance(fixed, possible.values)))
+                if j != picked[i]:
+                    picked[i] = j
+                    n_exchanges += 1
+
+        batch = batch_pick_new_experiments(existing, possible, 8, weights, None, None)
+        assert list(batch.index) == list(possible.index[picked])
+
+    def test_within_buffer(self):
+        from emat.experiment.experimental_design import (
+            count_within_buffer,
+            value_within_buffer,
+        )
+        rng = np.random.RandomState(7)
+        weights = np.array([4.0, 1.0, 9.0])
+        fixed = rng.rand(40, 3)
+        values = rng.rand(40)
+        other = np.concatenate([rng.rand(500, 3), fixed[:5]])
+        distances = np.sqrt(((other[:, None, :] - fixed[None, :, :]) ** 2 * weights).sum(axis=2))
+        within = distances <= 0.6
+        counts = count_within_buffer(fixed, other, weights, buffer_dist=0.6)
+        np.testing.assert_array_equal(counts, within.sum(axis=1))
+        assert counts[-5:].min() >= 1
+        assert value_within_buffer(fixed, values, other, weights, buffer_dist=0.6) == approx(
+            (within * values).sum(axis=1)
+        )
+        assert (count_within_buffer(fixed[:0], other, weights) == 0).all()
 
 
 if __name__ == '__main__':
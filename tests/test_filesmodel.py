@@ -111,6 +111,152 @@ class TestCoreFilesMethods(unittest.TestCase):
         assert {k: measures[k] for k in correct_1.keys()} == approx(correct_1)
 
 
+_SUBPROCESS_MODEL_SCOPE = """
+scope:
+    name: subprocess_model
+    desc: a model that runs in a subprocess
+inputs:
+    x:
+        ptype: exogenous uncertainty
+        min: 0.0
+        max: 1.0
+        dist: uniform
+    y:
+        ptype: policy lever
+        min: 0.0
+        max: 1.0
+        dist: uniform
+outputs:
+    z:
+        kind: info
+"""
+
+_SUBPROCESS_MODEL_SCRIPT = """
+import os, sys, time
+p = dict(line.strip().split(',') for line in open('params.csv'))
+x, y = float(p['x']), float(p['y'])
+time.sleep(float(sys.argv[1]))
+if x > float(sys.argv[2]):
+    sys.exit(3)
+os.makedirs('Outputs', exist_ok=True)
+with open(os.path.join('Outputs', 'z.csv'), 'w') as f:
+    f.write(f',value\\nz,{x + 10 * y}\\n')
+"""
+
+
+def _subprocess_model(tmp_path, sleep=0.5, fail_above=2.0):
+    import sys
+    from emat.model.core_files import FilesCoreModel, TableParser
+    from emat.model.core_files.parsers import loc
+
+    class SubprocessModel(FilesCoreModel):
+        def setup_sandbox(self, params, sandbox_path):
+            os.makedirs(sandbox_path, exist_ok=True)
+            pd.Series(params).to_csv(os.path.join(sandbox_path, 'params.csv'), header=False)
+
+        def subprocess_commands(self, params):
+            return [[sys.executable, '-c', _SUBPROCESS_MODEL_SCRIPT, str(sleep), str(fail_above)]]
+
+    s = Scope('subprocess_model.yaml', scope_def=_SUBPROCESS_MODEL_SCOPE)
+    db = SQLiteDB()
+    s.store_scope(db)
+    m = SubprocessModel(
+        configuration={
+            'model_path': str(tmp_path / 'model'),
+            'model_archive': None,
+        },
+        scope=s,
+        db=db,
+    )
+    m.add_parser(TableParser('z.csv', {'z': loc['z', 'value']}, index_col=0))
+    return s, db, m
+
+
+def test_async_subprocess_evaluator(tmp_path):
+    import time
+    from emat.model.core_files import AsyncSubprocessEvaluator
+
+    s, db, m = _subprocess_model(tmp_path, sleep=1.0)
+    design = m.design_experiments(n_samples=8, design_name='async')
+
+    # eight one-second runs finish in much less than eight seconds
+    start = time.time()
+    result = m.run_experiments(design, evaluator=AsyncSubprocessEvaluator(m, max_concurrent=8))
+    assert time.time() - start < 5.0
+    assert result['z'].values == approx((design['x'] + 10 * design['y']).values)
+
+    # each run has its own sandbox, and results are in the database
+    for i in design.index:
+        assert os.path.exists(m.get_sandbox_path(i))
+    stored = db.read_experiment_measures(s.name, 'async')
+    assert stored['z'].sort_index().values == approx(result['z'].sort_index().values)
+    status = db.read_experiment_run_status(s.name, 'async')
+    assert (status['run_status'] == 'complete').all()
+    assert (status['run_duration'] >= 1.0).all()
+
+
+def test_async_subprocess_evaluator_database_use(tmp_path):
+    from emat.model.core_files import AsyncSubprocessEvaluator
+
+    s, db, m = _subprocess_model(tmp_path, sleep=0.1)
+    design = m.design_experiments(n_samples=4, design_name='written_once')
+    writes = []
+    write_experiment_measures = db.write_experiment_measures
+
+    def counted_write(scope_name, source, measures, *args, **kwargs):
+        writes.extend(measures.index)
+        return write_experiment_measures(scope_name, source, measures, *args, **kwargs)
+
+    db.write_experiment_measures = counted_write
+    result = m.run_experiments(design, evaluator=AsyncSubprocessEvaluator(m))
+    assert sorted(writes) == sorted(design.index)
+    assert '_emat_run_seconds' not in result.columns
+
+    # without a database, nothing is read or written
+    m.db = None
+    writes.clear()
+    result = m.run_experiments(design, evaluator=AsyncSubprocessEvaluator(m), db=False)
+    assert writes == []
+    assert result['z'].values == approx((design['x'] + 10 * design['y']).values)
+
+
+def test_async_subprocess_evaluator_failures_and_cancel(tmp_path):
+    import time
+    import threading
+    import pytest
+    from emat.exceptions import ExperimentsCancelledError
+    from emat.model.core_files import AsyncSubprocessEvaluator
+
+    # failing runs are quarantined, and timed out runs are killed
+    s, db, m = _subprocess_model(tmp_path, sleep=0.1, fail_above=0.5)
+    design = m.design_experiments(n_samples=6, design_name='failing', random_seed=3)
+    evaluator = AsyncSubprocessEvaluator(m, max_concurrent=3)
+    result = m.run_experiments(design, evaluator=evaluator, max_retries=1, retry_backoff=0.01)
+    failing = design.index[design['x'] > 0.5]
+    assert 0 < len(failing) < len(design)
+    assert result.loc[failing, 'z'].isna().all()
+    assert result.drop(index=failing)['z'].notna().all()
+    status = db.read_experiment_run_status(s.name, 'failing')
+    assert sorted(status.index[status['run_status'] == 'quarantined']) == sorted(failing)
+    assert status.loc[failing, 'run_error'].str.contains('CalledProcessError').all()
+
+    s, db, m = _subprocess_model(tmp_path / 'slow', sleep=10)
+    design = m.design_experiments(n_samples=2, design_name='slow')
+    result = m.run_experiments(design, evaluator=AsyncSubprocessEvaluator(m), timeout=0.5)
+    assert result['z'].isna().all()
+    status = db.read_experiment_run_status(s.name, 'slow')
+    assert status['run_error'].str.contains('ExperimentTimeoutError').all()
+
+    # cancelling stops the running subprocesses
+    design = m.design_experiments(n_samples=4, design_name='cancelled')
+    evaluator = AsyncSubprocessEvaluator(m, max_concurrent=2)
+    threading.Timer(0.5, evaluator.cancel).start()
+    start = time.time()
+    with pytest.raises(ExperimentsCancelledError):
+        m.run_experiments(design, evaluator=evaluator)
+    assert time.time() - start < 5
+
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -17,3 +17,248 @@ def test_select_unique_columns():
 	s = SelectUniqueColumns().fit(df)
 	pandas.testing.assert_frame_equal(s.transform(df), df[['Aa','Bb','Dd']])
 
+
+
+def test_parallel_gaussian_process_restarts(monkeypatch):
+	import numpy
+	from emat.learn.anisotropic import AnisotropicGaussianProcessRegressor
+	from emat.learn.multioutput import MultiOutputRegressor
+
+	rng = numpy.random.RandomState(0)
+	X = rng.uniform(size=(40, 3))
+	Y = numpy.column_stack([numpy.sin(3 * X[:, 0]) + X[:, 1] ** 2, X[:, 1] * X[:, 2]])
+
+	# pooled and parallel restarts find the same kernels as serial restarts
+	serial = [
+		AnisotropicGaussianProcessRegressor(n_restarts_optimizer=6, random_state=1).fit(X, Y[:, j])
+		for j in range(2)
+	]
+	for n_jobs in [1, 2]:
+		pooled = MultiOutputRegressor(
+			AnisotropicGaussianProcessRegressor(n_restarts_optimizer=6, random_state=1),
+			n_jobs=n_jobs,
+		).fit(X, Y)
+		for s, p in zip(serial, pooled.estimators_):
+			assert numpy.allclose(s.kernel_.theta, p.kernel_.theta)
+			assert p.n_optimizer_runs_ == 7
+		numpy.testing.assert_allclose(
+			pooled.predict(X), numpy.column_stack([s.predict(X) for s in serial])
+		)
+
+	# each output can instead be fit separately
+	separate = MultiOutputRegressor(
+		AnisotropicGaussianProcessRegressor(n_restarts_optimizer=6, random_state=1),
+		pool_restarts=False,
+	).fit(X, Y)
+	for s, p in zip(serial, separate.estimators_):
+		assert numpy.allclose(s.kernel_.theta, p.kernel_.theta)
+		assert not hasattr(p, 'n_optimizer_runs_')
+
+	# the same kernels are found without scikit-learn's private optimizer method
+	from sklearn.gaussian_process import GaussianProcessRegressor
+	monkeypatch.delattr(GaussianProcessRegressor, '_constrained_optimization')
+	pooled = MultiOutputRegressor(
+		AnisotropicGaussianProcessRegressor(n_restarts_optimizer=6, random_state=1),
+	).fit(X, Y)
+	for s, p in zip(serial, pooled.estimators_):
+		assert numpy.allclose(s.kernel_.theta, p.kernel_.theta)
+	monkeypatch.undo()
+
+	# early stopping gives the same result regardless of the number of jobs
+	early = [
+		AnisotropicGaussianProcessRegressor(
+			n_restarts_optimizer=50, random_state=1, n_iter_no_change=2, n_jobs=n_jobs,
+		).fit(X, Y[:, 0])
+		for n_jobs in [None, 2]
+	]
+	assert early[0].n_optimizer_runs_ == early[1].n_optimizer_runs_ < 51
+	assert numpy.array_equal(early[0].kernel_.theta, early[1].kernel_.theta)
+
+
+def test_sparse_gaussian_process():
+	import numpy
+	from emat.learn.anisotropic import AnisotropicGaussianProcessRegressor
+	from emat.learn.sparse import SparseGaussianProcessRegressor
+
+	rng = numpy.random.RandomState(0)
+	f = lambda X: numpy.sin(3 * X[:, 0]) + X[:, 1] ** 2 + 0.5 * numpy.cos(4 * X[:, 2])
+	X = rng.uniform(size=(400, 3))
+	X_test = rng.uniform(size=(50, 3))
+
+	# with every training point as an inducing point, this is an exact regression
+	exact = AnisotropicGaussianProcessRegressor(n_restarts_optimizer=2, random_state=2).fit(X[:40], f(X[:40]))
+	sparse = SparseGaussianProcessRegressor(n_inducing=40, n_restarts_optimizer=2, random_state=2).fit(X[:40], f(X[:40]))
+	for e, s in zip(exact.predict(X_test, return_std=True), sparse.predict(X_test, return_std=True)):
+		numpy.testing.assert_allclose(e, s, rtol=1e-5, atol=1e-6)
+
+	# with fewer inducing points, all of the training data is still used
+	sparse = SparseGaussianProcessRegressor(n_inducing=60, n_restarts_optimizer=2, random_state=2).fit(X, f(X))
+	assert sparse.X_train_.shape == (60, 3)
+	assert len(numpy.unique(sparse.inducing_indexes_)) == 60
+	y_hat, y_std = sparse.predict(X_test, return_std=True)
+	assert numpy.sqrt(numpy.mean((y_hat - f(X_test)) ** 2)) < 0.01
+	assert y_std.shape == (50,)
+	assert (y_std >= 0).all()
+
+
+def test_gaussian_process_condition():
+	import numpy
+	from scipy.linalg import cholesky
+	from sklearn.gaussian_process import GaussianProcessRegressor
+	from emat.learn.anisotropic import AnisotropicGaussianProcessRegressor
+	from emat.learn.sparse import SparseGaussianProcessRegressor
+
+	rng = numpy.random.RandomState(0)
+	f = lambda X: numpy.sin(3 * X[:, 0]) + X[:, 1] ** 2 + 0.5 * numpy.cos(4 * X[:, 2])
+	X = rng.uniform(size=(60, 3))
+	X_test = rng.uniform(size=(20, 3))
+
+	# appending rows extends the cholesky factor, with the same result as a
+	# fit with the hyperparameters held fixed
+	gpr = AnisotropicGaussianProcessRegressor(n_restarts_optimizer=2, random_state=2).fit(X[:40], f(X[:40]))
+	kernel = gpr.kernel_
+	gpr.condition(X, f(X))
+	assert gpr.kernel_ is kernel
+	K = kernel(X)
+	K[numpy.diag_indices_from(K)] += gpr.alpha
+	numpy.testing.assert_allclose(gpr.L_, cholesky(K, lower=True), atol=1e-10)
+	fixed = GaussianProcessRegressor(kernel=kernel, optimizer=None).fit(X, f(X) / gpr.standardize_Y)
+	numpy.testing.assert_allclose(gpr.log_marginal_likelihood_value_, fixed.log_marginal_likelihood_value_)
+	for g, h in zip(gpr.predict(X_test, return_std=True), fixed.predict(X_test, return_std=True)):
+		numpy.testing.assert_allclose(g, h * gpr.standardize_Y, rtol=1e-6, atol=1e-5)
+
+	# re-optimizing starts from the previous hyperparameters, without restarts
+	gpr.condition(X, f(X), optimize=True)
+	assert gpr.n_optimizer_runs_ == 1
+	full = AnisotropicGaussianProcessRegressor(n_restarts_optimizer=2, random_state=2).fit(X, f(X))
+	numpy.testing.assert_allclose(gpr.kernel_.theta, full.kernel_.theta, rtol=1e-3)
+	numpy.testing.assert_allclose(gpr.log_marginal_likelihood_value_, full.log_marginal_likelihood_value_)
+
+	sparse = SparseGaussianProcessRegressor(n_inducing=30, n_restarts_optimizer=2, random_state=2).fit(X[:40], f(X[:40]))
+	Z = sparse.X_train_
+	sparse.condition(X, f(X))
+	assert sparse.X_train_ is Z
+	refit = SparseGaussianProcessRegressor(n_inducing=30, n_restarts_optimizer=2, random_state=2).fit(X[:40], f(X[:40]))
+	refit.exact_ = sparse.exact_
+	refit._condition(X, f(X))
+	numpy.testing.assert_allclose(sparse.predict(X_test), refit.predict(X_test))
+	assert numpy.sqrt(numpy.mean((sparse.predict(X_test) - f(X_test)) ** 2)) < 0.05
+
+
+def test_cross_val_disk_cache(tmp_path):
+	import os
+	import numpy
+	from emat.learn.boosting import LinearAndGaussian
+	from emat.util.disk_cache import prune_cache
+
+	rng = numpy.random.RandomState(0)
+	X = pandas.DataFrame(rng.uniform(size=(30, 3)), columns=['a', 'b', 'c'])
+	Y = pandas.DataFrame({'y1': numpy.sin(3 * X.a) + X.b, 'y2': X.c ** 2})
+
+	def cached_files():
+		return sorted(
+			os.path.join(d, f) for d, _, files in os.walk(tmp_path)
+			for f in files if not f.endswith('.info.txt')
+		)
+
+	# without a random_state, results are not cached
+	LinearAndGaussian(n_restarts_optimizer=2, random_state=1).cross_val_scores(X, Y, cache_dir=tmp_path)
+	assert len(cached_files()) == 0
+
+	scores = LinearAndGaussian(n_restarts_optimizer=2, random_state=1).cross_val_scores(
+		X, Y, cache_dir=tmp_path, random_state=0,
+	)
+	assert len(cached_files()) == 1
+	# a new estimator, as in a new session, reuses the results on disk
+	estimator = LinearAndGaussian(n_restarts_optimizer=2, random_state=1)
+	assert estimator.cross_val_scores(X, Y, cache_dir=tmp_path, random_state=0).equals(scores)
+	assert not hasattr(estimator, 'estimators_')
+	assert len(cached_files()) == 1
+	# different parameters, data or folds are cached separately
+	LinearAndGaussian(n_restarts_optimizer=3, random_state=1).cross_val_scores(X, Y, cache_dir=tmp_path, random_state=0)
+	LinearAndGaussian(n_restarts_optimizer=2, random_state=1).cross_val_scores(X, Y * 2, cache_dir=tmp_path, random_state=0)
+	LinearAndGaussian(n_restarts_optimizer=2, random_state=1).cross_val_scores(X, Y, cv=3, cache_dir=tmp_path, random_state=0)
+	assert len(cached_files()) == 4
+
+	# the least recently used results are evicted first
+	newest = cached_files()
+	for n, f in enumerate(newest):
+		os.utime(f, (1000 + n, 1000 + n))
+	size = os.path.getsize(newest[-1]) + os.path.getsize(newest[-1] + '.info.txt')
+	assert prune_cache(tmp_path, size) == 3
+	assert cached_files() == newest[-1:]
+
+
+def test_cross_validate_parallel():
+	import numpy
+	from sklearn.model_selection import KFold, cross_validate
+	from sklearn.metrics import make_scorer, r2_score
+	from emat.learn.boosting import LinearAndGaussian
+	from emat.learn.model_selection import cross_validate_parallel
+
+	rng = numpy.random.RandomState(0)
+	X = pandas.DataFrame(rng.uniform(size=(50, 3)), columns=['a', 'b', 'c'])
+	Y = pandas.DataFrame({'y1': numpy.sin(2 * X.a) + X.b * X.c, 'y2': X.c ** 2 + X.a})
+	estimator = LinearAndGaussian(n_restarts_optimizer=2, random_state=0)
+
+	# the same scores as fitting all the outputs together in each fold
+	scoring = {
+		f'test_{name}': make_scorer(lambda y, y_hat, j=j: r2_score(numpy.asarray(y)[:, j], numpy.asarray(y_hat)[:, j]))
+		for j, name in enumerate(Y.columns)
+	}
+	expected = cross_validate(estimator, X, Y, cv=KFold(5), scoring=scoring)
+	reported = {}
+	result = cross_validate_parallel(
+		estimator, X, Y, cv=KFold(5), n_jobs=2, output_names=Y.columns,
+		callback=lambda fold, scores: reported.update({(fold, k): v for k, v in scores.items()}),
+		return_predictions=True,
+	)
+	for name in Y.columns:
+		numpy.testing.assert_allclose(result[f'test_{name}'], expected[f'test_test_{name}'])
+	# partial results are reported for every fold and output
+	assert len(reported) == 10
+	assert reported[(4, 'y2')] == result['test_y2'][4]
+	assert result['predictions'].shape == Y.shape
+	assert not numpy.isnan(result['predictions']).any()
+
+
+def test_closed_form_leave_one_out():
+	import numpy
+	from sklearn.gaussian_process import GaussianProcessRegressor
+	from emat.learn.anisotropic import AnisotropicGaussianProcessRegressor
+	from emat.learn.boosting import LinearAndGaussian
+	from emat.learn.linear_model import LinearRegression
+
+	rng = numpy.random.RandomState(0)
+	X = pandas.DataFrame(rng.uniform(size=(30, 3)), columns=['a', 'b', 'c'])
+	Y = pandas.DataFrame({'y1': numpy.sin(3 * X.a) + X.b, 'y2': X.c ** 2 + X.a})
+	keep = lambda i: numpy.arange(len(X)) != i
+
+	# the same as refitting without each point, with the hyperparameters fixed
+	gpr = AnisotropicGaussianProcessRegressor(n_restarts_optimizer=2, random_state=0).fit(X, Y.y1)
+	scale = gpr.standardize_Y
+	refits = [
+		GaussianProcessRegressor(kernel=gpr.kernel_, optimizer=None, alpha=gpr.alpha)
+		.fit(X.values[keep(i)], Y.y1.values[keep(i)] / scale)
+		.predict(X.values[[i]])[0] * scale
+		for i in range(len(X))
+	]
+	numpy.testing.assert_allclose(numpy.ravel(gpr._loo_predict(X, Y.y1)), refits, rtol=1e-6)
+
+	lr = LinearRegression().fit(X, Y)
+	refits = numpy.vstack([
+		LinearRegression().fit(X[keep(i)], Y[keep(i)]).predict(X.iloc[[i]])
+		for i in range(len(X))
+	])
+	numpy.testing.assert_allclose(lr._loo_predict(X, Y), refits)
+
+	# the boosted regressor adds up the leave-one-out predictions of its stages
+	lg = LinearAndGaussian(n_restarts_optimizer=2, random_state=0).fit(X, Y)
+	loo = lg._loo_predict(X, Y)
+	assert isinstance(loo, pandas.DataFrame)
+	assert list(loo.columns) == ['y1', 'y2']
+	residual = Y - lg.lr.predict(X)
+	numpy.testing.assert_allclose(
+		loo.values,
+		lg.lr._loo_predict(X, Y).values + lg.gpr._loo_predict(X, residual.values).values,
+	)
@@ -208,6 +208,307 @@ class TestMetaModelMethods(unittest.TestCase):
             assert np.array_equal(j, k)
 
 
+def _road_test_metamodel(yamlfile='road_test.yaml', **kwargs):
+    """Fit the road test meta-model shared by the tests below."""
+    from emat.examples import road_test
+    from emat.learn.boosting import LinearAndGaussian
+    s, db, m = road_test(yamlfile=yamlfile)
+    m.design_experiments(n_samples=30, random_seed=1, design_name='train')
+    m.run_experiments(design_name='train')
+    mm = m.create_metamodel_from_design('train', regressor=LinearAndGaussian(n_restarts_optimizer=2, **kwargs))
+    return s, m, mm.function
+
+
+def _refit_std(f, features, hypothetical):
+    """Posterior standard deviations from refitting with hypothetical points."""
+    from sklearn.gaussian_process import GaussianProcessRegressor
+    std = []
+    for est in f.regression.gpr.estimators_:
+        X = np.vstack([est.X_train_, features[hypothetical]])
+        gp = GaussianProcessRegressor(kernel=est.kernel_, alpha=est.alpha, optimizer=None)
+        gp.fit(X, np.zeros(len(X)))
+        std.append(gp.predict(features, return_std=True)[1] * est.standardize_Y)
+    return np.column_stack(std)
+
+
+def test_batch_prediction_matches_single_points():
+    s, m, f = _road_test_metamodel()
+    design = m.design_experiments(n_samples=25, random_seed=2, db=False)
+
+    f.predict_chunk_size = 7
+    for method in [f.__call__, f.predict, f.compute_std]:
+        batch = method(design)
+        single = pd.DataFrame(
+            [pd.Series(method(**row)) for _, row in design.iterrows()],
+            index=design.index,
+        )
+        pd.testing.assert_frame_equal(batch, single, check_exact=False)
+    assert f(design.iloc[:0]).empty
+
+
+def test_compiled_metamodel():
+    import cloudpickle
+    from emat.model.compiled_meta_model import CompiledMetaModel
+    s, m, f = _road_test_metamodel()
+    design = m.design_experiments(n_samples=10, random_seed=2, db=False)
+
+    compiled = f.compile()
+    assert isinstance(compiled, CompiledMetaModel)
+    expected = f(design)
+    for i, row in design.iterrows():
+        assert compiled(**row) == approx(dict(expected.loc[i]))
+        assert compiled(dict(row)) == approx(dict(expected.loc[i]))
+    X = design[compiled.input_names].values
+    assert compiled.predict(X) == approx(expected[compiled.output_names].values)
+    assert compiled.predict(X, return_std=True) == approx(
+        f.compute_std(design)[compiled.output_names].values
+    )
+
+    # calling the meta-model with keyword arguments uses the compiled version
+    row = dict(design.iloc[0])
+    assert f(**row) == approx(dict(expected.iloc[0]))
+    assert isinstance(f._compiled, CompiledMetaModel)
+    assert '_compiled' not in cloudpickle.loads(cloudpickle.dumps(f)).__dict__
+
+    # changing the regression directly rebuilds the compiled version
+    f.regression.set_params(prediction_tier=1)
+    assert f(**row) == approx(f.compile()(**row))
+    assert f(**row) != approx(dict(expected.iloc[0]))
+    f.regression.set_params(prediction_tier=9999)
+    f.regression.fit(f.input_sample.iloc[::2], f.output_sample.iloc[::2])
+    assert f(**row) == approx(f.compile()(**row))
+    assert f(**row) != approx(dict(expected.iloc[0]))
+    from emat.learn.boosting import LinearAndGaussian
+    f.regression = LinearAndGaussian(n_restarts_optimizer=2).fit(f.input_sample, f.output_sample)
+    assert f(**row) == approx(f.compile()(**row))
+
+    with pytest.raises(ValueError):
+        compiled(**dict(row, debt_type='Junk Bond'))
+    with pytest.raises(ValueError):
+        compiled(**dict(row, free_flow_time=row['free_flow_time'] + 1))
+
+
+def test_sparse_metamodel():
+    from emat.examples import road_test
+    from emat.learn import LinearAndSparseGaussian
+    s, db, m = road_test()
+    m.design_experiments(n_samples=60, random_seed=1, design_name='train')
+    m.run_experiments(design_name='train')
+    mm = m.create_metamodel_from_design(
+        'train',
+        regressor=LinearAndSparseGaussian(n_inducing=25, n_restarts_optimizer=2, random_state=0),
+    )
+    f = mm.function
+    length_scales = f.get_length_scales()
+    assert length_scales.shape == (len(f.input_sample.columns), len(f.output_sample.columns))
+
+    design = m.design_experiments(n_samples=10, random_seed=2, db=False)
+    std = f.compute_std(design)
+    assert (std[f.output_sample.columns] >= 0).all().all()
+    compiled = f.compile()
+    assert compiled.predict(design[compiled.input_names].values) == approx(
+        f(design)[compiled.output_names].values
+    )
+
+    candidates = m.design_experiments(n_samples=100, random_seed=3, db=False)
+    picks = f.pick_new_experiments(candidates, 5)
+    assert len(picks) == 5
+    assert set(picks.index) <= set(candidates.index)
+
+
+def test_metamodel_update():
+    from emat.examples import road_test
+    from emat.learn.boosting import LinearAndGaussian
+    s, db, m = road_test()
+    m.design_experiments(n_samples=50, random_seed=1, design_name='train')
+    m.run_experiments(design_name='train')
+    experiments = m.read_experiments('train')
+    inputs = experiments[m.scope.get_parameter_names()]
+    outputs = experiments[m.scope.get_measure_names()]
+    mm = m.create_metamodel_from_data(
+        inputs.iloc[:35], outputs.iloc[:35],
+        regressor=LinearAndGaussian(n_restarts_optimizer=2),
+    )
+    f = mm.function
+    design = m.design_experiments(n_samples=10, random_seed=2, db=False)
+    before = f(design)
+    length_scales = f.get_length_scales()
+
+    f.update(inputs.iloc[35:], outputs.iloc[35:])
+    assert len(f.input_sample) == len(f.output_sample) == 50
+    pd.testing.assert_frame_equal(f.get_length_scales(), length_scales)
+    after = f(design)
+    assert not np.allclose(before.values, after.values)
+    # the compiled meta-model is rebuilt for the new training data
+    assert f(**design.iloc[0]) == approx(dict(after.iloc[0]))
+
+    # the meta-model now fits the new experiments closely
+    fitted = f(inputs.iloc[35:])[outputs.columns]
+    assert fitted.values == approx(outputs.iloc[35:].values, rel=1e-3)
+
+    f.update(inputs.iloc[:0], outputs.iloc[:0], refit=True)
+    assert len(f.input_sample) == 50
+
+    with pytest.raises(ValueError):
+        f.update(inputs.iloc[:1].assign(debt_type='Junk Bond'), outputs.iloc[:1])
+
+
+def test_metamodel_export(tmp_path):
+    from emat.model import CompiledMetaModel
+    s, m, f = _road_test_metamodel(yamlfile='road_test2.yaml')
+    assert f.output_transforms  # this scope has log and logxp transforms
+    design = m.design_experiments(n_samples=10, random_seed=2, db=False)
+    expected = f(design)
+
+    f.export(tmp_path / 'mm.npz')
+    loaded = CompiledMetaModel.load(tmp_path / 'mm.npz')
+    for i, row in design.iterrows():
+        result = loaded(**row)
+        for k in f.disabled_outputs:
+            assert result.pop(k) is None
+        assert result == approx(dict(expected.loc[i, loaded.output_names]))
+    X = design[loaded.input_names].values
+    assert loaded.predict(X, return_std=True) == approx(f.compute_std(design)[loaded.output_names].values)
+    with pytest.raises(ValueError):
+        loaded(**dict(design.iloc[0], debt_type='Junk Bond'))
+
+    # the arrays can be memory-mapped from the archive instead of read
+    mapped = CompiledMetaModel.load(tmp_path / 'mm.npz', mmap_mode='r')
+    gaussian = [stage for stage in mapped._stages if hasattr(stage, 'x_train')]
+    assert gaussian
+    for stage in gaussian:
+        assert isinstance(stage.x_train, np.memmap)
+        assert isinstance(stage._k_inv, np.memmap)
+    assert mapped.predict(X, return_std=True) == approx(loaded.predict(X, return_std=True))
+    assert mapped.input_names == loaded.input_names
+
+    f.export(tmp_path / 'mean_only.npz', include_std=False)
+    mean_only = CompiledMetaModel.load(tmp_path / 'mean_only.npz')
+    assert mean_only.predict(X) == approx(loaded.predict(X))
+    with pytest.raises(NotImplementedError):
+        mean_only.predict(X, return_std=True)
+
+
+def test_metamodel_leave_one_out():
+    import copy
+    from sklearn.metrics import r2_score
+    s, m, f = _road_test_metamodel()
+    loo = f.cross_val_predicts(cv=0)
+    assert loo.shape == f.output_sample.shape
+    assert list(loo.columns) == list(f.output_sample.columns)
+    # leave-one-out predictions are not the same as the fitted values
+    assert not np.allclose(loo.values, f.regression.predict(f.input_sample).values)
+    scores = f.cross_val_scores(cv=0)
+    assert list(scores.index) == list(f.output_sample.columns)
+    for k in scores.index:
+        assert scores[k] == approx(r2_score(f.output_sample[k], loo[k]))
+
+    # they match refitting without each experiment, with the hyperparameters held fixed
+    X, Y = f.input_sample, f.output_sample
+    for i in range(len(X)):
+        refit = copy.deepcopy(f.regression)
+        keep = np.arange(len(X)) != i
+        refit.condition(X[keep], Y[keep])
+        assert np.ravel(refit.predict(X.iloc[[i]])) == approx(loo.iloc[i].values, rel=1e-8, abs=1e-8)
+
+
+def test_metamodel_iter_predict():
+    s, m, f = _road_test_metamodel()
+    design = m.design_experiments(n_samples=500, random_seed=2, db=False)
+    estimates, std = f(design), f.compute_std(design)
+
+    compiled = f.compile()
+    budget = 2**16
+    chunks = list(f.iter_predict(design, return_std=True, memory_budget=budget))
+    assert len(chunks) > 1
+    assert len(chunks[0][0]) == compiled.chunk_size(budget, return_std=True)
+    pd.testing.assert_index_equal(pd.concat([e for e, _ in chunks]).index, design.index)
+    assert pd.concat([e for e, _ in chunks]).values == approx(estimates.values)
+    assert pd.concat([s for _, s in chunks]).values == approx(std.values)
+
+    # float32 kernels give nearly the same results
+    chunks = list(f.iter_predict(design, return_std=True, memory_budget=budget, dtype=np.float32))
+    assert pd.concat([e for e, _ in chunks]).values == approx(estimates.values, rel=1e-4)
+    assert pd.concat([s for _, s in chunks]).values == approx(std.values, rel=1e-2, abs=1e-6)
+    X = design[compiled.input_names].values
+    assert compiled.predict(X, memory_budget=budget, dtype=np.float32) == approx(
+        compiled.predict(X), rel=1e-4,
+    )
+
+
+def test_heuristic_batch_pick_experiment():
+    s, m, f = _road_test_metamodel()
+    candidates = m.design_experiments(n_samples=200, random_seed=2, db=False)
+
+    # incremental standard deviations match refitting with hypothetical points
+    features = np.asarray(f.preprocess_raw_input(candidates[f.raw_input_columns], float))
+    refit_std = lambda hypothetical: _refit_std(f, features, hypothetical)
+    compiled = f.compile()
+    posterior = compiled._hypothetical_posterior(candidates[compiled.input_names].values)
+    assert posterior.std() == approx(compiled.predict(candidates[compiled.input_names].values, return_std=True))
+    for i in (3, 17, 42, 99):
+        posterior.add(i)
+    assert posterior.std() == approx(refit_std([3, 17, 42, 99]), abs=1e-6)
+    posterior.remove(17)
+    posterior.remove(3)
+    assert posterior.std() == approx(refit_std([42, 99]), abs=1e-6)
+
+    batch = f.heuristic_batch_pick_experiment(5, candidates, s, plot=False)
+    assert len(batch) == 5
+    assert batch.index.is_unique
+    assert set(batch.index) <= set(candidates.index)
+
+
+def test_hypothetical_posterior_with_noise():
+    s, m, f = _road_test_metamodel(alpha=1e-2)
+    candidates = m.design_experiments(n_samples=200, random_seed=2, db=False)
+    # nearby candidates, so their hypothetical experiments are strongly correlated
+    for n, i in enumerate((17, 42, 99, 150)):
+        candidates.iloc[i] = candidates.iloc[3]
+        candidates.iloc[i, candidates.columns.get_loc('alpha')] += 0.01 * (n + 1)
+    features = np.asarray(f.preprocess_raw_input(candidates[f.raw_input_columns], float))
+
+    compiled = f.compile()
+    posterior = compiled._hypothetical_posterior(candidates[compiled.input_names].values)
+    for i in (3, 17, 42, 99, 150):
+        posterior.add(i)
+    assert posterior.std() == approx(_refit_std(f, features, [3, 17, 42, 99, 150]), abs=1e-6)
+    # removing points from the middle of the batch downdates the factor exactly
+    posterior.remove(42)
+    assert posterior.std() == approx(_refit_std(f, features, [3, 17, 99, 150]), abs=1e-6)
+    posterior.remove(17)
+    posterior.add(60)
+    assert posterior.std() == approx(_refit_std(f, features, [3, 99, 150, 60]), abs=1e-6)
+
+def test_candidate_pool():
+    from emat.examples import road_test
+    from emat.scope.box import Box
+    from emat.model import CandidatePool
+    s, db, m = road_test()
+    m.design_experiments(n_samples=40, random_seed=1, design_name='train')
+    m.run_experiments(design_name='train')
+    f = m.create_metamodel_from_design('train').function
+
+    # a pool preprocessed in chunks matches preprocessing all at once
+    candidates = m.design_experiments(n_samples=300, random_seed=3, db=False)
+    pool = CandidatePool.from_design(f, candidates, chunk_size=64, dtype=np.float64)
+    assert pool.matrix.shape == (300, len(f.input_sample.columns))
+    assert pool.matrix == approx(f.preprocess_raw_input(candidates, float).values)
+    picks = f.pick_new_experiments(candidates, 5)
+    pd.testing.assert_frame_equal(f.pick_new_experiments(pool, 5), picks)
+    assert CandidatePool.from_design(f, candidates).matrix.dtype == np.float32
+
+    # generated pools stay within a box, and are reused for several picks
+    box = Box('b', scope=s, lower_bounds={'alpha': 0.12}, upper_bounds={'alpha': 0.14})
+    pool = f.candidate_pool(box, 500, chunk_size=200)
+    assert len(pool) == 500
+    assert pool.experiments['alpha'].between(0.12, 0.14).all()
+    pd.testing.assert_frame_equal(pool.experiments, f.candidate_pool(box, 500, chunk_size=200).experiments)
+    picks1 = f.pick_new_experiments(pool, 5, output_focus=['net_benefits'])
+    picks2 = f.pick_new_experiments(pool, 5, output_focus=['build_travel_time'], pending_experiments=picks1)
+    assert set(picks1.index) <= set(pool.index)
+    assert not set(picks1.index) & set(picks2.index)
+
+
 if __name__ == '__main__':
     unittest.main()
-    
\ No newline at end of file
@@ -142,6 +142,73 @@ class TestScopeMethods(unittest.TestCase):
         assert s1.relevant_features == s1_.relevant_features
         assert s2.relevant_features == s2_.relevant_features
 
+    def test_get_density(self):
+        import numpy as np
+        from pytest import approx
+        scope = Scope(package_file('model','tests','road_test.yaml'))
+        design = scope.design_experiments(n_samples=100, random_seed=1)
+
+        def product_of_marginals(row):
+            density = 1.0
+            for p in scope.get_uncertainties() + scope.get_levers():
+                value = row[p.name]
+                if p.dtype == 'cat':
+                    value = p.values.index(value)
+                if hasattr(p.dist.dist, 'pmf'):
+                    density *= p.dist.pmf(value)
+                else:
+                    density *= p.dist.pdf(value)
+            return density
+
+        density = scope.get_density(design)
+        assert list(density.index) == list(design.index)
+        assert density.values == approx(design.apply(product_of_marginals, axis=1).values, rel=1e-12)
+        assert scope.get_density(design.iloc[7]) == approx(density.iloc[7], rel=1e-12)
+        assert scope.get_density(design, log=True).values == approx(np.log(density.values), rel=1e-12)
+        assert scope.get_density(alpha=1.0) == 0
+        outside = design.copy()
+        outside['debt_type'] = 'Unknown'
+        assert (scope.get_density(outside) == 0).all()
+
+        # correlated parameters are joined by a gaussian copula
+        from scipy.stats import norm, multivariate_normal
+        scope = Scope(package_file('model','tests','road_test_corr.yaml'))
+        design = scope.design_experiments(n_samples=100, random_seed=1)
+        independent = Scope(package_file('model','tests','road_test_corr.yaml'))
+        for p in independent.get_parameters():
+            p.corr = {}
+        log_copula = scope.get_density(design, log=True) - independent.get_density(design, log=True)
+        names = ['alpha', 'beta', 'unit_cost_expansion', 'value_of_time']
+        z = norm.ppf(np.column_stack([scope[n].dist.cdf(design[n]) for n in names]))
+        correlation = [[1, .75, 0, 0], [.75, 1, 0, 0], [0, 0, 1, .9], [0, 0, .9, 1]]
+        # input_flow is an integer, and is evaluated at the middle of its steps
+        flow = scope['input_flow'].dist
+        z_flow = norm.ppf(flow.cdf(design['input_flow']) - flow.pmf(design['input_flow']) / 2)
+        z = np.column_stack([z, z_flow])
+        correlation = np.pad(correlation, (0, 1)).astype(float)
+        correlation[4, 2:] = correlation[2:, 4] = [-.5, -.5, 1]
+        expected = multivariate_normal(np.zeros(5), correlation).logpdf(z) - norm.logpdf(z).sum(axis=1)
+        assert log_copula.values == approx(expected, rel=1e-9)
+
+    def test_truncated_density(self):
+        import numpy as np
+        from pytest import approx
+        from scipy.stats import uniform, norm, randint
+        from emat.util.distributions import truncated
+        t = truncated(norm(0, 1), -1, 2)
+        mass = norm.cdf(2) - norm.cdf(-1)
+        x = np.array([-2, -1, 0.5, 2, 3])
+        assert t.pdf(x) == approx(np.where((x >= -1) & (x <= 2), norm.pdf(x) / mass, 0))
+        assert t.logpdf(x)[[0, 4]].tolist() == [-np.inf, -np.inf]
+        assert t.logpdf(x)[1:4] == approx(norm.logpdf(x[1:4]) - np.log(mass))
+        assert t.cdf(x) == approx([0, 0, (norm.cdf(0.5) - norm.cdf(-1)) / mass, 1, 1])
+        assert t.cdf(t.ppf(np.array([0.1, 0.7]))) == approx([0.1, 0.7])
+        d = truncated(randint(0, 10), 3, 6)
+        assert d.pmf(np.arange(10)) == approx([0, 0, 0, .25, .25, .25, .25, 0, 0, 0])
+        # the cdf keeps the mass at the lower bound, matching the pmf
+        assert d.cdf(np.arange(10)) == approx([0, 0, 0, .25, .5, .75, 1, 1, 1, 1])
+        assert sorted(set(d.rvs(size=200, random_state=0))) == [3, 4, 5, 6]
+
 
 if __name__ == '__main__':
     unittest.main()